@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, List, Optional, Tuple
+
+ARTIFACT_DIR = os.path.expanduser("~/.tilde-cli/artifacts")
+INLINE_LIMIT = 4000  # tool outputs longer than this (in characters) become artifacts
+PREVIEW_HEAD_LINES = 20
+PREVIEW_TAIL_LINES = 5
+PREVIEW_LINE_CHARS = 200
+MAX_STORE_BYTES = 200 * 1024 * 1024
+HANDLE_PREFIX = "artifact:"
+
+
+def format_output(output: Any) -> str:
+    """Render a tool result as text, one item per line for lists so it can be paged."""
+    if isinstance(output, str):
+        return output
+    if isinstance(output, (list, tuple)):
+        return "\n".join(str(item) for item in output)
+    if isinstance(output, dict):
+        try:
+            return json.dumps(output, indent=2, ensure_ascii=False)
+        except (TypeError, ValueError):
+            pass
+    return str(output)
+
+
+class ArtifactStore:
+    """Content-addressed store for large tool outputs.
+
+    Each artifact is saved once under its SHA-256, so identical outputs share one
+    file and one handle. The model sees a short preview plus the handle and uses the
+    ``read_artifact`` tool to page or grep through the rest.
+    """
+
+    def __init__(self, artifact_dir: str = None):
+        self.artifact_dir = artifact_dir or ARTIFACT_DIR
+
+    def _path(self, handle: str) -> str:
+        digest = handle[len(HANDLE_PREFIX):] if handle.startswith(HANDLE_PREFIX) else handle
+        if not re.fullmatch(r"[0-9a-f]{16,64}", digest):
+            raise ValueError(f"Invalid artifact handle: {handle}")
+        return os.path.join(self.artifact_dir, f"{digest}.txt")
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its handle; identical text is stored only once."""
+        data = text.encode('utf-8')
+        handle = HANDLE_PREFIX + hashlib.sha256(data).hexdigest()[:16]
+        path = self._path(handle)
+        if os.path.exists(path):
+            os.utime(path)
+            return handle
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._prune()
+        return handle
+
+    def exists(self, handle: str) -> bool:
+        try:
+            return os.path.exists(self._path(handle))
+        except ValueError:
+            return False
+
+    def read_lines(self, handle: str, offset: int = 1, limit: int = 200) -> Tuple[List[str], int]:
+        """Return lines ``offset``..``offset+limit-1`` (1-based) and the total line count."""
+        lines = []
+        total = 0
+        with open(self._path(handle), 'r', encoding='utf-8', errors='replace') as f:
+            for total, line in enumerate(f, 1):
+                if offset <= total < offset + limit:
+                    lines.append(line.rstrip("\n"))
+        return lines, total
+
+    def grep(self, handle: str, pattern: str, max_matches: int = 100) -> Tuple[List[str], int]:
+        """Return up to ``max_matches`` matching lines as 'lineno: text' and the total match count."""
+        regex = re.compile(pattern)
+        matches = []
+        count = 0
+        with open(self._path(handle), 'r', encoding='utf-8', errors='replace') as f:
+            for i, line in enumerate(f, 1):
+                if regex.search(line):
+                    count += 1
+                    if len(matches) < max_matches:
+                        matches.append(f"{i}: {line.rstrip()}")
+        return matches, count
+
+    def _prune(self):
+        entries = []
+        for name in os.listdir(self.artifact_dir):
+            path = os.path.join(self.artifact_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= MAX_STORE_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+def preview(text: str, handle: str) -> str:
+    """Build the compact stand-in the model sees instead of a large output."""
+    lines = text.split("\n")
+
+    def clip(line):
+        return line if len(line) <= PREVIEW_LINE_CHARS else line[:PREVIEW_LINE_CHARS] + "..."
+
+    shown = [clip(line) for line in lines[:PREVIEW_HEAD_LINES]]
+    if len(lines) > PREVIEW_HEAD_LINES + PREVIEW_TAIL_LINES:
+        shown.append(f"... [{len(lines) - PREVIEW_HEAD_LINES - PREVIEW_TAIL_LINES} lines omitted] ...")
+        shown.extend(clip(line) for line in lines[-PREVIEW_TAIL_LINES:])
+    else:
+        shown.extend(clip(line) for line in lines[PREVIEW_HEAD_LINES:])
+    return (
+        "\n".join(shown)
+        + f"\n[Full output stored as {handle} ({len(lines)} lines, {len(text)} characters). "
+        + "Call read_artifact with this handle and 'offset'/'limit' to page through it, or 'pattern' to search it.]"
+    )
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
+
+
+def compact_output(output: Any, store: ArtifactStore = None, limit: int = INLINE_LIMIT) -> str:
+    """Return ``output`` as text, replacing it with a preview and handle when it exceeds ``limit``."""
+    text = str(output)
+    if len(text) <= limit:
+        return text
+    text = format_output(output)
+    store = store or get_artifact_store()
+    return preview(text, store.put(text))
@@ -0,0 +1 @@
+"""End-to-end performance benchmarks; run with ``python -m benchmarks``."""
@@ -0,0 +1,71 @@
+"""Run the benchmark suite.
+
+    python -m benchmarks                                  # run everything, print a table
+    python -m benchmarks --quick --only memory tools      # smaller inputs, selected suites
+    python -m benchmarks --output results.json            # write machine-readable results
+    python -m benchmarks --baseline baseline.json         # exit 1 if any metric regressed
+
+Benchmarks run with HOME pointed at a temporary directory so they never touch the
+user's memory, sessions, metrics or daemon socket.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Tilde CLI performance benchmarks.")
+    parser.add_argument("--only", nargs="+", metavar="SUITE", help="Run only these suites.")
+    parser.add_argument("--quick", action="store_true", help="Use smaller inputs and fewer repetitions.")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against this results file and fail on regressions.")
+    parser.add_argument("--threshold", type=float, help="Allowed slowdown ratio for every metric (default: per suite).")
+    parser.add_argument("--list", action="store_true", help="List the available suites.")
+    args = parser.parse_args(argv)
+    # Resolve file arguments against the caller's directory and HOME before both change below
+    for name in ("output", "baseline"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(os.path.expanduser(getattr(args, name))))
+
+    home = tempfile.mkdtemp(prefix="tilde-bench-")
+    os.environ["HOME"] = home
+    os.environ["TILDE_NO_DAEMON"] = "1"
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    from . import harness
+    from . import bench_agent, bench_context, bench_memory, bench_session, bench_startup, bench_tools  # noqa: F401 (registration)
+
+    if args.list:
+        print("\n".join(harness.names()))
+        return 0
+    unknown = set(args.only or []) - set(harness.names())
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = harness.run(args.only, quick=args.quick)
+    if args.output:
+        harness.save(results, args.output)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if not args.baseline:
+        return 0
+    rows = harness.compare(results, harness.load(args.baseline), args.threshold)
+    regressions = [row for row in rows if row["regressed"]]
+    print(f"\nCompared {len(rows)} metrics against {args.baseline}:", file=sys.stderr)
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "ok"
+        print(f"  {row['metric']:<55} {row['baseline']:>10.2f} -> {row['current']:>10.2f} ms  x{row['ratio']:<6} {flag}",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import contextlib
+import io
+import os
+
+from .harness import benchmark, timed
+
+
+@benchmark("agent_loop", threshold=0.3)
+def agent_loop(quick: bool):
+    """Full chat turns (memory lookup, routing, streaming, a tool call, rendering) against the replay server."""
+    from config_utils import Config
+    from cli import TildeCLI
+    from llm.ollama_backend import OllamaBackend
+    from llm.replay_server import Cassette, ReplayServer, make_exchange
+    from rich.console import Console
+
+    answer = "The current time is shown above. " * 8
+    turns = 3 if quick else 10
+    for token_rate, first_token_delay in ((1000.0, 0.0), (50.0, 0.2)):
+        exchanges = []
+        for _ in range(turns + 1):  # +1 for the warm-up turn
+            exchanges.append(make_exchange(tool_call={"name": "time", "arguments": {"format": "time"}}))
+            exchanges.append(make_exchange(answer))
+        with ReplayServer(Cassette(exchanges=exchanges), token_rate=token_rate, first_token_delay=first_token_delay) as server:
+            cli = TildeCLI()
+            Config.INTENT_FAST_PATH = False  # measure the model path; the fast path has its own metric below
+            cli.llm_backend = OllamaBackend(base_url=server.url, model=Config.OLLAMA_MODEL)
+            cli.console = Console(file=io.StringIO(), force_terminal=False)
+
+            def turn():
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    cli._process_and_get_llm_response("What time is it?")
+
+            yield f"turn_with_tool_call[rate={token_rate:g},ttft={first_token_delay:g}s]", timed(turn, repeat=turns)
+
+    cli = TildeCLI()
+    cli.console = Console(file=io.StringIO(), force_terminal=False)
+    yield "turn_fast_path", timed(lambda: cli._process_and_get_llm_response("What time is it?"), repeat=turns)
@@ -0,0 +1,17 @@
+from .harness import benchmark, timed
+
+
+def synthetic_history(turns: int):
+    roles = ("user", "assistant", "tool")
+    return [{"role": roles[i % 3], "content": f"Turn {i}: " + "lorem ipsum dolor sit amet " * (4 + i % 20)}
+            for i in range(turns)]
+
+
+@benchmark("context")
+def context_window(quick: bool):
+    """Building the prompt window from long session histories."""
+    from cli import TildeCLI
+    cli = TildeCLI()
+    for turns in (1_000, 10_000) if quick else (1_000, 10_000, 100_000):
+        history = synthetic_history(turns)
+        yield f"build_window[{turns} turns]", timed(lambda: cli._get_context_window(history, 2048), repeat=5)
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+from .harness import benchmark, timed
+
+TOPICS = ("python", "rust", "coffee", "hiking", "berlin", "postgres", "vim", "kubernetes", "guitar", "cats")
+
+
+@benchmark("memory")
+def memory_search(quick: bool):
+    """Keyword fact search at increasing memory sizes."""
+    from memory import MemoryManager
+    sizes = (1_000, 10_000, 100_000) if quick else (1_000, 10_000, 100_000, 1_000_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MemoryManager(memory_file=os.path.join(tmp, "memory.json"))
+        for size in sizes:
+            manager.memory = [{"fact": f"User fact {i} about {TOPICS[i % len(TOPICS)]} and item{i}"} for i in range(size)]
+            repeat = 3 if size >= 100_000 else 10
+            yield f"search_facts[{size} facts]", timed(lambda: manager.search_facts("what editor do I use with rust?"), repeat=repeat)
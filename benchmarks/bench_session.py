@@ -0,0 +1,35 @@
+from .bench_context import synthetic_history
+import gc
+import tracemalloc
+
+from .harness import benchmark, measured, timed
+
+
+@benchmark("session", threshold=0.75)  # dominated by disk writes, which are noisy
+def session_io(quick: bool):
+    """Saving and loading large session histories."""
+    from context import Session
+    for turns in (1_000, 10_000) if quick else (1_000, 10_000, 50_000):
+        session = Session(session_id=f"bench-{turns}")
+        session.history = synthetic_history(turns)
+        yield f"save[{turns} turns]", timed(session.save, repeat=3)
+        loaded = Session(session_id=f"bench-{turns}")
+        yield f"load[{turns} turns]", timed(loaded.load, repeat=3)
+
+
+@benchmark("session_memory", threshold=0.1)  # allocation sizes are deterministic
+def session_memory(quick: bool):
+    """Memory held by a long conversation: the store with and without its RAM bound."""
+    from context import Session
+    turns = 20_000 if quick else 100_000
+    roles = ("user", "assistant", "tool")
+    for label, max_ram_bytes in (("unbounded", None), ("bounded", 8 * 1024 * 1024)):
+        gc.collect()
+        tracemalloc.start()
+        session = Session(session_id=f"bench-memory-{label}", max_ram_bytes=max_ram_bytes)
+        for i in range(turns):  # content is created inside the trace, as a real conversation's would be
+            session.add_turn(roles[i % 3], f"Turn {i}: " + "lorem ipsum dolor sit amet " * (4 + i % 20))
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        yield f"history_ram[{label},{turns} turns]", measured(current / 1e6, "MB")
+        session.reset()
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+from .harness import benchmark, timed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = (["--help"], ["help"], ["memory", "list"], ["tool", "list"], ["stats"], ["session", "reset"])
+
+
+@benchmark("startup", threshold=0.5)
+def cold_start(quick: bool):
+    """Wall time of a fresh ``python main.py <subcommand>`` process (daemon disabled)."""
+    env = dict(os.environ, TILDE_NO_DAEMON="1")
+    main = os.path.join(ROOT, "main.py")
+
+    def run(args):
+        subprocess.run([sys.executable, main, "--no-daemon", *args], env=env, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    repeat = 3 if quick else 10
+    yield "python_baseline", timed(lambda: subprocess.run([sys.executable, "-c", "pass"], env=env), repeat=repeat)
+    for args in COMMANDS:
+        yield " ".join(args), timed(lambda: run(args), repeat=repeat)
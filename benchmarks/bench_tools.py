@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+from .harness import benchmark, timed
+
+
+def make_tree(root: str, dirs: int, files_per_dir: int, lines: int = 40):
+    for d in range(dirs):
+        path = os.path.join(root, f"pkg{d // 10}", f"mod{d}")
+        os.makedirs(path, exist_ok=True)
+        for f in range(files_per_dir):
+            ext = ".py" if f % 3 else ".txt"
+            with open(os.path.join(path, f"file{f}{ext}"), 'w') as fh:
+                for i in range(lines):
+                    fh.write(f"def function_{d}_{f}_{i}(value):  # TODO tune\n" if i % 17 == 0 else f"    value = value + {i}\n")
+
+
+@benchmark("tools", threshold=0.5)
+def search_tools(quick: bool):
+    """grep and file_search over a synthetic source tree."""
+    from tools import get_tool
+    grep, file_search = get_tool("grep"), get_tool("file_search")
+    dirs, files_per_dir = (50, 20) if quick else (200, 25)
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, dirs, files_per_dir)
+        label = f"{dirs * files_per_dir} files"
+        yield f"grep[{label}]", timed(lambda: grep.execute(pattern=r"TODO\s+tune", path=root), repeat=5)
+        yield f"grep_include_py[{label}]", timed(lambda: grep.execute(pattern="def function_1_", path=root, include="*.py"), repeat=5)
+        yield f"file_search[{label}]", timed(lambda: file_search.execute(pattern="*.txt", path=root), repeat=5)
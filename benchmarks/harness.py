@@ -0,0 +1,118 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.25  # fail when a metric gets more than 25% slower than the baseline
+
+# name -> (function, threshold); each function takes ``quick`` and yields (metric, samples)
+# where samples are durations in seconds, or a :func:`measured` value such as a memory size.
+_BENCHMARKS: Dict[str, Tuple[Callable[[bool], Iterator[Tuple[str, List[float]]]], float]] = {}
+
+
+def benchmark(name: str, threshold: float = DEFAULT_THRESHOLD):
+    """Register a benchmark generator under ``name``."""
+    def decorator(fn):
+        _BENCHMARKS[name] = (fn, threshold)
+        return fn
+    return decorator
+
+
+MIN_TIME = 0.25  # keep sampling fast functions for at least this long so medians are stable
+MAX_SAMPLES = 1000
+
+
+def timed(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1, min_time: float = MIN_TIME) -> List[float]:
+    """Call ``fn`` after ``warmup`` untimed calls; return at least ``repeat`` durations in seconds.
+
+    Sampling continues past ``repeat`` until ``min_time`` seconds have been measured.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    while len(samples) < repeat or (sum(samples) < min_time and len(samples) < MAX_SAMPLES):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measured(value: float, unit: str) -> Dict[str, Any]:
+    """A single non-timing measurement (lower is better), e.g. ``measured(12.5, "MB")``."""
+    return {"value": round(value, 3), "unit": unit}
+
+
+def summarize_samples(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "value": round(ordered[n // 2] * 1000, 3),  # median, the number compared against baselines
+        "unit": "ms",
+        "min": round(ordered[0] * 1000, 3),
+        "p90": round(ordered[min(n - 1, int(n * 0.9))] * 1000, 3),
+        "samples": n,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(names: List[str] = None, quick: bool = False, log=sys.stderr) -> Dict[str, Any]:
+    """Run the selected benchmarks (all by default) and return the results document."""
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for name, (fn, threshold) in _BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        print(f"[{name}]", file=log, flush=True)
+        for metric, samples in fn(quick):
+            key = f"{name}.{metric}"
+            summary = samples if isinstance(samples, dict) else summarize_samples(samples)
+            metrics[key] = {**summary, "threshold": threshold}
+            print(f"  {metric:<40} {summary['value']:>10.2f} {summary['unit']}", file=log, flush=True)
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = None) -> List[Dict[str, Any]]:
+    """Return one row per metric present in both documents, flagging those slower than allowed."""
+    rows = []
+    for key, current in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(key)
+        if not previous or not previous.get("value"):
+            continue
+        allowed = threshold if threshold is not None else current.get("threshold", DEFAULT_THRESHOLD)
+        ratio = current["value"] / previous["value"]
+        rows.append({"metric": key, "baseline": previous["value"], "current": current["value"],
+                     "ratio": round(ratio, 3), "regressed": ratio > 1 + allowed})
+    return rows
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save(results: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def names() -> List[str]:
+    return list(_BENCHMARKS)
@@ -1,62 +1,236 @@
 import argparse
 import os
+import sys
 import json
-from llm.ollama_backend import OllamaBackend
-from llm.model_adapter import get_model_adapter
-from memory import MemoryManager
-from context import ContextManager, Session
+import threading
+from functools import cached_property
 from config_utils import Config
-from tools import get_all_tools
 from utils import setup_logging
-from rich.console import Console
-from rich.markdown import Markdown
 
 class TildeCLI:
+    """Command-line front end.
+
+    Everything beyond config and the argument parser is built lazily, so subcommands
+    like ``memory list`` or ``help`` never import the LLM backend, rich or the tools
+    they don't use.
+    """
+
     def __init__(self):
-        self.console = Console()
         # Load config from file or env
         Config.load_config()
         setup_logging(Config.LOG_LEVEL)
-        self.llm_backend = OllamaBackend(base_url=Config.OLLAMA_BASE_URL, model=Config.OLLAMA_MODEL)
-        self.model_adapter = get_model_adapter(Config.OLLAMA_MODEL)
-        self.memory_manager = MemoryManager(memory_file=Config.MEMORY_FILE)
-        self.context_manager = ContextManager()
-        self.session = Session()  # Persistent session for chat history
-        self.tools = get_all_tools()
-        # Qwen3:30b tool format
-        self.tool_definitions = self.model_adapter.build_tool_definitions(self.tools)
         # Local tool backend only (no remote execution)
-
         self.backend = self
+        self.parser = self._setup_parser()
+        self._model_show_lock = threading.Lock()
+
+    @cached_property
+    def console(self):
+        from rich.console import Console
+        return Console()
+
+    @cached_property
+    def llm_backend(self):
+        from llm.router import HedgePolicy, create_backend
+        hedging = HedgePolicy(initial_delay=Config.HEDGE_DELAY, budget=Config.HEDGE_BUDGET) if Config.HEDGE else None
+        return create_backend(Config.OLLAMA_BASE_URL, Config.OLLAMA_MODEL, Config.OLLAMA_HEALTH_INTERVAL,
+                              hedging=hedging, keep_alive=Config.keep_alive_for(Config.OLLAMA_MODEL))
+
+    @cached_property
+    def fast_backend(self):
+        """Backend for housekeeping prompts (summaries, tool routing): FAST_MODEL, or the chat model's backend."""
+        if not Config.FAST_MODEL or Config.FAST_MODEL == Config.OLLAMA_MODEL:
+            return self.llm_backend
+        from llm.router import create_backend
+        return create_backend(Config.OLLAMA_BASE_URL, Config.FAST_MODEL, Config.OLLAMA_HEALTH_INTERVAL,
+                              keep_alive=Config.keep_alive_for(Config.FAST_MODEL))
+
+    @cached_property
+    def model_adapter(self):
+        from llm.model_adapter import get_model_adapter
+        return get_model_adapter(Config.OLLAMA_MODEL)
+
+    @cached_property
+    def status(self):
+        from ui import StatusLine
+        return StatusLine()
+
+    @cached_property
+    def memory_manager(self):
+        from memory import MemoryManager
+        return MemoryManager(memory_file=Config.MEMORY_FILE)
+
+    @cached_property
+    def context_manager(self):
+        # A view on the session's turns, not a second copy of them
+        from context import ContextManager
+        return ContextManager(self.session.history)
+
+    @cached_property
+    def session(self):
+        # Persistent session for chat history
+        from context import Session
+        return Session()
+
+    @cached_property
+    def tools(self):
+        from tools import get_all_tools
+        return get_all_tools()
+
+    @cached_property
+    def tool_definitions(self):
+        # Qwen3:30b tool format
+        return self.model_adapter.build_tool_definitions(self.tools)
+
+    @cached_property
+    def tool_router(self):
+        from tools.router import ToolRouter
+        embed_fn = None
+        if Config.EMBED_MODEL:
+            from llm.router import create_backend
+            embed_fn = create_backend(Config.OLLAMA_BASE_URL, Config.EMBED_MODEL, Config.OLLAMA_HEALTH_INTERVAL,
+                                      keep_alive=Config.keep_alive_for(Config.EMBED_MODEL)).get_embedding
+        # With a fast model, messages no keyword or embedding matches are classified by it
+        classify_fn = self._classify_tools if Config.FAST_MODEL else None
+        return ToolRouter(self.tools, core=Config.CORE_TOOLS, embed_fn=embed_fn, classify_fn=classify_fn)
+
+    @cached_property
+    def metrics_recorder(self):
+        from telemetry import MetricsRecorder
+        return MetricsRecorder(prom_file=Config.METRICS_PROM_FILE)
+
+    def _fast_generate(self, purpose: str, prompt: str, **options) -> str:
+        """Run a housekeeping prompt on the fast tier and record it in the turn's metrics."""
+        import time
+        backend = self.fast_backend
+        tier = "primary" if backend is self.llm_backend else "fast"
+        if tier == "primary":
+            options = {**self._model_options(), **options}  # same num_ctx, or the chat model reloads
+        started = time.perf_counter()
+        try:
+            return backend.generate_text(prompt, options=options)
+        finally:
+            metrics = getattr(self, '_turn_metrics', None)
+            if metrics is not None:
+                metrics.add_llm_call(time.perf_counter() - started, None, stats=getattr(backend, 'last_stats', None),
+                                     tier=tier, model=Config.FAST_MODEL or Config.OLLAMA_MODEL, purpose=purpose)
+
+    def _classify_tools(self, message: str):
+        """Ask the fast model which tools ``message`` may need."""
+        import re
+        catalog = "\n".join(f"- {name}: {tool.compact_description}" for name, tool in self.tools.items())
+        prompt = ("Which of these tools could be needed to handle the user's message? "
+                  "Reply with tool names separated by commas, or none.\n"
+                  f"{catalog}\n\nMessage: {message}\nTools:")
+        reply = self._fast_generate("route", prompt, num_predict=64, temperature=0)
+        reply = re.sub(r"<think>.*?(</think>|$)", "", reply, flags=re.S)
+        return [name for name in re.findall(r"[A-Za-z_]+", reply) if name in self.tools]
+
+    @cached_property
+    def intent_matcher(self):
+        from tools.intents import IntentMatcher
+        return IntentMatcher(self.tools, embed_fn=self.tool_router.embed_fn)
+
+    def _answer_locally(self, user_input: str) -> bool:
+        """Answer a message that exactly matches a tool intent by running the tool; False means ask the model."""
+        import time
+        match = self.intent_matcher.match(user_input)
+        if match is None:
+            return False
+        started = time.perf_counter()
+        output = self.backend.execute_tool(self.tools[match.tool], match.parameters)
+        if (isinstance(output, dict) and "error" in output) or (isinstance(output, str) and output.startswith("[Error]")):
+            return False  # e.g. a captured timezone that isn't one; the model can make sense of it
+        metrics = getattr(self, '_turn_metrics', None)
+        if metrics is not None:
+            metrics.add_tool_call(match.tool, time.perf_counter() - started, fast_path=True)
+        from artifacts import compact_output
+        from tools.intents import render_result
+        self.session.add_turn("user", user_input)
+        turn = self.session.add_turn("tool", compact_output(output), tool=match.tool)
+        if getattr(self, '_tool_cache_entry', None) is not None:
+            self._tool_cache_entry.turn = turn
+        self.console.print()
+        self._render_markdown(render_result(output))
+        return True
 
+    def _select_tool_definitions(self, user_input: str):
+        """Pick the tool schemas to send for this turn (all of them when routing is off)."""
+        if not Config.TOOL_ROUTING:
+            return self.tool_definitions
+        recent_tools = [turn["tool"] for turn in self.session.get_recent(6) if turn.get("tool")]
+        definitions = self.tool_router.definitions(self.model_adapter, user_input, recent_tools)
+        import logging
+        logging.debug("Tool routing: %s", self.tool_router.last_stats)
+        return definitions
+
+    @cached_property
+    def system_prompt(self):
         # Add system prompt with tool usage examples and strong tool-use instructions
         base_prompt = self.llm_backend.get_system_prompt() if hasattr(self.llm_backend, 'get_system_prompt') else None
         tool_instruction = (
             "\n\n"
         )
         if base_prompt:
-            self.system_prompt = base_prompt + tool_instruction
-        else:
-            self.system_prompt = tool_instruction
+            return base_prompt + tool_instruction
+        return tool_instruction
 
-        self.parser = self._setup_parser()
+    @cached_property
+    def tool_cache(self):
+        from tools.cache import ToolResultCache
+        return ToolResultCache()
 
     def execute_tool(self, tool, params):
+        # The cache entry behind this call (reused or newly stored), or None; a hit skips the tool.
+        self._tool_cache_entry, self._tool_cache_hit = None, False
+        cacheable = Config.TOOL_RESULT_CACHE and getattr(tool, "read_only", False)
+        if cacheable:
+            entry = self.tool_cache.get(tool, params)
+            if entry is not None:
+                self._tool_cache_entry, self._tool_cache_hit = entry, True
+                return entry.result
         try:
-            return tool.execute(**params)
+            result = tool.execute(**params)
         except TypeError as e:
             return {"error": f"Tool parameter error: {e}"}
         except Exception as e:
             return {"error": f"Tool execution error: {e}"}
+        finally:
+            if getattr(tool, "writes_files", False):
+                self.tool_cache.invalidate()
+        if cacheable:
+            self._tool_cache_entry = self.tool_cache.put(tool, params, result)
+        return result
+
+    def _tool_output_text(self, tool_name, output) -> str:
+        """Tool output as the model sees it: large outputs go to the artifact store as a preview and handle."""
+        from artifacts import INLINE_LIMIT, compact_output
+        return compact_output(output, limit=self.tools[tool_name].inline_limit or INLINE_LIMIT)
+
+    def _in_context(self, turn) -> bool:
+        """Whether ``turn`` was inside the history window of the last request."""
+        from llm.tokens import MESSAGE_OVERHEAD_TOKENS
+        budget, total = getattr(self, '_history_budget', 0), 0
+        for msg in reversed(self.session.history):
+            total += self.token_counter.scale(msg.tokens) + MESSAGE_OVERHEAD_TOKENS
+            if total > budget:
+                return False
+            if msg is turn:
+                return True
+        return False
 
     def _setup_parser(self):
         parser = argparse.ArgumentParser(description="Tilde CLI - A Python-based command-line assistant.")
         parser.add_argument('--remote', type=str, help='Remote SSH server in user@host[:key_path] format')
+        parser.add_argument('--profile-startup', action='store_true', help='Report per-module import cost for this command.')
+        parser.add_argument('--no-daemon', action='store_true', help='Run in this process even if a tilde daemon is running.')
         subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
         # Chat command
         chat_parser = subparsers.add_parser("chat", help="Start an interactive chat session with the LLM.")
         chat_parser.add_argument("prompt", nargs='?', help="Initial prompt for the chat session.")
+        chat_parser.add_argument("--once", action="store_true", help="Answer the prompt and exit instead of starting a session.")
+        chat_parser.add_argument("--no-fast-path", action="store_true", help="Send every message to the model, even ones a tool can answer directly.")
 
         # Memory commands
         memory_parser = subparsers.add_parser("memory", help="Manage long-term memory.")
@@ -83,6 +257,10 @@ class TildeCLI:
 
         tool_list_parser = tool_subparsers.add_parser("list", help="List all available tools.")
 
+        tool_route_parser = tool_subparsers.add_parser("route", help="Show which tools would be offered for a message.")
+        tool_route_parser.add_argument("message", nargs="?", default=None, help="The user message to route.")
+        tool_route_parser.add_argument("--eval", action="store_true", help="Run the fixed routing evaluation set.")
+
         # Add a top-level help command
         help_parser = subparsers.add_parser("help", help="Show help for commands or tools.")
         help_parser.add_argument("topic", nargs="?", default=None, help="Command or tool name to get help for.")
@@ -94,13 +272,38 @@ class TildeCLI:
         session_subparsers.add_parser("load", help="Load a session")
         session_subparsers.add_parser("reset", help="Reset current session")
 
+        # Model preloading
+        warm_parser = subparsers.add_parser("warm", help="Load models into the model server's memory ahead of use.")
+        warm_parser.add_argument("models", nargs="*", help="Models to load (default: chat, embedding and WARM_MODELS).")
+        warm_parser.add_argument("--keep-alive", help="How long to keep them loaded (e.g. 30m, 2h, -1 for forever).")
+
+        # Workspace code index for the code_search tool
+        index_parser = subparsers.add_parser("index", help="Index the workspace's code for the code_search tool (needs EMBED_MODEL).")
+        index_parser.add_argument("path", nargs="?", default=".", help="Workspace root to index (default: current directory).")
+        index_parser.add_argument("--rebuild", action="store_true", help="Re-embed every file, not just the changed ones.")
+
+        # Turn telemetry
+        stats_parser = subparsers.add_parser("stats", help="Show latency and throughput percentiles from recent sessions.")
+        stats_parser.add_argument("--sessions", type=int, default=20, help="Number of recent sessions to include (default: 20).")
+        stats_parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+        # Resident daemon commands
+        daemon_parser = subparsers.add_parser("daemon", help="Run a resident tilde process for instant one-shot commands.")
+        daemon_subparsers = daemon_parser.add_subparsers(dest="daemon_command")
+        daemon_start_parser = daemon_subparsers.add_parser("start", help="Start the daemon in the background.")
+        daemon_start_parser.add_argument("--foreground", action="store_true", help="Run in this terminal instead of detaching.")
+        daemon_subparsers.add_parser("stop", help="Stop the running daemon.")
+        daemon_subparsers.add_parser("status", help="Show whether the daemon is running.")
+
         return parser
 
-    def run(self):
-        args = self.parser.parse_args()
+    def run(self, argv=None):
+        args = self.parser.parse_args(argv)
+        return self.dispatch(args)
 
+    def dispatch(self, args):
         if args.command == "chat":
-            self._handle_chat(args.prompt)
+            self._handle_chat(args.prompt, once=args.once, force_model=args.no_fast_path)
         elif args.command == "memory":
             self._handle_memory_command(args)
         elif args.command == "tool":
@@ -110,11 +313,25 @@ class TildeCLI:
         elif args.command == "session":
             self._handle_session_command(args)
             return
+        elif args.command == "warm":
+            return self._handle_warm_command(args)
+        elif args.command == "index":
+            return self._handle_index_command(args)
+        elif args.command == "stats":
+            self._handle_stats_command(args)
+        elif args.command == "daemon":
+            return self._handle_daemon_command(args)
         else:
             self.parser.print_help()
 
-    def _handle_chat(self, initial_prompt: str = None):
+    def _handle_chat(self, initial_prompt: str = None, once: bool = False, force_model: bool = False):
+        if once:
+            if initial_prompt:
+                self._process_and_get_llm_response(initial_prompt, force_model=force_model)
+            return
         print("Starting chat session. Type 'exit' to quit.")
+        # Load the model while prompt_toolkit and memory are set up
+        warmup = self._start_warmup() if Config.WARMUP else None
         prompt_str = "\033[1;32m\033[1m~\033[0m "
         session = None
         use_ansi = False
@@ -127,9 +344,12 @@ class TildeCLI:
             use_ansi = True
         except ImportError:
             print("prompt_toolkit is not installed. Please install it for advanced input features.")
+        self.memory_manager
+        if warmup is not None:
+            self._report_warmup(warmup)
 
         if initial_prompt:
-            self._process_and_get_llm_response(initial_prompt)
+            self._process_and_get_llm_response(initial_prompt, force_model=force_model)
 
         while True:
             try:
@@ -142,64 +362,238 @@ class TildeCLI:
                     user_input = input(prompt_str)
                 if user_input.lower() == 'exit':
                     break
-                self._process_and_get_llm_response(user_input)
+                self._process_and_get_llm_response(user_input, force_model=force_model)
             except EOFError:
                 print("\nExiting Tilde CLI.")
                 break
 
-    def _process_and_get_llm_response(self, user_input: str):
+    def _start_warmup(self):
+        """Check /api/ps and preload the chat model on a background thread; returns its status dict."""
+        import time
+        status = {"model": Config.OLLAMA_MODEL, "checked": threading.Event()}
+        # cached_property isn't thread-safe: build the backend here, not on the warm-up thread while
+        # the main thread may be building it too. The options wait for /api/show, so they are
+        # resolved on the thread (model_show takes a lock for that).
+        backend = self.llm_backend
+
+        def warm():
+            try:
+                from llm.ollama_backend import model_in
+                status["was_loaded"] = model_in(backend.list_running_models(), Config.OLLAMA_MODEL)
+            except Exception as e:
+                status["error"] = e
+                return
+            finally:
+                status["checked"].set()
+            if not status["was_loaded"]:
+                started = time.perf_counter()
+                try:
+                    backend.preload(Config.OLLAMA_MODEL, keep_alive=Config.keep_alive_for(Config.OLLAMA_MODEL),
+                                    options=self._model_options())
+                    status["load_seconds"] = time.perf_counter() - started
+                except Exception as e:
+                    status["error"] = e
+
+        threading.Thread(target=warm, daemon=True).start()
+        return status
+
+    def _report_warmup(self, status, timeout: float = 1.0):
+        if not status["checked"].wait(timeout):
+            return
+        if "error" in status:
+            print(f"Could not reach the model server: {status['error']}")
+        elif status["was_loaded"]:
+            print(f"Model {status['model']} is loaded and ready.")
+        else:
+            print(f"Loading model {status['model']} in the background...")
+
+    def cancel_turn(self):
+        """Abort the running turn from another thread, as Ctrl-C does in the terminal (used by the daemon).
+
+        The model request in flight is cancelled and no further steps run; a tool
+        that is already running finishes first.
+        """
+        self._turn_cancelled = True
+        stream = getattr(self, '_response_stream', None)
+        if stream is not None:
+            stream.cancel()
+
+    def _process_and_get_llm_response(self, user_input: str, force_model: bool = False):
         # Search for relevant facts based on the user's input
         relevant_facts = self.memory_manager.search_facts(user_input)
-        relevant_fact_strings = [fact["fact"] for fact in relevant_facts]
-
-        # Prepend relevant facts to the user's input for the current turn
-        if relevant_fact_strings:
-            memory_prefix = "Here is some relevant information from your memory: " + "; ".join(relevant_fact_strings) + "\n\n"
-            user_input = memory_prefix + user_input
-        # Add the modified user input to the conversation history
-        self.context_manager.add_message("user", user_input)
-        self.session.add_turn("user", user_input)
-        self._get_llm_response(call_depth=0)
+        # Facts ride along with this turn's requests only (see _get_llm_response); history keeps what the user typed
+        self._turn_facts = [fact["fact"] for fact in relevant_facts]
+        self._turn_metrics = None
+        if Config.METRICS:
+            from telemetry import TurnMetrics
+            self._turn_metrics = TurnMetrics()
+        fast_path = False
+        try:
+            # ``force_model`` (chat --no-fast-path) applies to this call only; the daemon shares Config
+            if Config.INTENT_FAST_PATH and not force_model and self._answer_locally(user_input):
+                fast_path = True
+                return
+            self._turn_tool_definitions = self._select_tool_definitions(user_input)
+            self.session.add_turn("user", user_input)
+            self._get_llm_response(call_depth=0)
+        finally:
+            if self._turn_metrics is not None:
+                routing = self.tool_router.last_stats if Config.TOOL_ROUTING and not fast_path else {}
+                record = self._turn_metrics.finish(model=Config.OLLAMA_MODEL, fast_path=fast_path,
+                                                   routing_saved_tokens=routing.get("saved_tokens"))
+                self.metrics_recorder.write(record)
+                self._turn_metrics = None
+            self._turn_facts = []
+
+    @cached_property
+    def model_show(self):
+        """The server's description of the chat model (/api/show), or {} if it can't be had."""
+        # The warm-up thread may be asking at the same time; only one of them calls the server.
+        with self._model_show_lock:
+            if getattr(self, "_model_show", None) is None:
+                try:
+                    self._model_show = self.llm_backend.show(Config.OLLAMA_MODEL)
+                except Exception:
+                    self._model_show = {}
+            return self._model_show
+
+    @cached_property
+    def model_capabilities(self):
+        """Capabilities the server reports for the chat model, or None if it doesn't say."""
+        capabilities = self.model_show.get("capabilities")
+        return set(capabilities) if capabilities is not None else None
+
+    @cached_property
+    def model_info(self):
+        from llm.tokens import ModelInfo
+        return ModelInfo(self.model_show)
+
+    @cached_property
+    def num_ctx(self):
+        """Context size requested for the chat model (None leaves the server's default)."""
+        return self.model_info.resolve_num_ctx(Config.NUM_CTX, Config.MAX_NUM_CTX)
+
+    @cached_property
+    def token_counter(self):
+        from llm.tokens import TokenCounter
+        return TokenCounter.for_model(self.model_info)
+
+    def _model_options(self):
+        """Ollama ``options`` for every request to the chat model; they must match, or the server reloads it."""
+        return {"num_ctx": self.num_ctx} if self.num_ctx else {}
+
+    def _context_budget(self, system_prompt, tool_definitions):
+        from llm.tokens import ContextBudget, DEFAULT_CONTEXT_LENGTH
+        counter = self.token_counter
+        num_ctx = self.num_ctx or DEFAULT_CONTEXT_LENGTH
+        return ContextBudget(
+            num_ctx,
+            system=counter.count(system_prompt),
+            tools=counter.count(json.dumps(tool_definitions)) if tool_definitions else 0,
+            retrieval=Config.RETRIEVAL_MAX_TOKENS,
+            output=min(Config.OUTPUT_RESERVE_TOKENS, num_ctx // 4),
+        )
+
+    def _chat_options(self, tool_definitions):
+        """Return (tools, extra chat options, extra system text) for the chat model's capabilities.
 
-    def _get_llm_response(self, call_depth=0, max_depth=5, _force_system_only=False):
+        Thinking models get Ollama's ``think`` option so reasoning arrives separately from the
+        answer. Models without native tool calling get a JSON-schema ``format`` constraint
+        and the tool list in the system prompt, so replies are always a well-formed tool call
+        or answer.
+        """
+        capabilities = self.model_capabilities
+        options = {}
+        if capabilities is None:
+            return tool_definitions, options, ""
+        if Config.NATIVE_THINK and "thinking" in capabilities:
+            options["think"] = True
+        if Config.STRUCTURED_OUTPUT and "tools" not in capabilities:
+            names = {d["function"]["name"] for d in tool_definitions}
+            tools = {name: tool for name, tool in self.tools.items() if name in names}
+            options["format"] = self.model_adapter.structured_output_schema(tools)
+            return None, options, self.model_adapter.structured_output_instructions(tools)
+        return tool_definitions, options, ""
+
+    def _get_llm_response(self, call_depth=0, max_depth=5, _retry_instruction=None):
         if call_depth > max_depth:
             print(f"[Warning] Maximum tool execution recursion depth ({max_depth}) reached. Aborting further tool calls.")
             return
-        max_tokens = 2048
-        if _force_system_only:
-            messages = [{"role": "system", "content": self.system_prompt}]
-        else:
-            messages = self._get_context_window(self.session.history, max_tokens)
-            # Insert system prompt as first message if available
-            if self.system_prompt:
-                messages = ([{"role": "system", "content": self.system_prompt}] + messages)
+        if getattr(self, '_turn_cancelled', False):
+            return
+        import time
+        metrics = getattr(self, '_turn_metrics', None)
+        context_started = time.perf_counter()
+        tool_definitions = getattr(self, '_turn_tool_definitions', None) or self.tool_definitions
+        tool_definitions, chat_options, extra_system = self._chat_options(tool_definitions)
+        system_prompt = self.system_prompt + ("\n\n" + extra_system if extra_system else "")
+        # History gets whatever the model's window leaves after the other parts and the reply
+        budget = self._context_budget(system_prompt, tool_definitions)
+        messages = self._get_context_window(self.session.history, budget.history, self.token_counter)
+        self._history_budget = budget.history
+        # Retrieved facts get their own budget and go just before this turn's user message,
+        # so the cached prompt prefix (system prompt + earlier history) stays the same.
+        from context import retrieval_block
+        retrieval = retrieval_block(getattr(self, '_turn_facts', []), messages, budget.retrieval)
+        if retrieval is not None:
+            last_user = next((i for i in range(len(messages) - 1, -1, -1) if messages[i]["role"] == "user"), len(messages))
+            messages.insert(last_user, retrieval)
+        # Insert system prompt as first message if available
+        if system_prompt:
+            messages = ([{"role": "system", "content": system_prompt}] + messages)
+        if _retry_instruction:
+            # Retries keep the whole conversation and add the correction at the end
+            messages.append({"role": "system", "content": _retry_instruction})
+        if self._model_options():
+            chat_options["options"] = self._model_options()
+        from utils import estimate_tokens
+        prompt_estimate = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        if tool_definitions:
+            prompt_estimate += estimate_tokens(json.dumps(tool_definitions))
+        if metrics is not None:
+            metrics.add_context_build(time.perf_counter() - context_started)
         # DEBUG: Log prompt sent to LLM at debug level
         import logging
         prompt_debug = "\n--- LLM PROMPT ---\n" + "\n".join(f"{m['role']}: {m['content']}" for m in messages) + "\n-------------------\n"
         logging.debug(prompt_debug)
 
-        import threading
-        import time
-        stop_spinner = threading.Event()
-        spinner_thread = threading.Thread(target=self._spinner, args=(stop_spinner,))
-        spinner_thread.start()
-        timeout_seconds = 60
         response_exception = [None]
         result_holder = {}
-        def llm_worker():
+        from llm.backend import ThinkingChunk
+        from llm.stream import DeadlineStream, StreamTimeout
+        # The HTTP call runs on the stream's reader thread, so every wait is bounded by a deadline
+        # and cancelling closes the connection (the server stops generating).
+        response_stream = DeadlineStream(
+            lambda: self.llm_backend.chat(messages, tools=tool_definitions, stream=True, **chat_options),
+            first_token=Config.LLM_FIRST_TOKEN_TIMEOUT, idle=Config.LLM_IDLE_TIMEOUT, total=Config.LLM_TOTAL_TIMEOUT,
+        )
+        def read_response():
             try:
-                response_generator = self.llm_backend.chat(messages, tools=self.tool_definitions, stream=True)
+                call_started = time.perf_counter()
+                first_chunk_at = None
+                response_generator = response_stream
                 full_response_content = ""
                 tool_call = None
                 hide_think = getattr(Config, 'HIDE_THINK', True)
                 in_think_block = False
                 # DEBUG: Capture raw LLM response
                 raw_chunks = []
+                thinking = []
                 for tool_call_candidate, text_chunk in self.model_adapter.parse_response_stream(response_generator):
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                        self.status.update(phase="generating")
                     if tool_call_candidate:
+                        self.status.update(phase="calling a tool")
                         tool_call = tool_call_candidate
                         break
+                    if isinstance(text_chunk, ThinkingChunk):
+                        # Reasoning the server separated out (native ``think``)
+                        self.status.update(phase="thinking", tokens=1)
+                        thinking.append(str(text_chunk))
+                        continue
                     if text_chunk is not None:
+                        self.status.update(phase="generating", tokens=1)
                         raw_chunks.append(str(text_chunk))
                         text = str(text_chunk)
                         if hide_think:
@@ -224,19 +618,61 @@ class TildeCLI:
                                 continue
                         if not in_think_block:
                             full_response_content += text
+                repaired = False
+                if tool_call is None and "format" in chat_options:
+                    tool_call, answer = self.model_adapter.parse_structured_response(full_response_content)
+                    full_response_content = answer or ""
+                elif tool_call is None:
+                    # Tool call written out as JSON text instead of a native call
+                    candidate = self.model_adapter.extract_tool_call(full_response_content)
+                    if candidate is not None and candidate["tool_name"] in self.tools:
+                        tool_call, repaired = candidate, True
+                if thinking and not hide_think:
+                    full_response_content = "<think>" + "".join(thinking) + "</think>\n\n" + full_response_content
                 result_holder['tool_call'] = tool_call
                 result_holder['full_response_content'] = full_response_content
                 result_holder['raw_llm_response'] = ''.join(raw_chunks)
+                stats = getattr(self.llm_backend, 'last_stats', None) or {}
+                if stats.get("prompt_eval_count"):
+                    self.token_counter.calibrate(prompt_estimate, stats["prompt_eval_count"])
+                if metrics is not None:
+                    metrics.add_llm_call(
+                        time.perf_counter() - call_started,
+                        first_chunk_at - call_started if first_chunk_at is not None else None,
+                        stats=stats,
+                        prompt_tokens_estimate=self.token_counter.scale(prompt_estimate),
+                        num_ctx=budget.num_ctx,
+                        history_budget=budget.history,
+                        tool_call=bool(tool_call),
+                        tier="primary",
+                        retry=bool(_retry_instruction),
+                        retrieval_tokens=estimate_tokens(retrieval["content"]) if retrieval else 0,
+                        structured="format" in chat_options,
+                        repaired_tool_call=repaired,
+                        **getattr(self.llm_backend, 'last_hedge', {}),
+                    )
             except Exception as e:
                 response_exception[0] = e
 
-        llm_thread = threading.Thread(target=llm_worker)
-        llm_thread.start()
-        llm_thread.join(timeout_seconds)
-        stop_spinner.set()
-        spinner_thread.join()
-        if llm_thread.is_alive():
-            self.console.print("\n[red]Error: LLM backend timed out after 60 seconds.[/red]")
+        # The stream is read on this thread; the status line disappears as soon as it ends.
+        self.status.start(f"step {call_depth + 1}" if call_depth else "")
+        interrupted = False
+        self._response_stream = response_stream
+        if getattr(self, '_turn_cancelled', False):
+            response_stream.cancel()  # cancel_turn() ran before the stream was published
+        try:
+            read_response()
+        except KeyboardInterrupt:
+            interrupted = True
+            response_stream.cancel()
+        finally:
+            self._response_stream = None
+            self.status.stop()
+        if interrupted or response_stream.cancelled:
+            self.console.print("\n[yellow]Cancelled.[/yellow]")
+            return
+        if isinstance(response_exception[0], StreamTimeout):
+            self.console.print(f"\n[red]Error: {response_exception[0]}; the request was cancelled.[/red]")
             return
         if response_exception[0] is not None:
             self.console.print(f"Error communicating with LLM: {response_exception[0]}")
@@ -252,7 +688,6 @@ class TildeCLI:
             parameters = tool_call.get("parameters", {})
             if tool_name not in self.tools:
                 self.console.print(f"[Warning] LLM requested unknown tool: '{tool_name}'. Registered tools: {list(self.tools.keys())}")
-                self.context_manager.add_message("assistant", f"[Warning] LLM requested unknown tool: '{tool_name}'.")
                 self.session.add_turn("assistant", f"[Warning] LLM requested unknown tool: '{tool_name}'.")
                 return
             # Prevent repeated think_toggle calls for the same value in a single turn
@@ -275,16 +710,31 @@ class TildeCLI:
             # For LLM-initiated shell tool calls, skip confirmation
             if tool_name == "shell" and "require_confirmation" not in expanded_parameters:
                 expanded_parameters["require_confirmation"] = False
+            tool_started = time.perf_counter()
             tool_output = self.backend.execute_tool(self.tools[tool_name], expanded_parameters)
-            self.console.print(f"Tilde (tool output): {tool_output}")
+            entry = getattr(self, '_tool_cache_entry', None)
+            repeated = getattr(self, '_tool_cache_hit', False) and entry.turn is not None and self._in_context(entry.turn)
+            if metrics is not None:
+                metrics.add_tool_call(tool_name, time.perf_counter() - tool_started,
+                                      error=isinstance(tool_output, dict) and "error" in tool_output,
+                                      cached=getattr(self, '_tool_cache_hit', False))
+            if repeated:
+                # The model can still see the earlier result, so point at it instead of repeating it
+                self.console.print("[dim](files unchanged; same result as the earlier call)[/dim]", highlight=False)
+                self.session.add_turn("tool", f"[Identical to the earlier {tool_name} result for these arguments above; "
+                                      "the files it read have not changed.]", tool=tool_name)
+                self._get_llm_response(call_depth=call_depth+1, max_depth=max_depth)
+                return
+            tool_output_text = self._tool_output_text(tool_name, tool_output)
+            self.console.print(f"Tilde (tool output): {tool_output_text}")
             # For think_toggle, add a state message to the conversation so LLM sees the effect
             if tool_name == "think_toggle":
                 state_msg = f"<think> sections are now {'shown' if not getattr(Config, 'HIDE_THINK', True) else 'hidden'}."
-                self.context_manager.add_message("tool", str(tool_output) + "\n" + state_msg)
-                self.session.add_turn("tool", str(tool_output) + "\n" + state_msg, tool=tool_name)
+                self.session.add_turn("tool", tool_output_text + "\n" + state_msg, tool=tool_name)
             else:
-                self.context_manager.add_message("tool", str(tool_output))
-                self.session.add_turn("tool", str(tool_output), tool=tool_name)
+                turn = self.session.add_turn("tool", tool_output_text, tool=tool_name)
+                if entry is not None:
+                    entry.turn = turn
             self._get_llm_response(call_depth=call_depth+1, max_depth=max_depth)
         else:
             # Check if the response contains only <think> sections (or is empty/whitespace)
@@ -292,17 +742,16 @@ class TildeCLI:
             content_no_think = re.sub(r'<think>[\s\S]*?</think>', '', full_response_content, flags=re.IGNORECASE).strip()
             if getattr(Config, 'HIDE_THINK', True):
                 if not content_no_think:
-                    # Only <think> section or empty: retry with ONLY the strict warning as the system prompt, no other context
+                    # Only <think> section or empty: retry once with the full conversation plus a strict warning
+                    if _retry_instruction:
+                        self.console.print("[red]The model returned no answer.[/red]")
+                        return
                     retry_instruction = (
                         "IMPORTANT: You are NOT allowed to respond with only a <think> section or internal reasoning. "
                         "Your response MUST include either a tool call or a user-facing answer outside of <think> tags, as plain text or by presenting the tool's output. "
                         "If you do not call a tool, or if your response is only a <think> section, your response will be ignored. This is your last chance before aborting."
                     )
-                    original_system_prompt = self.system_prompt
-                    self.system_prompt = retry_instruction
-                    # Call LLM with only the strict system prompt, no user or chat history
-                    self._get_llm_response(call_depth=call_depth+1, max_depth=max_depth, _force_system_only=True)
-                    self.system_prompt = original_system_prompt
+                    self._get_llm_response(call_depth=call_depth+1, max_depth=max_depth, _retry_instruction=retry_instruction)
                     return
             # Render the full response as markdown at once for proper formatting
             self.console.print()
@@ -310,51 +759,28 @@ class TildeCLI:
             # Show a subtle status if <think> sections are currently hidden
             if getattr(Config, 'HIDE_THINK', True):
                 self.console.print("[dim][Hint: <think> sections hidden][/dim]", highlight=False)
-            self.context_manager.add_message("assistant", full_response_content)
             self.session.add_turn("assistant", full_response_content)
 
-    def _spinner(self, stop_event):
-        import itertools
-        import time
-        import sys
-        # Alternate between two emoji faces for animation
-        emoji1 = "🤔"
-        emoji2 = "⏳"
-        spinner_icons = [emoji1, emoji2]
-        for icon in itertools.cycle(spinner_icons):
-            if stop_event.is_set():
-                break
-            sys.stdout.write(f"\r\033[33mTilde is thinking {icon}\033[0m")
-            sys.stdout.flush()
-            time.sleep(0.8)  # Spinner: set to 0.8 seconds
-        sys.stdout.write("\r" + " " * 40 + "\r")
-        sys.stdout.flush()
-
     def _render_markdown(self, text):
         # Try to render as markdown, fallback to plain text if not valid
+        from rich.markdown import Markdown
         try:
             self.console.print(Markdown(text))
         except Exception:
             self.console.print(text)
 
-    def _get_context_window(self, history, max_tokens):
-        # Use tiktoken to count tokens (or fallback to word count if not available)
-        try:
-            import tiktoken
-            enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            def count_tokens(msgs):
-                return sum(len(enc.encode(m.get("content", ""))) for m in msgs)
-        except ImportError:
-            def count_tokens(msgs):
-                return sum(len(m.get("content", "").split()) for m in msgs)
-        except Exception:
-            def count_tokens(msgs):
-                return sum(len(m.get("content", "").split()) for m in msgs)
+    def _get_context_window(self, history, max_tokens, counter=None):
+        from context import Turn
+        from llm.tokens import MESSAGE_OVERHEAD_TOKENS, TokenCounter
+        counter = counter or TokenCounter()
         # Start from the most recent, add until token limit
         window = []
         total = 0
         for msg in reversed(history):
-            tokens = count_tokens([msg])
+            if isinstance(msg, Turn):
+                tokens = counter.scale(msg.tokens) + MESSAGE_OVERHEAD_TOKENS
+            else:
+                tokens = counter.count(msg.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
             if total + tokens > max_tokens:
                 break
             window.insert(0, msg)
@@ -363,7 +789,7 @@ class TildeCLI:
         if total > max_tokens and len(window) > 2:
             summary = self._summarize_turns(window[:-2])
             window = [summary] + window[-2:]
-        return window
+        return [msg.as_dict() if isinstance(msg, Turn) else msg for msg in window]
 
     def _summarize_turns(self, turns):
         # Improved summarization: if too long, call LLM to summarize, else concatenate
@@ -374,7 +800,7 @@ class TildeCLI:
                 summary_prompt = (
                     "Summarize the following conversation in 2-3 sentences, preserving important facts, context, and user intent.\n" + text[:2000]
                 )
-                summary = self.llm_backend.generate_text(summary_prompt, max_tokens=128, temperature=0.2)
+                summary = self._fast_generate("summarize", summary_prompt, num_predict=128, temperature=0.2)
                 if len(summary) > 400:
                     summary = summary[:400] + "..."
                 return {"role": "system", "content": f"Summary of earlier conversation: {summary}"}
@@ -440,6 +866,27 @@ class TildeCLI:
                     return
             result = tool.execute(**params_dict)
             print(f"Result: {result}")
+        elif args.tool_command == "route":
+            from tools.router import evaluate
+            if args.eval:
+                result = evaluate(self.tool_router, self.model_adapter)
+                print(f"Routing evaluation over {result['cases']} messages:")
+                print(f"  recall:            {result['recall']:.0%}")
+                print(f"  all tools:         ~{result['full_tokens']} tokens")
+                print(f"  avg tools sent:    ~{result['avg_selected_tokens']:.0f} tokens")
+                print(f"  avg tokens saved:  ~{result['avg_saved_tokens']:.0f} per request")
+                for message, expected, selected in result["misses"]:
+                    print(f"  miss: '{message}' expected {expected}, got {selected}")
+            elif args.message:
+                self.tool_router.definitions(self.model_adapter, args.message)
+                stats = self.tool_router.last_stats
+                print(f"Selected tools: {', '.join(stats['selected'])}")
+                print(f"Tool schema tokens: ~{stats['selected_tokens']} of ~{stats['full_tokens']} (saved ~{stats['saved_tokens']})")
+                match = self.intent_matcher.match(args.message)
+                if match is not None:
+                    print(f"Fast path: {match.tool} {json.dumps(match.parameters)} (matched '{match.phrase}', score {match.score:.2f})")
+            else:
+                print("Provide a message or --eval.")
         elif args.tool_command == "list":
             from tools import get_tool_schema
             print("Available tools:")
@@ -458,10 +905,9 @@ class TildeCLI:
             print("\nUse 'help <command>' or 'help <tool>' for more details.")
         else:
             # Check if topic is a tool
-            from tools import get_all_tools, get_tool_schema
-            tools = get_all_tools()
-            if topic in tools:
-                tool = tools[topic]
+            from tools import get_tool
+            tool = get_tool(topic)
+            if tool is not None:
                 schema = tool.to_dict()
                 print(f"Tool: {schema['name']}")
                 print(f"Description: {schema['description']}")
@@ -490,5 +936,122 @@ class TildeCLI:
             self.session.reset()
             print("Session reset.")
 
+    def _handle_warm_command(self, args):
+        import time
+        from llm.ollama_backend import model_in
+        models = args.models or list(dict.fromkeys(m for m in [Config.OLLAMA_MODEL, Config.FAST_MODEL, Config.EMBED_MODEL, *Config.WARM_MODELS] if m))
+        try:
+            loaded = self.llm_backend.list_running_models()
+        except Exception as e:
+            print(f"Error: cannot reach the model server: {e}")
+            return 1
+        failed = 0
+        for model in models:
+            if model_in(loaded, model) and args.keep_alive is None:
+                print(f"{model}: already loaded")
+                continue
+            started = time.perf_counter()
+            try:
+                options = self._model_options() if model == Config.OLLAMA_MODEL else None
+                self.llm_backend.preload(model, keep_alive=args.keep_alive or Config.keep_alive_for(model), options=options)
+                print(f"{model}: loaded in {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                failed += 1
+                print(f"{model}: failed to load ({e})")
+        return 1 if failed else 0
+
+    def _handle_index_command(self, args):
+        import time
+        from code_index import CodeIndex
+        if not Config.EMBED_MODEL:
+            print("Error: set EMBED_MODEL (e.g. nomic-embed-text) to build the code index.")
+            return 1
+        from llm.router import create_backend
+        backend = create_backend(Config.OLLAMA_BASE_URL, Config.EMBED_MODEL, Config.OLLAMA_HEALTH_INTERVAL,
+                                 keep_alive=Config.keep_alive_for(Config.EMBED_MODEL))
+        index = CodeIndex(args.path)
+        started = time.perf_counter()
+
+        def progress(done, total):
+            print(f"\rEmbedding chunks: {done}/{total}", end="", flush=True)
+
+        try:
+            stats = index.build(Config.EMBED_MODEL, backend.get_embeddings, rebuild=args.rebuild, progress=progress)
+        except Exception as e:
+            print(f"\nError: indexing failed: {e}")
+            return 1
+        if stats["embedded_chunks"]:
+            print()
+        print(f"Indexed {stats['files']} files ({stats['chunks']} chunks) in {index.root}: "
+              f"embedded {stats['embedded_chunks']} chunks from {stats['embedded_files']} new or changed files, "
+              f"dropped {stats['removed_files']} removed files, in {time.perf_counter() - started:.1f}s.")
+
+    def _handle_stats_command(self, args):
+        from telemetry import load_records, summarize, METRICS_FILE
+        records = load_records(sessions=args.sessions)
+        if not records:
+            print(f"No turn metrics recorded yet ({METRICS_FILE}).")
+            return
+        summary = summarize(records)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+            return
+        sessions = len({r.get("session") for r in records})
+        print(f"{len(records)} turns from {sessions} session(s):")
+        print(f"  {'metric':<28}{'count':>7}{'p50':>11}{'p90':>11}{'p99':>11}")
+        for name, row in summary.items():
+            print(f"  {name:<28}{row['count']:>7}" + "".join(f"{row[p]:>11.1f}" for p in ("p50", "p90", "p99")))
+        calls = [c for r in records for c in r.get("llm_calls", [])]
+        retries = sum(1 for c in calls if c.get("retry"))
+        if calls:
+            print(f"  retried LLM calls: {retries} of {len(calls)} ({retries / len(calls):.1%})")
+        fast = sum(1 for r in records if r.get("fast_path"))
+        if fast:
+            print(f"  answered without the model: {fast} of {len(records)} turns ({fast / len(records):.1%})")
+        tool_calls = [t for r in records for t in r.get("tools", [])]
+        reused = sum(1 for t in tool_calls if t.get("cached"))
+        if reused:
+            print(f"  tool results reused: {reused} of {len(tool_calls)} tool calls ({reused / len(tool_calls):.1%})")
+        hedged = [c for c in calls if c.get("hedged")]
+        if hedged:
+            won = sum(1 for c in hedged if c.get("hedge_won"))
+            print(f"  hedged requests: {len(hedged)} of {len(calls)} ({len(hedged) / len(calls):.1%}), hedge won {won}")
+
+    def _handle_daemon_command(self, args):
+        import daemon
+        if args.daemon_command == "start":
+            if daemon.ping() is not None:
+                print("Tilde daemon is already running.")
+                return 0
+            if args.foreground:
+                daemon.TildeDaemon(cli=self).serve_forever()
+                return 0
+            pid = daemon.spawn(os.path.abspath(sys.argv[0]))
+            print(f"Tilde daemon started (pid {pid}), listening on {daemon.SOCKET_PATH}." if pid else "Tilde daemon failed to start; see ~/.tilde-cli/daemon.log.")
+            return 0 if pid else 1
+        elif args.daemon_command == "stop":
+            print("Tilde daemon stopped." if daemon.stop() else "Tilde daemon is not running.")
+        elif args.daemon_command == "status":
+            status = daemon.ping()
+            if status is None:
+                print("Tilde daemon is not running.")
+            else:
+                print(f"Tilde daemon running (pid {status['pid']}, up {status['uptime']:.0f}s, {status['requests']} requests served).")
+        else:
+            print("Usage: daemon <start|stop|status>")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--profile-startup" in argv:
+        from utils import profile_startup
+        return profile_startup(os.path.abspath(sys.argv[0]), [a for a in argv if a != "--profile-startup"])
+    if "--no-daemon" not in argv:
+        import daemon
+        if daemon.should_forward(argv):
+            exit_code = daemon.forward(argv)
+            if exit_code is not None:
+                return exit_code
+    return TildeCLI().run(argv)
+
 if __name__ == "__main__":
-    TildeCLI().run()
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Workspace code index: file chunks embedded with ``EMBED_MODEL`` for the ``code_search`` tool.
+
+Python files are chunked per function, method and class (with ``ast``); other text
+files in fixed windows of lines. Vectors are L2-normalized float32 rows in one flat
+file next to a JSON file describing the chunks, and are searched through a NumPy
+memmap when NumPy is installed (otherwise read in blocks in plain Python, keeping
+only the best rows). Re-indexing only embeds files whose content hash changed; the
+rows of unchanged files are copied over.
+"""
+import ast
+import contextlib
+import hashlib
+import heapq
+import json
+import math
+import os
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # optional: search falls back to plain Python
+
+INDEX_ROOT = os.path.expanduser("~/.tilde-cli/index")
+META_FILE = "chunks.json"
+VECTORS_FILE = "vectors.f32"
+
+WINDOW_LINES = 60  # chunk size for files that aren't Python (or don't parse)
+WINDOW_OVERLAP = 10
+MAX_CHUNK_LINES = 150  # longer functions and classes are split into windows
+MAX_EMBED_CHARS = 4000  # of a chunk's text sent to the embedding model
+MAX_FILE_BYTES = 512 * 1024
+EMBED_BATCH = 32
+SCAN_BLOCK_ROWS = 1024  # rows read at a time when searching without NumPy
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", "env", ".tox",
+             ".mypy_cache", ".pytest_cache", "build", "dist", "site-packages"}
+SKIP_EXTENSIONS = {".min.js", ".lock", ".map", ".svg", ".pdf", ".png", ".jpg", ".jpeg", ".gif", ".ico",
+                   ".zip", ".gz", ".tar", ".whl", ".pyc", ".so", ".o", ".a", ".dylib", ".dll", ".exe"}
+
+
+def index_dir_for(root: str) -> str:
+    """Where the index of the workspace at ``root`` is kept."""
+    digest = hashlib.blake2b(os.path.abspath(root).encode("utf-8", "surrogateescape"), digest_size=8).hexdigest()
+    return os.path.join(INDEX_ROOT, digest)
+
+
+def find_index(start: str = ".") -> Optional[str]:
+    """The workspace root of the nearest indexed directory at or above ``start``, or None."""
+    path = os.path.abspath(start)
+    while True:
+        if os.path.exists(os.path.join(index_dir_for(path), META_FILE)):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _windows(start: int, end: int, name: str = "") -> Iterator[Tuple[int, int, str]]:
+    """``(start, end, name)`` windows of ``WINDOW_LINES`` covering lines ``start``..``end`` (1-based, inclusive)."""
+    step = WINDOW_LINES - WINDOW_OVERLAP
+    first = start
+    while True:
+        last = min(end, first + WINDOW_LINES - 1)
+        yield first, last, name
+        if last >= end:
+            return
+        first += step
+
+
+def chunk_python(text: str) -> List[Tuple[int, int, str]]:
+    """Chunks for Python source: one per top-level function, class header and method, plus module code."""
+    tree = ast.parse(text)
+    line_count = text.count("\n") + 1
+    chunks: List[Tuple[int, int, str]] = []
+    covered = 0  # last line assigned to a definition
+
+    def start_of(node) -> int:
+        return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+    def add(start: int, end: int, name: str):
+        if end - start + 1 > MAX_CHUNK_LINES:
+            chunks.extend(_windows(start, end, name))
+        else:
+            chunks.append((start, end, name))
+
+    def add_module_code(start: int, end: int):
+        if end >= start and any(line.strip() for line in lines[start - 1:end]):
+            chunks.extend(_windows(start, end, "<module>"))
+
+    lines = text.split("\n")
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start, end = start_of(node), node.end_lineno
+        add_module_code(covered + 1, start - 1)
+        covered = end
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))] \
+            if isinstance(node, ast.ClassDef) else []
+        if not methods or end - start + 1 <= WINDOW_LINES:
+            add(start, end, node.name)
+            continue
+        # Big classes: the header (docstring, attributes) and each method separately
+        add(start, start_of(methods[0]) - 1, node.name)
+        for method in methods:
+            add(start_of(method), method.end_lineno, f"{node.name}.{method.name}")
+    add_module_code(covered + 1, line_count)
+    return chunks
+
+
+def chunk_file(path: str, text: str) -> List[Tuple[int, int, str]]:
+    if path.endswith(".py"):
+        try:
+            return chunk_python(text)
+        except (SyntaxError, ValueError):
+            pass
+    line_count = text.count("\n") + 1
+    return list(_windows(1, line_count)) if text.strip() else []
+
+
+def _normalized(vector: List[float]) -> array:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array("f", (x / norm for x in vector))
+
+
+class CodeIndex:
+    """The chunk index of one workspace directory."""
+
+    def __init__(self, root: str, index_dir: str = None):
+        self.root = os.path.abspath(root)
+        self.index_dir = index_dir or index_dir_for(self.root)
+        self.meta: Dict[str, Any] = self._load_meta()
+
+    def _load_meta(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.index_dir, META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"root": self.root, "model": None, "dim": 0, "files": {}, "chunks": []}
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.meta.get("model"))
+
+    def workspace_files(self) -> Iterator[str]:
+        """Paths (relative to the root) of the text files to index."""
+        for dirpath, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(files):
+                if name.startswith(".") or any(name.endswith(ext) for ext in SKIP_EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.path.getsize(path) > MAX_FILE_BYTES or not os.path.isfile(path):
+                        continue
+                except OSError:
+                    continue
+                yield os.path.relpath(path, self.root)
+
+    def build(self, model: str, embed_batch: Callable[[List[str]], List[List[float]]],
+              rebuild: bool = False, progress: Callable[[int, int], None] = None) -> Dict[str, int]:
+        """Bring the index up to date; only files whose content hash changed are embedded.
+
+        ``embed_batch`` embeds a list of texts at once (``LLMBackend.get_embeddings``).
+        ``progress(done, total)`` is called after each batch with chunk counts.
+        """
+        old_path = os.path.join(self.index_dir, VECTORS_FILE)
+        old_files = {} if rebuild or self.meta.get("model") != model else self.meta.get("files", {})
+        if old_files and not self._vectors_match(old_path):
+            old_files = {}  # the vectors were lost or cut short: embed everything again
+        old_dim = self.meta.get("dim", 0)
+        files, pending = {}, []  # pending: (relpath, digest, chunks, texts) of files to embed
+        for rel in self.workspace_files():
+            try:
+                with open(os.path.join(self.root, rel), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            if b"\0" in data[:8192]:
+                continue
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            if rel in old_files and old_files[rel]["hash"] == digest:
+                files[rel] = old_files[rel]
+                continue
+            text = data.decode("utf-8", errors="replace")
+            chunks = chunk_file(rel, text)
+            if not chunks:
+                continue
+            lines = text.split("\n")
+            texts = [f"{rel}{' ' + name if name else ''}\n" + "\n".join(lines[s - 1:e])[:MAX_EMBED_CHARS]
+                     for s, e, name in chunks]
+            pending.append((rel, digest, chunks, texts))
+            files[rel] = None
+
+        total = sum(len(texts) for *_, texts in pending)
+        new_vectors: Dict[str, List[array]] = {}
+        batch: List[Tuple[str, str]] = []
+        done, dim = 0, old_dim if old_files else 0
+
+        def flush():
+            nonlocal done, dim
+            vectors = embed_batch([text for _, text in batch])
+            for (rel, _), vector in zip(batch, vectors):
+                if dim and len(vector) != dim:
+                    raise ValueError(f"Embedding size changed from {dim} to {len(vector)}; run with --rebuild.")
+                dim = len(vector)
+                new_vectors.setdefault(rel, []).append(_normalized(vector))
+            done += len(batch)
+            batch.clear()
+            if progress:
+                progress(done, total)
+
+        for rel, _, _, texts in pending:
+            for text in texts:
+                batch.append((rel, text))
+                if len(batch) >= EMBED_BATCH:
+                    flush()
+        if batch:
+            flush()
+
+        # Write the new vector file: copied rows for unchanged files, new rows for the rest
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = old_path + ".tmp"
+        pending_by_file = {rel: (digest, chunks) for rel, digest, chunks, _ in pending}
+        chunk_rows: List[List[Any]] = []
+        out_files: Dict[str, Dict[str, Any]] = {}
+        row_bytes = dim * 4
+        with open(tmp_path, "wb") as out, (open(old_path, "rb") if old_files else contextlib.nullcontext()) as old:
+            for rel in files:
+                if rel in pending_by_file:
+                    digest, chunks = pending_by_file[rel]
+                    for vector in new_vectors[rel]:
+                        out.write(vector.tobytes())
+                else:
+                    entry = old_files[rel]
+                    first, count = entry["rows"]
+                    old.seek(first * row_bytes)
+                    out.write(old.read(count * row_bytes))
+                    digest, chunks = entry["hash"], [tuple(c[1:]) for c in self.meta["chunks"][first:first + count]]
+                out_files[rel] = {"hash": digest, "rows": [len(chunk_rows), len(chunks)]}
+                chunk_rows.extend([rel, start, end, name] for start, end, name in chunks)
+        os.replace(tmp_path, old_path)
+        self.meta = {"root": self.root, "model": model, "dim": dim, "files": out_files, "chunks": chunk_rows}
+        meta_path = os.path.join(self.index_dir, META_FILE)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(self.meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return {"files": len(out_files), "chunks": len(chunk_rows), "embedded_files": len(pending),
+                "embedded_chunks": total, "removed_files": len(set(old_files) - set(out_files))}
+
+    def _vectors_match(self, path: str) -> bool:
+        """True if the vector file at ``path`` holds a row for every chunk in the metadata."""
+        try:
+            return os.path.getsize(path) == len(self.meta.get("chunks", [])) * self.meta.get("dim", 0) * 4
+        except OSError:
+            return False
+
+    def _top(self, query: array, k: int) -> List[Tuple[int, float]]:
+        """Row numbers and cosine scores of the ``k`` rows closest to the normalized ``query``."""
+        n, dim = len(self.meta["chunks"]), self.meta["dim"]
+        path = os.path.join(self.index_dir, VECTORS_FILE)
+        if not n or k <= 0:
+            return []
+        if np is not None:
+            vectors = np.memmap(path, dtype=np.float32, mode="r", shape=(n, dim))
+            scores = vectors @ np.frombuffer(query.tobytes(), dtype=np.float32)
+            best = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+            return sorted(((int(i), float(scores[i])) for i in best), key=lambda r: r[1], reverse=True)
+
+        def scores() -> Iterator[Tuple[int, float]]:
+            # One block of rows in memory at a time; nlargest keeps only the best k
+            with open(path, "rb") as f:
+                for first in range(0, n, SCAN_BLOCK_ROWS):
+                    block = array("f")
+                    block.frombytes(f.read(min(SCAN_BLOCK_ROWS, n - first) * dim * 4))
+                    for j in range(len(block) // dim):
+                        yield first + j, sum(a * b for a, b in zip(block[j * dim:(j + 1) * dim], query))
+
+        return heapq.nlargest(k, scores(), key=lambda r: r[1])
+
+    def search(self, query_vector: List[float], k: int = 5) -> List[Dict[str, Any]]:
+        """The ``k`` chunks most similar to ``query_vector``: path, start, end, name and score."""
+        if not self.exists:
+            return []
+        if len(query_vector) != self.meta["dim"]:
+            raise ValueError(f"Query embedding has {len(query_vector)} dimensions, the index {self.meta['dim']}.")
+        results = []
+        for i, score in self._top(_normalized(query_vector), k):
+            path, start, end, name = self.meta["chunks"][i]
+            results.append({"path": path, "start": start, "end": end, "name": name, "score": round(score, 4)})
+        return results
+
@@ -1,19 +1,54 @@
 
 import os
 import json
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 PROJECT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
 USER_CONFIG_DIR = os.path.expanduser("~/.tilde-cli")
 USER_CONFIG_PATH = os.path.join(USER_CONFIG_DIR, "config.json")
 
 
+def _as_bool(value: Any) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value or [])
+
+
 class Config:
-    OLLAMA_BASE_URL = "http://localhost:11434"
+    OLLAMA_BASE_URL = "http://localhost:11434"  # One URL, or a list / comma-separated URLs to load-balance
     OLLAMA_MODEL = "qwen3:30b"
+    FAST_MODEL = ""  # Small model for summaries and tool routing (empty = use OLLAMA_MODEL)
     MEMORY_FILE = "~/.tilde-cli/memory.json"
     LOG_LEVEL = "INFO"
     HIDE_THINK = True  # By default, hide <think> sections
+    SHELL_PERSISTENT = False  # Reuse one bash process across shell tool calls
+    TOOL_ROUTING = True  # Send only the tool schemas relevant to each turn
+    INTENT_FAST_PATH = True  # Run the tool directly for messages matching a tool's declared intents
+    TOOL_RESULT_CACHE = True  # Reuse read-only tool results while the files they read are unchanged
+    CORE_TOOLS = ["shell", "read_file"]  # Tools offered on every turn when routing
+    NUM_CTX = 0  # Context window to request from Ollama (0 = the model's own length, capped at MAX_NUM_CTX)
+    MAX_NUM_CTX = 32768  # Cap on the automatic num_ctx; larger windows cost server memory
+    OUTPUT_RESERVE_TOKENS = 4096  # Part of the window kept free for the reply (at most a quarter of it)
+    RETRIEVAL_MAX_TOKENS = 256  # Token budget for memory facts attached to each request (not stored in history)
+    EMBED_MODEL = ""  # Ollama embedding model for tool routing and `tilde index` (empty = keywords only)
+    OLLAMA_HEALTH_INTERVAL = 10.0  # Seconds between endpoint health checks when several URLs are set
+    LLM_FIRST_TOKEN_TIMEOUT = 120.0  # Seconds to wait for the first token (covers model loading); 0 = no limit
+    LLM_IDLE_TIMEOUT = 30.0  # Seconds allowed between streamed tokens; 0 = no limit
+    LLM_TOTAL_TIMEOUT = 0.0  # Seconds allowed for a whole response; 0 = no limit
+    NATIVE_THINK = True  # Use Ollama's `think` option for thinking models (reasoning separated server-side)
+    STRUCTURED_OUTPUT = True  # Constrain replies with a JSON schema when the model lacks native tool calling
+    HEDGE = False  # Re-send a chat to a second endpoint when its first token is late
+    HEDGE_DELAY = 2.0  # Seconds to wait for a first token before hedging (until p95 data exists)
+    HEDGE_BUDGET = 0.1  # Maximum fraction of chat requests that may be hedged
+    WARMUP = True  # Preload the chat model in the background when an interactive chat starts
+    KEEP_ALIVE = "30m"  # How long Ollama keeps models loaded; a duration, or {"model": duration, "*": default}
+    WARM_MODELS = []  # Extra models `tilde warm` loads besides the chat and embedding models
+    METRICS = True  # Record per-turn telemetry to ~/.tilde-cli/metrics/turns.jsonl
+    METRICS_PROM_FILE = ""  # Optional Prometheus textfile-collector output path
 
     @classmethod
     def ensure_user_config(cls):
@@ -39,11 +74,44 @@ class Config:
         config['MEMORY_FILE'] = os.environ.get('MEMORY_FILE', config.get('MEMORY_FILE', cls.MEMORY_FILE))
         config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', config.get('LOG_LEVEL', cls.LOG_LEVEL))
         config['HIDE_THINK'] = json.loads(str(os.environ.get('HIDE_THINK', config.get('HIDE_THINK', cls.HIDE_THINK))).lower() if str(os.environ.get('HIDE_THINK', config.get('HIDE_THINK', cls.HIDE_THINK))).lower() in ['true','false'] else 'true')
+        config['SHELL_PERSISTENT'] = _as_bool(os.environ.get('SHELL_PERSISTENT', config.get('SHELL_PERSISTENT', cls.SHELL_PERSISTENT)))
+        config['NUM_CTX'] = int(os.environ.get('NUM_CTX', config.get('NUM_CTX', cls.NUM_CTX)))
+        config['MAX_NUM_CTX'] = int(os.environ.get('MAX_NUM_CTX', config.get('MAX_NUM_CTX', cls.MAX_NUM_CTX)))
+        config['OUTPUT_RESERVE_TOKENS'] = int(os.environ.get('OUTPUT_RESERVE_TOKENS', config.get('OUTPUT_RESERVE_TOKENS', cls.OUTPUT_RESERVE_TOKENS)))
+        config['FAST_MODEL'] = os.environ.get('FAST_MODEL', config.get('FAST_MODEL', cls.FAST_MODEL))
+        config['RETRIEVAL_MAX_TOKENS'] = int(os.environ.get('RETRIEVAL_MAX_TOKENS', config.get('RETRIEVAL_MAX_TOKENS', cls.RETRIEVAL_MAX_TOKENS)))
+        config['INTENT_FAST_PATH'] = _as_bool(os.environ.get('INTENT_FAST_PATH', config.get('INTENT_FAST_PATH', cls.INTENT_FAST_PATH)))
+        config['TOOL_RESULT_CACHE'] = _as_bool(os.environ.get('TOOL_RESULT_CACHE', config.get('TOOL_RESULT_CACHE', cls.TOOL_RESULT_CACHE)))
+        config['TOOL_ROUTING'] = _as_bool(os.environ.get('TOOL_ROUTING', config.get('TOOL_ROUTING', cls.TOOL_ROUTING)))
+        config['CORE_TOOLS'] = _as_list(os.environ.get('CORE_TOOLS', config.get('CORE_TOOLS', cls.CORE_TOOLS)))
+        config['EMBED_MODEL'] = os.environ.get('EMBED_MODEL', config.get('EMBED_MODEL', cls.EMBED_MODEL))
+        config['OLLAMA_HEALTH_INTERVAL'] = float(os.environ.get('OLLAMA_HEALTH_INTERVAL', config.get('OLLAMA_HEALTH_INTERVAL', cls.OLLAMA_HEALTH_INTERVAL)))
+        config['LLM_FIRST_TOKEN_TIMEOUT'] = float(os.environ.get('LLM_FIRST_TOKEN_TIMEOUT', config.get('LLM_FIRST_TOKEN_TIMEOUT', cls.LLM_FIRST_TOKEN_TIMEOUT)))
+        config['LLM_IDLE_TIMEOUT'] = float(os.environ.get('LLM_IDLE_TIMEOUT', config.get('LLM_IDLE_TIMEOUT', cls.LLM_IDLE_TIMEOUT)))
+        config['LLM_TOTAL_TIMEOUT'] = float(os.environ.get('LLM_TOTAL_TIMEOUT', config.get('LLM_TOTAL_TIMEOUT', cls.LLM_TOTAL_TIMEOUT)))
+        config['NATIVE_THINK'] = _as_bool(os.environ.get('NATIVE_THINK', config.get('NATIVE_THINK', cls.NATIVE_THINK)))
+        config['STRUCTURED_OUTPUT'] = _as_bool(os.environ.get('STRUCTURED_OUTPUT', config.get('STRUCTURED_OUTPUT', cls.STRUCTURED_OUTPUT)))
+        config['HEDGE'] = _as_bool(os.environ.get('HEDGE', config.get('HEDGE', cls.HEDGE)))
+        config['HEDGE_DELAY'] = float(os.environ.get('HEDGE_DELAY', config.get('HEDGE_DELAY', cls.HEDGE_DELAY)))
+        config['HEDGE_BUDGET'] = float(os.environ.get('HEDGE_BUDGET', config.get('HEDGE_BUDGET', cls.HEDGE_BUDGET)))
+        config['WARMUP'] = _as_bool(os.environ.get('WARMUP', config.get('WARMUP', cls.WARMUP)))
+        config['KEEP_ALIVE'] = os.environ.get('KEEP_ALIVE', config.get('KEEP_ALIVE', cls.KEEP_ALIVE))
+        config['WARM_MODELS'] = _as_list(os.environ.get('WARM_MODELS', config.get('WARM_MODELS', cls.WARM_MODELS)))
+        config['METRICS'] = _as_bool(os.environ.get('METRICS', config.get('METRICS', cls.METRICS)))
+        config['METRICS_PROM_FILE'] = os.environ.get('METRICS_PROM_FILE', config.get('METRICS_PROM_FILE', cls.METRICS_PROM_FILE))
         # 3. Set as class attributes
         for k, v in config.items():
             setattr(cls, k, v)
 
 
+    @classmethod
+    def keep_alive_for(cls, model: str):
+        """Return the configured keep_alive for ``model`` (None leaves Ollama's default)."""
+        keep_alive = cls.KEEP_ALIVE
+        if isinstance(keep_alive, dict):
+            return keep_alive.get(model, keep_alive.get("*"))
+        return keep_alive or None
+
     @classmethod
     def as_dict(cls) -> Dict[str, Any]:
         return {
@@ -52,6 +120,31 @@ class Config:
             'MEMORY_FILE': cls.MEMORY_FILE,
             'LOG_LEVEL': cls.LOG_LEVEL,
             'HIDE_THINK': cls.HIDE_THINK,
+            'SHELL_PERSISTENT': cls.SHELL_PERSISTENT,
+            'TOOL_ROUTING': cls.TOOL_ROUTING,
+            'INTENT_FAST_PATH': cls.INTENT_FAST_PATH,
+            'TOOL_RESULT_CACHE': cls.TOOL_RESULT_CACHE,
+            'FAST_MODEL': cls.FAST_MODEL,
+            'NUM_CTX': cls.NUM_CTX,
+            'MAX_NUM_CTX': cls.MAX_NUM_CTX,
+            'OUTPUT_RESERVE_TOKENS': cls.OUTPUT_RESERVE_TOKENS,
+            'RETRIEVAL_MAX_TOKENS': cls.RETRIEVAL_MAX_TOKENS,
+            'CORE_TOOLS': cls.CORE_TOOLS,
+            'EMBED_MODEL': cls.EMBED_MODEL,
+            'OLLAMA_HEALTH_INTERVAL': cls.OLLAMA_HEALTH_INTERVAL,
+            'LLM_FIRST_TOKEN_TIMEOUT': cls.LLM_FIRST_TOKEN_TIMEOUT,
+            'LLM_IDLE_TIMEOUT': cls.LLM_IDLE_TIMEOUT,
+            'LLM_TOTAL_TIMEOUT': cls.LLM_TOTAL_TIMEOUT,
+            'NATIVE_THINK': cls.NATIVE_THINK,
+            'STRUCTURED_OUTPUT': cls.STRUCTURED_OUTPUT,
+            'HEDGE': cls.HEDGE,
+            'HEDGE_DELAY': cls.HEDGE_DELAY,
+            'HEDGE_BUDGET': cls.HEDGE_BUDGET,
+            'WARMUP': cls.WARMUP,
+            'KEEP_ALIVE': cls.KEEP_ALIVE,
+            'WARM_MODELS': cls.WARM_MODELS,
+            'METRICS': cls.METRICS,
+            'METRICS_PROM_FILE': cls.METRICS_PROM_FILE,
         }
 
 
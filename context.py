@@ -1,29 +1,197 @@
+import hashlib
 import json
 import os
-from typing import List, Dict, Any, Optional
+import sys
+import tempfile
+import weakref
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+from utils import estimate_tokens
 
 SESSION_DIR = os.path.expanduser("~/.tilde-cli/sessions")
 os.makedirs(SESSION_DIR, exist_ok=True)
 
+# Turns kept in memory per conversation before older ones are spilled to the journal.
+DEFAULT_MAX_RAM_BYTES = 8 * 1024 * 1024
+TURN_OVERHEAD_BYTES = 170  # str header, slots object, ints and list slot for one Turn
+
+
+class Turn:
+    """One conversation message, stored compactly.
+
+    Roles and tool names are interned; the token estimate is computed once and the
+    content hash on first use. Supports ``turn["role"]`` / ``turn.get("tool")`` like the dicts it
+    replaces, and :meth:`as_dict` gives the message to send to the model.
+    """
+
+    __slots__ = ("role", "content", "tool", "tokens", "_digest")
+
+    def __init__(self, role: str, content: str, tool: Optional[str] = None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.tool = sys.intern(tool) if tool else None
+        self.tokens = estimate_tokens(content or "")
+        self._digest = None
+
+    @property
+    def digest(self) -> int:
+        """Stable 64-bit hash of the content."""
+        if self._digest is None:
+            self._digest = int.from_bytes(hashlib.blake2b((self.content or "").encode(), digest_size=8).digest(), "big")
+        return self._digest
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Turn":
+        return cls(data["role"], data.get("content", ""), data.get("tool"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        turn = {"role": self.role, "content": self.content}
+        if self.tool:
+            turn["tool"] = self.tool
+        return turn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in ("role", "content", "tool") else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __repr__(self):
+        return f"Turn({self.role!r}, {self.content[:40]!r}{', tool=' + repr(self.tool) if self.tool else ''})"
+
+    @property
+    def ram_bytes(self) -> int:
+        return TURN_OVERHEAD_BYTES + len(self.content or "")
+
+
+class MessageStore:
+    """The single list of turns for a conversation.
+
+    Recent turns stay in memory up to ``max_ram_bytes``; older ones are appended to a
+    journal file in the session directory (a JSON array per spill) and read back only when
+    iterating the whole history, e.g. to save it. The journal is deleted with the store.
+    """
+
+    def __init__(self, name: str = "default", max_ram_bytes: Optional[int] = DEFAULT_MAX_RAM_BYTES):
+        self.name = name
+        self.max_ram_bytes = max_ram_bytes
+        self._turns: List[Turn] = []
+        self.ram_bytes = 0
+        self.spilled = 0
+        self.journal_path: Optional[str] = None
+        self._finalizer = None
+
+    def append(self, role: str, content: str, tool: Optional[str] = None) -> Turn:
+        turn = Turn(role, content, tool)
+        self._turns.append(turn)
+        self.ram_bytes += turn.ram_bytes
+        if self.max_ram_bytes and self.ram_bytes > self.max_ram_bytes:
+            self._spill()
+        return turn
+
+    def extend(self, turns: Iterable[Dict[str, Any]]):
+        new = [Turn(turn["role"], turn.get("content", ""), turn.get("tool")) for turn in turns]
+        self._turns.extend(new)
+        self.ram_bytes += sum(turn.ram_bytes for turn in new)
+        if self.max_ram_bytes and self.ram_bytes > self.max_ram_bytes:
+            self._spill()
+
+    def replace(self, turns: Iterable[Dict[str, Any]]):
+        self.clear()
+        self.extend(turns)
+
+    def _spill(self):
+        # Write the oldest turns until a quarter of the budget is free, so spills are batched.
+        target = self.max_ram_bytes * 3 // 4
+        count, freed = 0, 0
+        while count < len(self._turns) - 1 and self.ram_bytes - freed > target:
+            freed += self._turns[count].ram_bytes
+            count += 1
+        if not count:
+            return
+        if self.journal_path is None:
+            fd, self.journal_path = tempfile.mkstemp(prefix=f"{self.name}.", suffix=".journal", dir=SESSION_DIR)
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove_file, self.journal_path)
+        with open(self.journal_path, "a") as f:
+            # One JSON array per spill: a single encoder call instead of one per turn
+            f.write(json.dumps([turn.as_dict() for turn in self._turns[:count]]) + "\n")
+        del self._turns[:count]
+        self.ram_bytes -= freed
+        self.spilled += count
+
+    def _journal(self) -> Iterator[Turn]:
+        if not self.spilled:
+            return
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                for turn in json.loads(line):
+                    yield Turn.from_dict(turn)
+
+    def recent(self, n: int) -> List[Turn]:
+        """The last ``n`` turns (only those still in memory)."""
+        return self._turns[-n:] if n > 0 else []
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [turn.as_dict() for turn in self]
+
+    def clear(self):
+        self._turns = []
+        self.ram_bytes = 0
+        self.spilled = 0
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.journal_path = None
+
+    def __len__(self):
+        return self.spilled + len(self._turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        yield from self._journal()
+        yield from list(self._turns)
+
+    def __reversed__(self) -> Iterator[Turn]:
+        yield from reversed(self._turns)
+        if self.spilled:
+            yield from reversed(list(self._journal()))
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 class Session:
-    def __init__(self, session_id: Optional[str] = None):
+    def __init__(self, session_id: Optional[str] = None, max_ram_bytes: Optional[int] = DEFAULT_MAX_RAM_BYTES):
         self.session_id = session_id or "default"
-        self.history: List[Dict[str, Any]] = []  # Each turn: {"role": "user"/"assistant"/"tool", "content": ...}
+        self._history = MessageStore(self.session_id, max_ram_bytes)  # turns: role "user"/"assistant"/"tool", content, tool
         self.metadata: Dict[str, Any] = {}
 
-    def add_turn(self, role: str, content: str, tool: Optional[str] = None):
-        turn = {"role": role, "content": content}
-        if tool:
-            turn["tool"] = tool
-        self.history.append(turn)
+    @property
+    def history(self) -> MessageStore:
+        return self._history
+
+    @history.setter
+    def history(self, turns: Iterable[Dict[str, Any]]):
+        self._history.replace(turns)
+
+    def add_turn(self, role: str, content: str, tool: Optional[str] = None) -> Turn:
+        return self.history.append(role, content, tool)
 
-    def get_recent(self, n: int = 10) -> List[Dict[str, Any]]:
-        return self.history[-n:]
+    def get_recent(self, n: int = 10) -> List[Turn]:
+        return self.history.recent(n)
 
     def save(self):
         path = os.path.join(SESSION_DIR, f"{self.session_id}.json")
         with open(path, "w") as f:
-            json.dump({"history": self.history, "metadata": self.metadata}, f, indent=2)
+            json.dump({"history": self.history.to_list(), "metadata": self.metadata}, f, indent=2)
 
     def load(self):
         path = os.path.join(SESSION_DIR, f"{self.session_id}.json")
@@ -34,24 +202,54 @@ class Session:
                 self.metadata = data.get("metadata", {})
 
     def reset(self):
-        self.history = []
+        self.history.clear()
         self.metadata = {}
 
+def retrieval_block(facts: List[str], window: List[Dict[str, Any]], max_tokens: int) -> Optional[Dict[str, str]]:
+    """Build the per-request message carrying retrieved memory facts, or None if nothing is left.
+
+    Facts already visible in ``window`` (or repeated) are dropped, and the rest are
+    kept in order until ``max_tokens`` is used up. The message is only ever sent, never
+    stored in the history.
+    """
+    visible = "\n".join(m.get("content") or "" for m in window).lower()
+    header = "Relevant information from your memory:"
+    used = estimate_tokens(header)
+    kept = []
+    for fact in facts:
+        fact = fact.strip()
+        if not fact or fact.lower() in visible or fact in kept:
+            continue
+        cost = estimate_tokens(fact) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(fact)
+        used += cost
+    if not kept:
+        return None
+    return {"role": "system", "content": header + "\n" + "\n".join(f"- {fact}" for fact in kept)}
+
 class ContextManager:
-    def __init__(self):
-        self.conversation_history: List[Dict[str, str]] = []
+    """Conversation view used by tools and the daemon; shares its turns with the session's store."""
+
+    def __init__(self, store: Optional[MessageStore] = None):
+        self.store = store if store is not None else MessageStore(max_ram_bytes=None)
+
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        return self.store.to_list()
 
     def add_message(self, role: str, content: str):
-        self.conversation_history.append({"role": role, "content": content})
+        self.store.append(role, content)
 
     def get_conversation_history(self, limit: int = -1) -> List[Dict[str, str]]:
         if limit == -1:
             return self.conversation_history
-        return self.conversation_history[-limit:]
+        return [turn.as_dict() for turn in self.store.recent(limit)]
 
     def get_full_context(self) -> List[Dict[str, str]]:
         # This is a simplified example. In a real scenario, you'd manage token limits.
         return self.conversation_history
 
     def clear_context(self):
-        self.conversation_history = []
+        self.store.clear()
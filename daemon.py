@@ -0,0 +1,314 @@
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SOCKET_PATH = os.path.expanduser("~/.tilde-cli/daemon.sock")
+DAEMON_LOG = os.path.expanduser("~/.tilde-cli/daemon.log")
+START_TIMEOUT = 10.0
+
+# Wire protocol: newline-delimited JSON over a Unix domain socket.
+#   client -> daemon: {"argv": [...], "cwd": "..."} or {"control": "ping" | "stop"}
+#   daemon -> client: {"stream": "stdout" | "stderr", "data": "..."}* then {"exit": code}
+# A client that closes the connection early (Ctrl-C) cancels the running turn.
+
+
+# Options whose value is the next argument (unless given as --option=value)
+OPTIONS_WITH_VALUES = {"--remote", "--params", "--keep-alive", "--sessions"}
+
+
+def _positionals(argv: List[str]) -> List[str]:
+    args, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg.startswith("-"):
+            skip = arg in OPTIONS_WITH_VALUES
+        else:
+            args.append(arg)
+    return args
+
+
+def should_forward(argv: List[str]) -> bool:
+    """Return True for one-shot commands the daemon can run without a terminal."""
+    if os.environ.get("TILDE_NO_DAEMON") or not os.path.exists(SOCKET_PATH):
+        return False
+    args = _positionals(argv)
+    if not args or args[0] == "daemon":
+        return False
+    if args[0] == "chat":
+        # Only one-shot answers go to the daemon; a session (even one reading piped
+        # messages from stdin) stays in-process.
+        return len(args) > 1 and "--once" in argv
+    if args[0] == "tool" and len(args) > 2 and args[1] == "run" and args[2] == "shell":
+        return False  # asks for confirmation on the terminal
+    return True
+
+
+def _connect(socket_path: str, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(message: Dict[str, Any], socket_path: str = None, timeout: Optional[float] = None):
+    """Send ``message``; return an iterator over the replies, or None if no daemon is listening."""
+    sock = _connect(socket_path or SOCKET_PATH, timeout)
+    if sock is None:
+        return None
+
+    def replies():
+        with sock, sock.makefile('rwb') as stream:
+            stream.write(json.dumps(message).encode('utf-8') + b"\n")
+            stream.flush()
+            for line in stream:
+                yield json.loads(line)
+    return replies()
+
+
+def forward(argv: List[str], socket_path: str = None) -> Optional[int]:
+    """Run ``argv`` in the daemon, streaming its output here; None if no daemon answered."""
+    responses = _request({"argv": argv, "cwd": os.getcwd()}, socket_path)
+    if responses is None:
+        return None
+    outputs = {"stdout": sys.stdout, "stderr": sys.stderr}
+    try:
+        for message in responses:
+            if "exit" in message:
+                return message["exit"]
+            stream = outputs.get(message.get("stream"), sys.stdout)
+            stream.write(message.get("data", ""))
+            stream.flush()
+    except KeyboardInterrupt:
+        responses.close()  # the daemon sees the connection close and cancels the turn
+        print("\nCancelled.", file=outputs["stderr"])
+        return 130
+    except (OSError, ValueError):
+        pass
+    print("Error: lost connection to the tilde daemon.", file=sys.stderr)
+    return 1
+
+
+def ping(socket_path: str = None) -> Optional[Dict[str, Any]]:
+    """Return the daemon's status, or None if it is not running."""
+    responses = _request({"control": "ping"}, socket_path, timeout=2)
+    try:
+        return next(responses) if responses is not None else None
+    except (OSError, ValueError, StopIteration):
+        return None
+
+
+def stop(socket_path: str = None) -> bool:
+    responses = _request({"control": "stop"}, socket_path, timeout=5)
+    if responses is None:
+        return False
+    try:
+        list(responses)
+    except (OSError, ValueError):
+        pass
+    return True
+
+
+def spawn(script: str, socket_path: str = None) -> Optional[int]:
+    """Start ``script daemon start --foreground`` detached and wait until it accepts connections."""
+    import subprocess
+    os.makedirs(os.path.dirname(DAEMON_LOG), exist_ok=True)
+    with open(DAEMON_LOG, 'ab') as log:
+        process = subprocess.Popen(
+            [sys.executable, script, "--no-daemon", "daemon", "start", "--foreground"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None
+        if ping(socket_path) is not None:
+            return process.pid
+        time.sleep(0.05)
+    return None
+
+
+class _StreamWriter(io.TextIOBase):
+    """File-like object that forwards writes to the connected client as JSON messages."""
+
+    def __init__(self, wfile, name: str, lock: threading.Lock):
+        self._wfile = wfile
+        self._name = name
+        self._lock = lock
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, data: str) -> int:
+        if data:
+            with self._lock:
+                self._wfile.write(json.dumps({"stream": self._name, "data": data}).encode('utf-8') + b"\n")
+                self._wfile.flush()
+        return len(data)
+
+
+class TildeDaemon:
+    """Resident tilde process serving one-shot commands over a Unix socket.
+
+    The wrapped :class:`TildeCLI` keeps its backend connection, memory, tool
+    registry and tool schemas warm between requests. Commands run one at a time
+    because they share the process's stdout and working directory. A client that
+    disconnects (Ctrl-C) cancels its command's turn through ``TildeCLI.cancel_turn``.
+    """
+
+    def __init__(self, cli=None, socket_path: str = None):
+        if cli is None:
+            from cli import TildeCLI
+            cli = TildeCLI()
+        self.cli = cli
+        self.socket_path = socket_path or SOCKET_PATH
+        self.started = time.time()
+        self.requests = 0
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._running: Optional[threading.Event] = None  # hung_up event of the command being run
+        self._stop = threading.Event()
+        self._server = None
+
+    def warm(self):
+        """Build everything a first request would otherwise pay for, including loading the model."""
+        from config_utils import Config
+        cli = self.cli
+        cli.memory_manager
+        cli.tool_definitions
+        cli.system_prompt
+        try:
+            cli.llm_backend.list_models()  # opens a keep-alive connection to the server
+            if Config.WARMUP:
+                cli.llm_backend.preload(Config.OLLAMA_MODEL, keep_alive=Config.keep_alive_for(Config.OLLAMA_MODEL),
+                                        options=cli._model_options())
+        except Exception:
+            pass
+
+    def serve_forever(self):
+        self.warm()
+        if os.path.exists(self.socket_path):
+            if ping(self.socket_path) is not None:
+                raise RuntimeError(f"A tilde daemon is already listening on {self.socket_path}")
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._server.listen()
+        self._server.settimeout(0.5)
+        print(f"Tilde daemon (pid {os.getpid()}) listening on {self.socket_path}", flush=True)
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._server.close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._stop.set()
+
+    def _handle(self, conn: socket.socket):
+        try:
+            with conn, conn.makefile('rwb') as stream:
+                self._serve(conn, stream)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away (closing the stream can't flush what is left)
+
+    def _serve(self, conn: socket.socket, stream):
+        try:
+            request = json.loads(stream.readline() or b"{}")
+        except ValueError:
+            return
+        send_lock = threading.Lock()
+
+        def send(message):
+            with send_lock:
+                stream.write(json.dumps(message).encode('utf-8') + b"\n")
+                stream.flush()
+
+        try:
+            if request.get("control") == "ping":
+                send({"pid": os.getpid(), "uptime": time.time() - self.started, "requests": self.requests})
+            elif request.get("control") == "stop":
+                self.shutdown()
+                send({"exit": 0})
+            elif "argv" in request:
+                hung_up = threading.Event()
+                threading.Thread(target=self._watch, args=(conn, hung_up), daemon=True).start()
+                code = self._run(request["argv"], request.get("cwd"), _StreamWriter(stream, "stdout", send_lock),
+                                 _StreamWriter(stream, "stderr", send_lock), hung_up)
+                send({"exit": code})
+        finally:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)  # also wakes the watcher
+            except OSError:
+                pass
+
+    def _watch(self, conn: socket.socket, hung_up: threading.Event):
+        # Clients send nothing after the request, so a read returning means they hung up
+        try:
+            conn.recv(1)
+        except OSError:
+            pass
+        with self._state_lock:
+            hung_up.set()
+            if self._running is hung_up:
+                self.cli.cancel_turn()
+
+    def _run(self, argv: List[str], cwd: Optional[str], stdout, stderr, hung_up: threading.Event = None) -> int:
+        from contextlib import redirect_stdout, redirect_stderr
+        hung_up = hung_up or threading.Event()
+        with self._run_lock, redirect_stdout(stdout), redirect_stderr(stderr):
+            with self._state_lock:
+                if hung_up.is_set():
+                    return 130  # the client gave up while an earlier command was running
+                self._running = hung_up
+                self.cli._turn_cancelled = False
+            self.requests += 1
+            previous_cwd = os.getcwd()
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                args = self.cli.parser.parse_args(argv)
+                if args.command == "chat":
+                    self._fresh_conversation()
+                    args.once = True
+                self.cli.memory_manager.refresh()
+                result = self.cli.dispatch(args)
+                return result if isinstance(result, int) else 0
+            except SystemExit as e:  # argparse errors and --help
+                return e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            finally:
+                with self._state_lock:
+                    self._running = None
+                os.chdir(previous_cwd)
+
+    def _fresh_conversation(self):
+        # Each one-shot chat starts from an empty conversation, as it would in-process.
+        from context import ContextManager, Session
+        self.cli.session = Session()
+        self.cli.context_manager = ContextManager(self.cli.session.history)
+        self.cli._last_think_toggle = None
@@ -1,7 +1,7 @@
 from .model_adapter import BaseModelAdapter
 
 class YourModelAdapter(BaseModelAdapter):
-    def build_tool_definitions(self, tools):
+    def build_tool_definitions(self, tools, compact=False):
         # TODO: Return tool definitions in the format required by your model
         raise NotImplementedError("Implement build_tool_definitions for your model.")
 
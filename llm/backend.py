@@ -5,6 +5,10 @@ class ToolCall(TypedDict):
     tool_name: str
     parameters: Dict[str, Any]
 
+class ThinkingChunk(str):
+    """Reasoning text the server returned separately from the answer (Ollama's ``think`` option)."""
+
+
 class LLMBackend(ABC):
     @abstractmethod
     def generate_text(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, Iterator[str]]:
@@ -17,3 +21,7 @@ class LLMBackend(ABC):
     @abstractmethod
     def get_embedding(self, text: str) -> List[float]:
         pass
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts; backends with a batch endpoint do it in one request."""
+        return [self.get_embedding(text) for text in texts]
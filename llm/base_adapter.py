@@ -6,11 +6,76 @@ class BaseModelAdapter(ABC):
         self.model_name = model_name
 
     @abstractmethod
-    def build_tool_definitions(self, tools):
-        """Return the tool definitions in the format required by the model."""
+    def build_tool_definitions(self, tools, compact=False):
+        """Return the tool definitions in the format required by the model.
+
+        ``compact`` asks for the tools' short descriptions to keep the prompt small.
+        """
         pass
 
     @abstractmethod
     def parse_response_stream(self, response_generator):
         """Yield (tool_call, text_chunk) pairs from the model's response stream."""
         pass
+
+    # -- structured output (models without native tool calling) -------------
+
+    def structured_output_schema(self, tools) -> dict:
+        """JSON schema for Ollama's ``format`` option: either a tool call or an answer, never free text."""
+        return {
+            "type": "object",
+            "properties": {
+                "tool_name": {"type": ["string", "null"], "enum": [*tools.keys(), None]},
+                "parameters": {"type": "object"},
+                "answer": {"type": "string"},
+            },
+            "required": ["tool_name", "parameters", "answer"],
+        }
+
+    def structured_output_instructions(self, tools) -> str:
+        """System-prompt text describing the tools when they can't be passed natively."""
+        import json
+        lines = [
+            "Reply with a single JSON object {\"tool_name\": ..., \"parameters\": {...}, \"answer\": \"...\"}.",
+            "To use a tool, set tool_name and parameters and leave answer empty; otherwise set tool_name to null and put your reply in answer.",
+            "Tools:",
+        ]
+        for tool in tools.values():
+            lines.append(f"- {tool.name}: {tool.compact_description} Parameters: {json.dumps(tool.parameters.get('properties', {}))}")
+        return "\n".join(lines)
+
+    def parse_structured_response(self, text):
+        """Return (tool_call, answer) from a structured-output reply; (None, text) if it isn't valid."""
+        import json
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None, text
+        if not isinstance(data, dict):
+            return None, text
+        if data.get("tool_name"):
+            return {"tool_name": data["tool_name"], "parameters": data.get("parameters") or {}}, None
+        return None, data.get("answer", "")
+
+    def extract_tool_call(self, text):
+        """Recover a tool call the model wrote as JSON text instead of a native call, or None."""
+        import json
+        import re
+        candidate = text.strip()
+        match = re.search(r"<tool_call>\s*(\{.*\})\s*</tool_call>", candidate, re.S) or \
+            re.fullmatch(r"```(?:json)?\s*(\{.*\})\s*```", candidate, re.S)
+        if match:
+            candidate = match.group(1)
+        if not candidate.startswith("{"):
+            return None
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        name = data.get("tool_name") or data.get("name")
+        if not isinstance(name, str):
+            return None
+        params = data.get("parameters", data.get("arguments", {}))
+        return {"tool_name": name, "parameters": params if isinstance(params, dict) else {}}
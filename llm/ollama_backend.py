@@ -1,68 +1,222 @@
 import requests
 import json
 from typing import Dict, Any, List, Iterator, Union
-from .backend import LLMBackend, ToolCall
+from .backend import LLMBackend, ThinkingChunk, ToolCall
+from .stream import ChatStream, RequestHandle, abort_response, track_connections
+
+def model_in(names: List[str], model: str) -> bool:
+    """True if ``model`` is among the server-reported ``names`` (which carry an explicit tag)."""
+    return any(name == model or name == f"{model}:latest" for name in names)
+
+
+def keep_alive_value(keep_alive):
+    """``keep_alive`` as Ollama accepts it: numbers of seconds ("-1", "300") as numbers, durations as is.
+
+    Config files, environment variables and command-line flags give strings, and
+    Ollama rejects a number in a string ("-1") with 400 Bad Request.
+    """
+    if isinstance(keep_alive, str):
+        try:
+            return int(keep_alive)
+        except ValueError:
+            try:
+                return float(keep_alive)
+            except ValueError:
+                return keep_alive
+    return keep_alive
+
 
 class OllamaBackend(LLMBackend):
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2"):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2", keep_alive: str = None):
         self.base_url = base_url
         self.model = model
+        # How long Ollama keeps the model in memory after each request (e.g. "30m", "-1" for forever)
+        self.keep_alive = keep_alive_value(keep_alive)
+        # Keep-alive connection pool shared by all calls to this server
+        self.session = track_connections(requests.Session())
+        # Timing/token fields from the final chunk of the last chat() call (see telemetry.py)
+        self.last_stats: Dict[str, Any] = {}
+
+    @staticmethod
+    def _stats(json_response: Dict[str, Any]) -> Dict[str, Any]:
+        from telemetry import OLLAMA_STATS_FIELDS
+        return {k: json_response[k] for k in OLLAMA_STATS_FIELDS if k in json_response}
 
-    def generate_text(self, prompt: str, **kwargs) -> str:
+    def generate_text(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, Iterator[str]]:
         url = f"{self.base_url}/api/generate"
-        payload = {"model": self.model, "prompt": prompt, **kwargs}
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()["response"]
+        payload = {"model": self.model, "prompt": prompt, "stream": stream, **kwargs}
+        if self.keep_alive is not None:
+            payload.setdefault("keep_alive", self.keep_alive)
+        self.last_stats = {}
+        try:
+            response = self.session.post(url, json=payload, stream=stream)
+            response.raise_for_status()
+            if stream:
+                def generate():
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        try:
+                            json_response = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if json_response.get("done"):
+                            self.last_stats = self._stats(json_response)
+                        if json_response.get("response"):
+                            yield json_response["response"]
+                return generate()
+            json_response = response.json()
+            self.last_stats = self._stats(json_response)
+            return json_response["response"]
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"Failed to connect to Ollama server: {e}")
+        except KeyError:
+            raise ValueError("Unexpected response format from Ollama server.")
 
     def chat(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]] = None, stream: bool = False, **kwargs) -> Union[str, Iterator[str], ToolCall]:
         url = f"{self.base_url}/api/chat"
         payload = {"model": self.model, "messages": messages, "stream": stream, **kwargs}
+        if self.keep_alive is not None:
+            payload.setdefault("keep_alive", self.keep_alive)
         if tools:
             payload["tools"] = tools
+        self.last_stats = {}
 
+        if stream:
+            return self._chat_stream(url, payload)
         try:
-            response = requests.post(url, json=payload, stream=stream)
+            response = self.session.post(url, json=payload)
             response.raise_for_status()
-
-            if stream:
-                def generate():
-                    for line in response.iter_lines():
-                        if line:
-                            try:
-                                json_response = json.loads(line)
-                                if "message" in json_response and "tool_calls" in json_response["message"]:
-                                    tool_call = json_response["message"]["tool_calls"][0] # Assuming one tool call for simplicity
-                                    # For streaming, we return the ToolCall immediately and stop the generator
-                                    yield ToolCall(tool_name=tool_call["function"]["name"], parameters=tool_call["function"]["arguments"])
-                                    return # Stop iteration after yielding ToolCall
-                                elif "content" in json_response["message"]:
-                                    yield json_response["message"]["content"]
-                            except json.JSONDecodeError:
-                                pass
-                return generate()
+            json_response = response.json()
+            self.last_stats = self._stats(json_response)
+            if "message" in json_response and "tool_calls" in json_response["message"]:
+                tool_call = json_response["message"]["tool_calls"][0] # Assuming one tool call for simplicity
+                return ToolCall(tool_name=tool_call["function"]["name"], parameters=tool_call["function"]["arguments"])
             else:
-                json_response = response.json()
-                if "message" in json_response and "tool_calls" in json_response["message"]:
-                    tool_call = json_response["message"]["tool_calls"][0] # Assuming one tool call for simplicity
-                    return ToolCall(tool_name=tool_call["function"]["name"], parameters=tool_call["function"]["arguments"])
-                else:
-                    return json_response["message"]["content"]
+                return json_response["message"]["content"]
         except requests.exceptions.RequestException as e:
-            if e.response is not None and e.response.status_code == 400:
-                import logging
-                logging.error(f"Ollama server returned 400 Bad Request: {e.response.text}")
-            raise ConnectionError(f"Failed to connect to Ollama server: {e}")
+            raise self._connection_error(e)
         except KeyError:
             raise ValueError("Unexpected response format from Ollama server.")
 
+    @staticmethod
+    def _connection_error(e: requests.exceptions.RequestException) -> ConnectionError:
+        if e.response is not None and e.response.status_code == 400:
+            import logging
+            logging.error(f"Ollama server returned 400 Bad Request: {e.response.text}")
+        error = ConnectionError(f"Failed to connect to Ollama server: {e}")
+        error.__cause__ = e
+        return error
+
+    def _chat_stream(self, url: str, payload: Dict[str, Any]) -> ChatStream:
+        # The request is sent when the stream is first read, on the reading thread, and can
+        # be cancelled from the start: waiting for headers covers model loading and prefill.
+        handle = RequestHandle()
+
+        def generate():
+            try:
+                with handle.active():
+                    if handle.cancelled:
+                        return
+                    response = self.session.post(url, json=payload, stream=True)
+                handle.response = response
+                if handle.cancelled:
+                    abort_response(response)
+                    return
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                if handle.cancelled:
+                    return
+                raise self._connection_error(e)
+            try:
+                lines = response.iter_lines()
+                for line in lines:
+                    if line:
+                        try:
+                            json_response = json.loads(line)
+                            if json_response.get("done"):
+                                self.last_stats = self._stats(json_response)
+                            if "message" in json_response and "tool_calls" in json_response["message"]:
+                                tool_call = json_response["message"]["tool_calls"][0] # Assuming one tool call for simplicity
+                                # Ollama sends the final stats chunk right after the tool call; read it
+                                # before handing the ToolCall over, since callers stop iterating there.
+                                for rest in lines:
+                                    try:
+                                        rest = json.loads(rest) if rest else {}
+                                    except json.JSONDecodeError:
+                                        continue
+                                    if rest.get("done"):
+                                        self.last_stats = self._stats(rest)
+                                        break
+                                # For streaming, we return the ToolCall immediately and stop the generator
+                                yield ToolCall(tool_name=tool_call["function"]["name"], parameters=tool_call["function"]["arguments"])
+                                return # Stop iteration after yielding ToolCall
+                            else:
+                                message = json_response.get("message", {})
+                                if message.get("thinking"):
+                                    yield ThinkingChunk(message["thinking"])
+                                if "content" in message:
+                                    yield message["content"]
+                        except json.JSONDecodeError:
+                            pass
+            finally:
+                handle.detach()
+
+        return ChatStream(generate(), on_cancel=handle.cancel)
+
     def get_embedding(self, text: str) -> List[float]:
         url = f"{self.base_url}/api/embeddings"
         payload = {"model": self.model, "prompt": text}
-        response = requests.post(url, json=payload)
+        response = self.session.post(url, json=payload)
         response.raise_for_status()
         return response.json()["embedding"]
 
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed ``texts`` in one request (POST /api/embed); inputs over the model's context are truncated."""
+        payload = {"model": self.model, "input": list(texts)}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        response = self.session.post(f"{self.base_url}/api/embed", json=payload, timeout=300)
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    def list_models(self) -> List[str]:
+        """Return the names of the models available on the server (GET /api/tags)."""
+        response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+        response.raise_for_status()
+        return [m.get("name") for m in response.json().get("models", [])]
+
+    def list_running_models(self) -> List[str]:
+        """Return the names of the models currently loaded in memory (GET /api/ps)."""
+        response = self.session.get(f"{self.base_url}/api/ps", timeout=5)
+        response.raise_for_status()
+        return [m.get("name") for m in response.json().get("models", [])]
+
+    def show(self, model: str = None) -> Dict[str, Any]:
+        """Return the server's description of ``model`` (POST /api/show): capabilities, model_info, ..."""
+        response = self.session.post(f"{self.base_url}/api/show", json={"model": model or self.model}, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def preload(self, model: str = None, keep_alive: str = None, timeout: float = 300, options: Dict[str, Any] = None) -> None:
+        """Ask the server to load ``model`` (default: this backend's) into memory and keep it there.
+
+        ``options`` that size the model (``num_ctx``) must match later requests, or the server reloads it.
+        """
+        model = model or self.model
+        payload = {"model": model}
+        keep_alive = keep_alive_value(keep_alive) if keep_alive is not None else self.keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        if options:
+            payload["options"] = options
+        # An empty generate request loads the model without generating anything.
+        response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+        if response.status_code == 400:
+            # Embedding-only models reject /api/generate; load them through /api/embed instead.
+            response = self.session.post(f"{self.base_url}/api/embed", json={**payload, "input": ""}, timeout=timeout)
+        response.raise_for_status()
+
     def get_system_prompt(self) -> str:
         return (
             "You are Tilde, a helpful command-line AI assistant. "
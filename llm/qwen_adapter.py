@@ -1,11 +1,12 @@
+from .backend import ThinkingChunk
 from .base_adapter import BaseModelAdapter
 import json
 import logging
 
 class QwenModelAdapter(BaseModelAdapter):
-    def build_tool_definitions(self, tools):
+    def build_tool_definitions(self, tools, compact=False):
         # Qwen expects [{"type": "function", "function": ...}]
-        return [{"type": "function", "function": tool.to_dict()} for tool in tools.values()]
+        return [{"type": "function", "function": tool.to_dict(compact=compact)} for tool in tools.values()]
 
     def parse_response_stream(self, response_generator):
         """
@@ -13,6 +14,9 @@ class QwenModelAdapter(BaseModelAdapter):
         Skips <think> tags, detects tool calls as dict or JSON string.
         """
         for chunk in response_generator:
+            if isinstance(chunk, ThinkingChunk):
+                yield (None, chunk)
+                continue
             if isinstance(chunk, str) and chunk.strip().lower().startswith("<think"):
                 yield (None, chunk)
                 continue
@@ -0,0 +1,347 @@
+"""Deterministic Ollama stand-in for tests and benchmarks.
+
+The server speaks enough of the Ollama HTTP API (``/api/chat``, ``/api/generate``,
+``/api/tags``, ``/api/ps``, ``/api/show``, ``/api/embeddings``) for the CLI to run
+end to end without a model. Responses come from a *cassette*, a JSONL file with one
+recorded exchange per line::
+
+    {"key": "<sha256 of model+messages>", "model": "...", "chunks": [{...}, ...]}
+
+``chunks`` are the NDJSON objects Ollama streamed for that request. On replay they
+are re-timed: the first chunk is sent after ``first_token_delay`` seconds and each
+following content chunk after ``1 / token_rate`` seconds. With ``headers_with_first_chunk``
+the response headers are held back until the first chunk too, as real Ollama does
+while it loads the model and processes the prompt. The final chunk's
+``eval_count``/``eval_duration`` fields are rewritten to match, so telemetry sees
+consistent numbers.
+
+A request is answered by the exchange with the same key if there is one, otherwise
+by the next unused exchange in cassette order. This keeps scripted sessions
+deterministic even when prompts differ slightly between runs. In record mode the
+server proxies every request to a real Ollama server and appends what it streamed
+to the cassette.
+
+Run it standalone with ``python -m llm.replay_server --cassette session.jsonl``.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TOKEN_RATE = 50.0  # content chunks per second
+DEFAULT_FIRST_TOKEN_DELAY = 0.2  # seconds
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Stable key for a chat/generate request: the model plus its messages or prompt."""
+    body = {"model": payload.get("model"), "messages": payload.get("messages"), "prompt": payload.get("prompt")}
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def make_exchange(text: str = "", tool_call: Dict[str, Any] = None, model: str = "replay",
+                  chunk_chars: int = 4, key: str = None) -> Dict[str, Any]:
+    """Build a cassette exchange that streams ``text`` in ``chunk_chars`` pieces, or a single tool call."""
+    chunks: List[Dict[str, Any]] = []
+    if tool_call is not None:
+        chunks.append({"model": model, "message": {"role": "assistant", "content": "", "tool_calls": [
+            {"function": {"name": tool_call["name"], "arguments": tool_call.get("arguments", {})}}]}, "done": False})
+    else:
+        for i in range(0, len(text), chunk_chars):
+            chunks.append({"model": model, "message": {"role": "assistant", "content": text[i:i + chunk_chars]}, "done": False})
+    chunks.append({"model": model, "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop"})
+    exchange = {"model": model, "chunks": chunks}
+    if key:
+        exchange["key"] = key
+    return exchange
+
+
+class Cassette:
+    """Ordered, keyed collection of recorded exchanges backed by a JSONL file."""
+
+    def __init__(self, path: str = None, exchanges: List[Dict[str, Any]] = None):
+        self.path = path
+        self.exchanges: List[Dict[str, Any]] = list(exchanges or [])
+        if path and os.path.exists(path) and not exchanges:
+            with open(path, 'r') as f:
+                self.exchanges = [json.loads(line) for line in f if line.strip()]
+        self._used = set()
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def match(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = request_key(payload)
+        with self._lock:
+            for i, exchange in enumerate(self.exchanges):
+                if exchange.get("key") == key:
+                    self._used.add(i)
+                    return exchange
+            while self._cursor < len(self.exchanges):
+                i = self._cursor
+                self._cursor += 1
+                if i not in self._used:
+                    self._used.add(i)
+                    return self.exchanges[i]
+        return None
+
+    def rewind(self):
+        with self._lock:
+            self._used.clear()
+            self._cursor = 0
+
+    def append(self, exchange: Dict[str, Any]):
+        with self._lock:
+            self.exchanges.append(exchange)
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(exchange) + "\n")
+
+
+def _estimate_prompt_tokens(payload: Dict[str, Any]) -> int:
+    text = payload.get("prompt") or "".join(str(m.get("content", "")) for m in payload.get("messages") or [])
+    return max(1, len(text) // 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _send_json(self, body: Dict[str, Any], status: int = 200):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": name, "model": name} for name in self.server.models]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [{"name": name, "model": name} for name in self.server.loaded_models]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        self.server.requests.append((self.path, payload))
+        if self.path in ("/api/chat", "/api/generate") and not (payload.get("prompt") or payload.get("messages")):
+            # Ollama's "load the model" request
+            model = payload.get("model") or "replay"
+            if model not in self.server.loaded_models:
+                self.server.loaded_models.append(model)
+            self._send_json({"model": model, "done": True, "done_reason": "load"})
+        elif self.path in ("/api/chat", "/api/generate"):
+            if self.server.upstream:
+                self._proxy(payload)
+            else:
+                self._replay(payload)
+        elif self.path == "/api/show":
+            self._send_json({"model_info": {"general.architecture": "replay", "replay.context_length": self.server.context_length,
+                                            "tokenizer.ggml.model": "gpt2"},
+                             "capabilities": ["completion", "tools"]})
+        elif self.path == "/api/embeddings":
+            self._send_json({"embedding": self._embed(payload.get("prompt") or "")})
+        elif self.path == "/api/embed":
+            inputs = payload.get("input") or ""
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            self._send_json({"embeddings": [self._embed(text) for text in inputs]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    @staticmethod
+    def _embed(text: str) -> List[float]:
+        # Deterministic stand-in vector: the same text always gets the same embedding
+        digest = hashlib.sha256(json.dumps(text).encode('utf-8')).digest()
+        return [b / 255 for b in digest[:16]]
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, obj: Dict[str, Any]):
+        data = json.dumps(obj).encode('utf-8') + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _replay(self, payload: Dict[str, Any]):
+        server = self.server
+        exchange = server.cassette.match(payload) or make_exchange(server.default_text, model=payload.get("model") or "replay")
+        chunks = [dict(c) for c in exchange["chunks"]]
+        is_generate = self.path == "/api/generate"
+        if is_generate:
+            chunks = [_as_generate_chunk(c) for c in chunks]
+        started = time.perf_counter()
+        content_chunks = max(1, len(chunks) - 1)
+        final = chunks[-1]
+        final.update({
+            "done": True,
+            "eval_count": content_chunks,
+            "eval_duration": int(content_chunks / server.token_rate * 1e9),
+            "prompt_eval_count": _estimate_prompt_tokens(payload),
+            "prompt_eval_duration": int(server.first_token_delay * 1e9),
+            "load_duration": 0,
+        })
+        if not payload.get("stream", True):
+            time.sleep(server.first_token_delay + content_chunks / server.token_rate)
+            final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+            if is_generate:
+                final["response"] = "".join(c.get("response", "") for c in chunks)
+            else:
+                message = {"role": "assistant", "content": "".join(c.get("message", {}).get("content", "") for c in chunks)}
+                for c in chunks:
+                    if c.get("message", {}).get("tool_calls"):
+                        message["tool_calls"] = c["message"]["tool_calls"]
+                final["message"] = message
+            self._send_json(final)
+            return
+        try:
+            if server.headers_with_first_chunk:
+                time.sleep(server.first_token_delay)
+                self._start_stream()
+            else:
+                self._start_stream()
+                time.sleep(server.first_token_delay)
+            for i, chunk in enumerate(chunks):
+                if i > 0:
+                    time.sleep(1 / server.token_rate)
+                if chunk is final:
+                    chunk["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                self._write_chunk(chunk)
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled the stream
+
+    def _proxy(self, payload: Dict[str, Any]):
+        import requests
+        server = self.server
+        response = server.upstream_session.post(server.upstream + self.path, json=payload, stream=True)
+        chunks = []
+        try:
+            if payload.get("stream", True):
+                self._start_stream()
+                for line in response.iter_lines():
+                    if line:
+                        chunk = json.loads(line)
+                        chunks.append(chunk)
+                        self._write_chunk(chunk)
+                self._end_stream()
+            else:
+                body = response.json()
+                chunks.append(body)
+                self._send_json(body, response.status_code)
+        except (BrokenPipeError, ConnectionResetError, requests.RequestException):
+            pass
+        if chunks:
+            server.cassette.append({"key": request_key(payload), "model": payload.get("model"),
+                                    "path": self.path, "chunks": chunks})
+
+
+def _as_generate_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a recorded /api/chat chunk into the /api/generate shape (and pass generate chunks through)."""
+    if "message" in chunk:
+        chunk = dict(chunk)
+        chunk["response"] = chunk.pop("message").get("content", "")
+    return chunk
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """HTTP server replaying (or recording) Ollama streams; see the module docstring."""
+
+    daemon_threads = True
+
+    def __init__(self, cassette: Cassette = None, host: str = "127.0.0.1", port: int = 0,
+                 token_rate: float = DEFAULT_TOKEN_RATE, first_token_delay: float = DEFAULT_FIRST_TOKEN_DELAY,
+                 models: List[str] = None, loaded_models: List[str] = None, upstream: str = None,
+                 default_text: str = "OK.", context_length: int = 8192, headers_with_first_chunk: bool = False):
+        super().__init__((host, port), _Handler)
+        self.cassette = cassette if cassette is not None else Cassette()
+        self.token_rate = token_rate
+        self.first_token_delay = first_token_delay
+        self.models = list(models or ["replay"])
+        self.loaded_models = list(loaded_models if loaded_models is not None else self.models)
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.default_text = default_text
+        self.context_length = context_length
+        self.headers_with_first_chunk = headers_with_first_chunk
+        self.requests: List[tuple] = []
+        self._thread: Optional[threading.Thread] = None
+        if self.upstream:
+            import requests
+            self.upstream_session = requests.Session()
+
+    def handle_error(self, request, client_address):
+        import sys
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return  # clients dropping keep-alive connections
+        super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        """Serve in a background thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay (or record) Ollama chat streams from a cassette file.")
+    parser.add_argument("--cassette", required=True, help="JSONL cassette to replay from or record to.")
+    parser.add_argument("--record", metavar="UPSTREAM_URL", help="Proxy to this Ollama server and record its responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-rate", type=float, default=DEFAULT_TOKEN_RATE, help="Content chunks per second.")
+    parser.add_argument("--first-token-delay", type=float, default=DEFAULT_FIRST_TOKEN_DELAY, help="Seconds before the first chunk.")
+    parser.add_argument("--model", action="append", dest="models", help="Model name to advertise (repeatable).")
+    parser.add_argument("--headers-with-first-chunk", action="store_true",
+                        help="Hold response headers back until the first chunk, like Ollama while loading a model.")
+    args = parser.parse_args(argv)
+    server = ReplayServer(Cassette(args.cassette), host=args.host, port=args.port, token_rate=args.token_rate,
+                          first_token_delay=args.first_token_delay, models=args.models, upstream=args.record,
+                          headers_with_first_chunk=args.headers_with_first_chunk)
+    mode = f"recording {args.record}" if args.record else f"replaying {len(server.cassette.exchanges)} exchanges"
+    print(f"Ollama stand-in on {server.url}, {mode} ({args.cassette})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
+
+import requests
+
+from .backend import LLMBackend, ToolCall
+from .ollama_backend import OllamaBackend, model_in
+from .stream import ChatStream, StreamPump
+
+HEALTH_INTERVAL = 10.0  # seconds between /api/tags probes
+FAIL_THRESHOLD = 2  # consecutive failures before an endpoint is ejected
+LOADED_BONUS = 2  # a loaded model is worth this many queued requests (loading takes seconds)
+
+
+class Endpoint:
+    """One Ollama server: its own backend (and connection pool) plus load and health state."""
+
+    def __init__(self, base_url: str, model: str, keep_alive: str = None):
+        self.base_url = base_url.rstrip("/")
+        self.backend = OllamaBackend(base_url=self.base_url, model=model, keep_alive=keep_alive)
+        self.outstanding = 0
+        self.healthy = True
+        self.failures = 0
+        self.models: List[str] = []
+        self.loaded_models: List[str] = []
+        self.last_checked = 0.0
+
+    def has_loaded(self, model: str) -> bool:
+        return model_in(self.loaded_models, model)
+
+    def __repr__(self):
+        state = "up" if self.healthy else "ejected"
+        return f"Endpoint({self.base_url}, {state}, outstanding={self.outstanding})"
+
+
+def _is_endpoint_failure(error: Exception) -> bool:
+    """True for errors that say something about the server (unreachable, timed out, 5xx), not the request."""
+    cause = (error.__cause__ or error.__context__) if isinstance(error, ConnectionError) else error
+    if isinstance(cause, requests.HTTPError) and cause.response is not None:
+        return cause.response.status_code >= 500
+    return True
+
+
+class HedgePolicy:
+    """When to hedge a streamed chat request, and how often that has helped.
+
+    The hedge delay is the p95 of recent time-to-first-token samples (``initial_delay``
+    until ``min_samples`` are in). ``budget`` caps hedges at that fraction of
+    requests, with a burst of one, so a slow cluster never gets twice the load.
+    """
+
+    def __init__(self, initial_delay: float = 2.0, budget: float = 0.1, min_delay: float = 0.05,
+                 min_samples: int = 20, window: int = 200):
+        self.initial_delay = initial_delay
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._ttfts: Deque[float] = deque(maxlen=window)
+        self._tokens = 1.0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "fired": 0, "won": 0, "denied": 0}
+
+    def delay(self) -> float:
+        with self._lock:
+            if len(self._ttfts) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._ttfts)
+            return max(self.min_delay, ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))])
+
+    def allow(self, spare_endpoint: bool = True) -> bool:
+        """Spend budget for one hedge if there is some (and somewhere to send it)."""
+        with self._lock:
+            if spare_endpoint and self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.stats["denied"] += 1
+            return False
+
+    def record(self, ttft: Optional[float], fired: bool, won: bool):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["fired"] += fired
+            self.stats["won"] += won
+            self._tokens = min(1.0, self._tokens + self.budget)
+            if ttft is not None:
+                self._ttfts.append(ttft)
+
+
+class OllamaRouter(LLMBackend):
+    """Spread requests for one model over several Ollama servers.
+
+    Each call goes to the healthy endpoint with the fewest outstanding requests.
+    Endpoints that already have the model loaded (per ``/api/ps``) count as
+    ``LOADED_BONUS`` requests less busy. A background thread probes every
+    endpoint's ``/api/tags`` every ``health_interval`` seconds. It ejects an
+    endpoint after ``FAIL_THRESHOLD`` consecutive failures and re-admits it on the
+    first successful probe. A request that fails to connect is retried on the
+    next endpoint.
+
+    With a :class:`HedgePolicy`, a streamed chat whose first token is late is
+    also sent to a second endpoint. The stream that produces a token first wins
+    and the other is cancelled.
+    """
+
+    def __init__(self, base_urls: List[str], model: str = "llama2", health_interval: float = HEALTH_INTERVAL,
+                 hedging: HedgePolicy = None, keep_alive: str = None):
+        if not base_urls:
+            raise ValueError("OllamaRouter needs at least one endpoint")
+        self.model = model
+        self.endpoints = [Endpoint(url, model, keep_alive) for url in base_urls]
+        self.health_interval = health_interval
+        self.last_stats: Dict[str, Any] = {}
+        self.last_endpoint: Optional[Endpoint] = None
+        self.last_hedge: Dict[str, Any] = {}
+        self.hedging: Optional[HedgePolicy] = hedging
+        self._lock = threading.Lock()
+        self._tiebreak = itertools.count()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return self.endpoints[0].base_url
+
+    # -- endpoint selection ------------------------------------------------
+
+    def _candidates(self, exclude=()) -> List[Endpoint]:
+        healthy = [e for e in self.endpoints if e.healthy and e not in exclude]
+        # With every endpoint ejected, keep trying them rather than failing outright.
+        return healthy or [e for e in self.endpoints if e not in exclude]
+
+    def acquire(self, exclude=()) -> Optional[Endpoint]:
+        """Reserve the least-loaded endpoint (or None if all are excluded); pair with :meth:`release`."""
+        self._ensure_health_checks()
+        with self._lock:
+            candidates = self._candidates(exclude)
+            if not candidates:
+                return None
+            turn = next(self._tiebreak)
+            n = len(self.endpoints)
+            endpoint = min(candidates, key=lambda e: (
+                e.outstanding - (LOADED_BONUS if e.has_loaded(self.model) else 0),
+                (self.endpoints.index(e) - turn) % n,  # round-robin among equals
+            ))
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: bool = True):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.failures = 0
+        if not ok:
+            self._record_failure(endpoint)
+
+    def _record_failure(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.failures += 1
+            if endpoint.healthy and endpoint.failures >= FAIL_THRESHOLD:
+                endpoint.healthy = False
+                logging.warning("Ollama endpoint %s ejected after %d failures", endpoint.base_url, endpoint.failures)
+
+    # -- health checks -----------------------------------------------------
+
+    def check_health(self):
+        """Probe every endpoint once; eject failing ones and re-admit recovered ones."""
+        for endpoint in self.endpoints:
+            try:
+                endpoint.models = endpoint.backend.list_models()
+                endpoint.loaded_models = endpoint.backend.list_running_models()
+            except (requests.RequestException, ValueError):
+                self._record_failure(endpoint)
+            else:
+                with self._lock:
+                    if not endpoint.healthy:
+                        logging.info("Ollama endpoint %s re-admitted", endpoint.base_url)
+                    endpoint.healthy = True
+                    endpoint.failures = 0
+            endpoint.last_checked = time.time()
+
+    def _ensure_health_checks(self):
+        if self._health_thread is None and self.health_interval > 0 and len(self.endpoints) > 1:
+            with self._lock:
+                if self._health_thread is None:
+                    self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+                    self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self.check_health()
+            self._stop.wait(self.health_interval)
+
+    def close(self):
+        self._stop.set()
+
+    # -- LLMBackend --------------------------------------------------------
+
+    def _call(self, method: str, *args, exclude=(), **kwargs):
+        tried = list(exclude)
+        while True:
+            endpoint = self.acquire(exclude=tried)
+            if endpoint is None:
+                raise ConnectionError(f"No Ollama endpoint reachable (tried {', '.join(e.base_url for e in tried) or 'none'})")
+            try:
+                result = getattr(endpoint.backend, method)(*args, **kwargs)
+            except (ConnectionError, requests.ConnectionError, requests.Timeout) as e:
+                if not _is_endpoint_failure(e):
+                    self.release(endpoint)
+                    raise
+                self.release(endpoint, ok=False)
+                logging.debug("Ollama endpoint %s failed: %s", endpoint.base_url, e)
+                tried.append(endpoint)
+                continue
+            except Exception:
+                self.release(endpoint)
+                raise
+            self.last_endpoint = endpoint
+            return endpoint, result
+
+    def chat(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]] = None, stream: bool = False, **kwargs) -> Union[str, Iterator[str], ToolCall]:
+        self.last_stats = {}
+        self.last_hedge = {}
+        if not stream:
+            endpoint, result = self._call("chat", messages, tools=tools, **kwargs)
+            self.last_stats = endpoint.backend.last_stats
+            self.release(endpoint)
+            return result
+        routed = self._routed_stream(messages, tools=tools, **kwargs)
+        if self.hedging is None:
+            return ChatStream(self._track_stream(routed, routed), on_cancel=routed.cancel)
+        return self._hedged_stream(routed, messages, tools=tools, **kwargs)
+
+    def _routed_stream(self, messages, exclude=(), **kwargs) -> Optional["_RoutedStream"]:
+        # The endpoint is reserved now, so concurrent calls spread out before any of them connects.
+        endpoint = self.acquire(exclude=exclude)
+        return None if endpoint is None else _RoutedStream(self, endpoint, messages, exclude, kwargs)
+
+    def _track_stream(self, routed: "_RoutedStream", items: Iterator) -> Iterator:
+        try:
+            for item in items:
+                self.last_stats = routed.endpoint.backend.last_stats
+                yield item
+        finally:
+            self.last_stats = routed.endpoint.backend.last_stats
+            self.last_endpoint = routed.endpoint
+
+    def _hedged_stream(self, primary: "_RoutedStream", messages, **kwargs) -> ChatStream:
+        """Race a second endpoint against ``primary`` if its first token is late; stream the winner.
+
+        The primary request is sent right away on its pump thread, so the hedge delay
+        counts from the start of the request, including the wait for response headers
+        while the server loads the model.
+        """
+        first = threading.Event()
+        racers = [StreamPump(primary, notify=first).start()]
+
+        def race():
+            hedging = self.hedging
+            delay = hedging.delay() - (time.perf_counter() - racers[0].started)
+            if not first.wait(max(0.0, delay)) and hedging.allow(self._has_spare_endpoint(primary.endpoint)):
+                second = self._routed_stream(messages, exclude=[primary.endpoint], **kwargs)
+                if second is not None:
+                    racers.append(StreamPump(second, notify=first).start())
+                    logging.debug("Hedged chat request to %s after %.2fs without a first token",
+                                  second.endpoint.base_url, time.perf_counter() - racers[0].started)
+            first.wait()
+            winner = next((pump for pump in racers if pump.first_item.is_set()), racers[0])
+            for pump in racers:
+                if pump is not winner:
+                    pump.cancel()  # the loser releases its endpoint when its pump stops
+            fired = len(racers) > 1
+            won = fired and winner is not racers[0]
+            hedging.record(winner.ttft, fired=fired, won=won)
+            self.last_hedge = {"hedged": fired, "hedge_won": won}
+            yield from self._track_stream(winner.stream, iter(winner))
+
+        def cancel():
+            for pump in racers:
+                pump.cancel()
+
+        return ChatStream(race(), on_cancel=cancel)
+
+    def _has_spare_endpoint(self, busy: Endpoint) -> bool:
+        return any(e.healthy and e is not busy for e in self.endpoints)
+
+    def generate_text(self, prompt: str, **kwargs) -> str:
+        endpoint, result = self._call("generate_text", prompt, **kwargs)
+        self.last_stats = endpoint.backend.last_stats
+        self.release(endpoint)
+        return result
+
+    def get_embedding(self, text: str) -> List[float]:
+        endpoint, result = self._call("get_embedding", text)
+        self.release(endpoint)
+        return result
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        endpoint, result = self._call("get_embeddings", texts)
+        self.release(endpoint)
+        return result
+
+    def list_models(self) -> List[str]:
+        endpoint, result = self._call("list_models")
+        self.release(endpoint)
+        return result
+
+    def show(self, model: str = None) -> Dict[str, Any]:
+        endpoint, result = self._call("show", model)
+        self.release(endpoint)
+        return result
+
+    def list_running_models(self) -> List[str]:
+        """Models loaded on any healthy endpoint."""
+        loaded = []
+        for endpoint in self._candidates():
+            try:
+                endpoint.loaded_models = endpoint.backend.list_running_models()
+            except (requests.RequestException, ValueError):
+                continue
+            loaded.extend(m for m in endpoint.loaded_models if m not in loaded)
+        return loaded
+
+    def preload(self, model: str = None, keep_alive: str = None, timeout: float = 300, options: Dict[str, Any] = None) -> None:
+        """Load ``model`` on the endpoint that would serve the next request, unless one already has it."""
+        model = model or self.model
+        self.list_running_models()
+        if any(e.has_loaded(model) for e in self._candidates()):
+            return
+        endpoint, _ = self._call("preload", model, keep_alive=keep_alive, timeout=timeout, options=options)
+        endpoint.loaded_models.append(model)
+        self.release(endpoint)
+
+    def get_system_prompt(self) -> str:
+        return self.endpoints[0].backend.get_system_prompt()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [{"url": e.base_url, "healthy": e.healthy, "outstanding": e.outstanding,
+                 "loaded": e.has_loaded(self.model)} for e in self.endpoints]
+
+    @property
+    def hedge_stats(self) -> Dict[str, int]:
+        return dict(self.hedging.stats) if self.hedging else {}
+
+
+class _RoutedStream:
+    """A streamed chat reserved on one endpoint, sent when it is first read.
+
+    If the endpoint can't be reached before the first chunk arrives, the request
+    moves on to the next endpoint, like :meth:`OllamaRouter._call` does for other
+    calls. The current endpoint stays reserved until the stream ends, fails or is
+    cancelled; it is released from the reading thread.
+    """
+
+    def __init__(self, router: OllamaRouter, endpoint: Endpoint, messages, exclude, kwargs: Dict[str, Any]):
+        self.router = router
+        self.endpoint = endpoint
+        self.cancelled = False
+        self._messages = messages
+        self._tried = list(exclude)
+        self._kwargs = kwargs
+        self._stream: Optional[ChatStream] = None
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        router, endpoint, ok, started = self.router, self.endpoint, True, False
+        try:
+            while True:
+                stream = endpoint.backend.chat(self._messages, stream=True, **self._kwargs)
+                with self._lock:
+                    self._stream = stream
+                    cancelled = self.cancelled
+                if cancelled:
+                    return
+                try:
+                    for item in stream:
+                        started = True
+                        yield item
+                    return
+                except (ConnectionError, requests.ConnectionError, requests.Timeout) as e:
+                    if started or not _is_endpoint_failure(e):
+                        ok = not _is_endpoint_failure(e)
+                        raise
+                    logging.debug("Ollama endpoint %s failed: %s", endpoint.base_url, e)
+                    router.release(endpoint, ok=False)
+                    self._tried.append(endpoint)
+                    endpoint = router.acquire(exclude=self._tried)
+                    if endpoint is None:
+                        raise ConnectionError("No Ollama endpoint reachable (tried "
+                                              f"{', '.join(e.base_url for e in self._tried)})") from e
+                    self.endpoint = endpoint
+                except requests.RequestException:
+                    ok = False
+                    raise
+        finally:
+            if endpoint is not None:
+                router.release(endpoint, ok=ok)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            stream = self._stream
+        if stream is not None:
+            stream.cancel()
+
+
+def create_backend(base_url: Union[str, List[str]], model: str, health_interval: float = HEALTH_INTERVAL,
+                   hedging: HedgePolicy = None, keep_alive: str = None) -> LLMBackend:
+    """Return an OllamaBackend for one URL, or an OllamaRouter when several are configured."""
+    urls = [u.strip() for u in base_url.split(",")] if isinstance(base_url, str) else list(base_url)
+    urls = [u for u in urls if u]
+    if len(urls) == 1:
+        return OllamaBackend(base_url=urls[0], model=model, keep_alive=keep_alive)
+    return OllamaRouter(urls, model=model, health_interval=health_interval, hedging=hedging, keep_alive=keep_alive)
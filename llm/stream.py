@@ -0,0 +1,314 @@
+import contextlib
+import queue
+import socket
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+def abort_response(response) -> None:
+    """Close a streaming ``requests`` response, waking any thread blocked reading it.
+
+    Closing the file descriptor alone leaves a concurrent ``recv`` blocked on Linux,
+    and the server keeps generating. Shutting the socket down first sends a FIN, which
+    makes Ollama stop work on the request.
+    """
+    raw = getattr(response, "raw", None)
+    conn = getattr(raw, "_connection", None)  # urllib3 2.x
+    sock = getattr(conn, "sock", None)
+    if sock is None:
+        try:
+            sock = raw._fp.fp.raw._sock  # urllib3 1.x
+        except AttributeError:
+            sock = None
+    _shutdown(sock)
+    try:
+        response.close()
+    except Exception:
+        pass
+
+
+def _shutdown(sock) -> None:
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+_current = threading.local()
+
+
+class RequestHandle:
+    """Lets another thread abort one HTTP request at any point, even before its response headers arrive.
+
+    The request must be made inside :meth:`active` on a session set up with
+    :func:`track_connections`; the connection it is sent on is recorded here, and
+    :meth:`cancel` shuts that socket down. Ollama sends no headers until the model is
+    loaded and the prompt processed, so without this a cancelled request keeps the
+    server (and the reading thread) busy until the first token.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.response = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def active(self):
+        _current.handle = self
+        try:
+            yield self
+        finally:
+            _current.handle = None
+
+    def attach(self, conn):
+        with self._lock:
+            self._conn = conn
+            cancelled = self.cancelled
+        if cancelled:
+            _shutdown(getattr(conn, "sock", None))
+
+    def detach(self):
+        """Forget the connection once the request is over (it goes back to the pool for reuse)."""
+        with self._lock:
+            self._conn = None
+            self.response = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            conn, response = self._conn, self.response
+        if response is not None:
+            abort_response(response)
+        elif conn is not None:
+            _shutdown(getattr(conn, "sock", None))
+
+
+class _TrackingPoolMixin:
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        handle = getattr(_current, "handle", None)
+        if handle is not None:
+            handle.attach(conn)
+        return conn
+
+
+class _TrackingHTTPConnectionPool(_TrackingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _TrackingHTTPSConnectionPool(_TrackingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _TrackingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TrackingHTTPConnectionPool,
+                                                   "https": _TrackingHTTPSConnectionPool}
+
+
+def track_connections(session):
+    """Mount adapters on ``session`` that report connections to the active :class:`RequestHandle`."""
+    session.mount("http://", _TrackingAdapter())
+    session.mount("https://", _TrackingAdapter())
+    return session
+
+
+class ChatStream:
+    """Iterator over a streaming chat response that another thread can cancel.
+
+    ``on_cancel`` does the actual work (for Ollama, aborting the HTTP response);
+    after it runs, errors from the interrupted read end the iteration quietly.
+    """
+
+    def __init__(self, chunks: Iterator[Any], on_cancel: Callable[[], None] = None):
+        self._chunks = chunks
+        self._on_cancel = on_cancel
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except Exception:
+            if self.cancelled:
+                raise StopIteration
+            raise
+
+    def cancel(self):
+        """Stop the stream from any thread."""
+        self.cancelled = True
+        if self._on_cancel is not None:
+            self._on_cancel()
+
+    def close(self):
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+
+_END = object()
+
+
+class StreamPump:
+    """Read a stream on a background thread so the consumer can wait on it with timeouts.
+
+    ``first_item`` is set as soon as the first chunk (or the end/an error) arrives,
+    which is what hedging and first-token deadlines wait on.
+    """
+
+    def __init__(self, stream: Iterator[Any], notify: threading.Event = None):
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.first_item = threading.Event()
+        self.first_item_at: Optional[float] = None
+        self.last_item_at: Optional[float] = None
+        self.done = False
+        self._notify = notify
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "StreamPump":
+        self._thread.start()
+        return self
+
+    def _mark(self):
+        now = time.perf_counter()
+        self.last_item_at = now
+        if self.first_item_at is None:
+            self.first_item_at = now
+            self.first_item.set()
+            if self._notify is not None:
+                self._notify.set()
+
+    def _run(self):
+        try:
+            for item in self.stream:
+                self._mark()
+                self._queue.put(item)
+        except BaseException as e:
+            self._queue.put(e)
+        finally:
+            self.done = True
+            self._queue.put(_END)
+            self._mark()
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return None if self.first_item_at is None else self.first_item_at - self.started
+
+    def get(self, timeout: float = None):
+        """Return the next item; raise ``queue.Empty`` on timeout and ``StopIteration`` at the end."""
+        item = self._queue.get(timeout=timeout)
+        if item is _END:
+            self._queue.put(_END)  # keep reporting the end to later calls
+            raise StopIteration
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.get()
+            except StopIteration:
+                return
+
+    def cancel(self):
+        _cancel(self.stream)
+
+
+class StreamTimeout(TimeoutError):
+    """A streaming call missed its first-token, idle or total deadline (and was cancelled)."""
+
+    def __init__(self, kind: str, seconds: float):
+        super().__init__(f"no {kind} from the model within {seconds:g}s" if kind != "total" else f"response took longer than {seconds:g}s")
+        self.kind = kind
+        self.seconds = seconds
+
+
+class DeadlineStream:
+    """Start a streaming call on a background thread and iterate it under deadlines.
+
+    ``start`` is called on the reader thread (so waiting for response headers is
+    covered too) and must return an iterator, ideally one with ``cancel()``. So that
+    cancelling reaches a request still waiting for headers, ``start`` should return
+    at once and send the request on the first read, as ``OllamaBackend.chat`` does.
+    ``first_token`` bounds the wait for the first chunk, ``idle`` the gap between
+    chunks and ``total`` the whole call; ``None`` or 0 disables a deadline. A
+    missed deadline cancels the call and raises :class:`StreamTimeout`. :meth:`cancel`
+    (e.g. on Ctrl-C) ends iteration early from any thread.
+    """
+
+    def __init__(self, start: Callable[[], Iterator[Any]], first_token: float = None, idle: float = None,
+                 total: float = None):
+        self._start = start
+        self.first_token = first_token or None
+        self.idle = idle or None
+        self.total = total or None
+        self.cancelled = False
+        self._stream = None
+        self._lock = threading.Lock()
+        self.pump: Optional[StreamPump] = None
+
+    def _open(self):
+        stream = self._start()
+        with self._lock:
+            self._stream = stream
+            cancelled = self.cancelled
+        if cancelled:
+            _cancel(stream)
+            return
+        yield from stream
+
+    def _next_deadline(self, started: float):
+        pump = self.pump
+        deadlines = []
+        if pump.first_item_at is None:
+            if self.first_token:
+                deadlines.append((started + self.first_token, "first token", self.first_token))
+        elif self.idle:
+            deadlines.append((pump.last_item_at + self.idle, "token", self.idle))
+        if self.total:
+            deadlines.append((started + self.total, "total", self.total))
+        return min(deadlines) if deadlines else (None, None, None)
+
+    def __iter__(self):
+        self.pump = StreamPump(self._open()).start()
+        started = self.pump.started
+        while True:
+            deadline, kind, seconds = self._next_deadline(started)
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                item = self.pump.get(timeout=timeout)
+            except queue.Empty:
+                if self._next_deadline(started)[0] > time.perf_counter():
+                    continue  # a chunk arrived just as we timed out
+                self.cancel()
+                raise StreamTimeout(kind, seconds)
+            except StopIteration:
+                return
+            if self.cancelled:
+                return
+            yield item
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            stream = self._stream
+        if stream is not None:
+            _cancel(stream)
+
+
+def _cancel(stream):
+    cancel = getattr(stream, "cancel", None)
+    if cancel is not None:
+        cancel()
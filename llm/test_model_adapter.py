@@ -0,0 +1,24 @@
+from llm.backend import ThinkingChunk
+from llm.model_adapter import get_model_adapter
+
+
+def test_extract_tool_call_from_text():
+    adapter = get_model_adapter("qwen3")
+    expected = {"tool_name": "ls", "parameters": {"path": "."}}
+    assert adapter.extract_tool_call('{"name": "ls", "arguments": {"path": "."}}') == expected
+    assert adapter.extract_tool_call('<tool_call>\n{"name": "ls", "arguments": {"path": "."}}\n</tool_call>') == expected
+    assert adapter.extract_tool_call('```json\n{"tool_name": "ls", "parameters": {"path": "."}}\n```') == expected
+    assert adapter.extract_tool_call("Here is the listing you asked for.") is None
+
+
+def test_parse_structured_response():
+    adapter = get_model_adapter("qwen3")
+    assert adapter.parse_structured_response('{"tool_name": "ls", "parameters": {"path": "/"}, "answer": ""}') == \
+        ({"tool_name": "ls", "parameters": {"path": "/"}}, None)
+    assert adapter.parse_structured_response('{"tool_name": null, "parameters": {}, "answer": "Hi"}') == (None, "Hi")
+
+
+def test_thinking_chunks_are_never_tool_calls():
+    adapter = get_model_adapter("qwen3")
+    chunks = [ThinkingChunk('{"name": "ls"}'), "done"]
+    assert list(adapter.parse_response_stream(iter(chunks))) == [(None, chunks[0]), (None, "done")]
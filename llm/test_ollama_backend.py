@@ -33,6 +33,16 @@ def test_chat_streaming(ollama_backend):
         responses = list(ollama_backend.chat(messages, stream=True))
         assert responses == ["Chat", " response."]
 
+def test_chat_streaming_captures_final_stats(ollama_backend):
+    with requests_mock.Mocker() as m:
+        m.post("http://localhost:11434/api/chat", text=(
+            '{"message": {"tool_calls": [{"function": {"name": "ls", "arguments": {}}}]}}\n'
+            '{"message": {"content": ""}, "done": true, "eval_count": 12, "eval_duration": 400000000, "prompt_eval_count": 30}\n'
+        ))
+        responses = list(ollama_backend.chat([{"role": "user", "content": "Hi"}], stream=True))
+        assert responses[0]["tool_name"] == "ls"
+        assert ollama_backend.last_stats == {"eval_count": 12, "eval_duration": 400000000, "prompt_eval_count": 30}
+
 def test_get_embedding(ollama_backend):
     with requests_mock.Mocker() as m:
         m.post("http://localhost:11434/api/embeddings", json={"embedding": [0.1, 0.2, 0.3]})
@@ -51,3 +61,13 @@ def test_key_error(ollama_backend):
         with pytest.raises(ValueError):
             ollama_backend.generate_text("Hello")
 
+
+def test_numeric_keep_alive_is_sent_as_a_number():
+    backend = OllamaBackend(base_url="http://localhost:11434", model="test_model", keep_alive="-1")
+    with requests_mock.Mocker() as m:
+        m.post("http://localhost:11434/api/chat", json={"message": {"content": "Hi."}})
+        m.post("http://localhost:11434/api/generate", json={})
+        backend.chat([{"role": "user", "content": "Hi"}])
+        backend.preload(keep_alive="300")
+        backend.preload(keep_alive="2h")
+        assert [r.json()["keep_alive"] for r in m.request_history] == [-1, 300, "2h"]
@@ -0,0 +1,50 @@
+import time
+import pytest
+from llm.ollama_backend import OllamaBackend
+from llm.replay_server import Cassette, ReplayServer, make_exchange, request_key
+
+
+@pytest.fixture
+def server():
+    cassette = Cassette(exchanges=[
+        make_exchange("Hello there, friend.", chunk_chars=5),
+        make_exchange(tool_call={"name": "ls", "arguments": {"path": "."}}),
+    ])
+    with ReplayServer(cassette, token_rate=200, first_token_delay=0.1) as srv:
+        yield srv
+
+
+def test_replays_streams_in_order_with_timing(server):
+    backend = OllamaBackend(base_url=server.url, model="replay")
+    messages = [{"role": "user", "content": "Hi"}]
+    started = time.perf_counter()
+    stream = backend.chat(messages, stream=True)
+    first = next(stream)
+    assert time.perf_counter() - started >= 0.1
+    assert first + "".join(stream) == "Hello there, friend."
+    assert backend.last_stats["eval_count"] == 4
+    assert backend.last_stats["eval_duration"] == int(4 / 200 * 1e9)
+
+    tool_call = list(backend.chat(messages, stream=True))[0]
+    assert tool_call == {"tool_name": "ls", "parameters": {"path": "."}}
+
+
+def test_matches_recorded_request_by_key():
+    keyed = [{"role": "user", "content": "keyed"}]
+    key = request_key({"model": "replay", "messages": keyed})
+    cassette = Cassette(exchanges=[make_exchange("in order"), make_exchange("by key", key=key)])
+    with ReplayServer(cassette, token_rate=1000, first_token_delay=0) as srv:
+        backend = OllamaBackend(base_url=srv.url, model="replay")
+        assert backend.chat(keyed) == "by key"
+        assert backend.chat([{"role": "user", "content": "other"}]) == "in order"
+        assert backend.list_models() == ["replay"]
+
+
+def test_record_mode_captures_upstream(server, tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    with ReplayServer(Cassette(path), upstream=server.url) as recorder:
+        backend = OllamaBackend(base_url=recorder.url, model="replay")
+        assert "".join(backend.chat([{"role": "user", "content": "Hi"}], stream=True)) == "Hello there, friend."
+    with ReplayServer(Cassette(path), token_rate=1000, first_token_delay=0) as replay:
+        backend = OllamaBackend(base_url=replay.url, model="replay")
+        assert "".join(backend.chat([{"role": "user", "content": "Hi"}], stream=True)) == "Hello there, friend."
@@ -0,0 +1,124 @@
+import threading
+import time
+import pytest
+from llm.ollama_backend import OllamaBackend
+from llm.replay_server import ReplayServer
+from llm.router import OllamaRouter, create_backend
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+@pytest.fixture
+def servers():
+    started = [ReplayServer(token_rate=100, first_token_delay=0.05, models=["m"], loaded_models=[]).start()
+               for _ in range(3)]
+    yield started
+    for server in started:
+        try:
+            server.stop()
+        except OSError:
+            pass
+
+
+def test_create_backend_single_and_list(servers):
+    assert isinstance(create_backend(servers[0].url, "m"), OllamaBackend)
+    router = create_backend(",".join(s.url for s in servers), "m")
+    assert isinstance(router, OllamaRouter) and len(router.endpoints) == 3
+
+
+def test_least_outstanding_spreads_concurrent_streams(servers):
+    router = OllamaRouter([s.url for s in servers], model="m", health_interval=0)
+    streams = [router.chat(MESSAGES, stream=True) for _ in range(3)]
+    assert [e.outstanding for e in router.endpoints] == [1, 1, 1]
+    threads = [threading.Thread(target=list, args=(s,)) for s in streams]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [e.outstanding for e in router.endpoints] == [0, 0, 0]
+    assert [len(s.requests) for s in servers] == [1, 1, 1]
+    assert router.last_stats["eval_count"] >= 1
+
+
+def test_prefers_endpoint_with_model_loaded(servers):
+    servers[2].loaded_models = ["m"]
+    router = OllamaRouter([s.url for s in servers], model="m", health_interval=0)
+    router.check_health()
+    for _ in range(2):
+        assert router.chat(MESSAGES) == "OK."
+    assert len(servers[2].requests) == 2
+
+
+def test_ejects_failed_endpoint_and_readmits(servers):
+    router = OllamaRouter([s.url for s in servers], model="m", health_interval=0)
+    dead_url = servers[0].url
+    servers[0].stop()
+    for _ in range(4):
+        assert router.chat(MESSAGES) == "OK."  # connect failures fail over to the next endpoint
+    router.check_health()
+    assert not router.endpoints[0].healthy
+    assert all(e.healthy for e in router.endpoints[1:])
+
+    port = int(dead_url.rsplit(":", 1)[1])
+    servers[0] = ReplayServer(port=port, models=["m"], first_token_delay=0).start()
+    router.check_health()
+    assert router.endpoints[0].healthy
+
+
+def test_hedges_slow_first_token_and_cancels_loser(servers):
+    from llm.router import HedgePolicy
+    servers[0].first_token_delay = 2.0  # e.g. swapping models
+    servers[1].first_token_delay = 0.0
+    hedging = HedgePolicy(initial_delay=0.1, budget=0.5)
+    router = OllamaRouter([s.url for s in servers[:2]], model="m", health_interval=0, hedging=hedging)
+    started = time.perf_counter()
+    assert "".join(router.chat(MESSAGES, stream=True)) == "OK."
+    assert time.perf_counter() - started < 1.0
+    assert router.last_hedge == {"hedged": True, "hedge_won": True}
+    assert [e.outstanding for e in router.endpoints] == [0, 0]
+
+    # The burst of one is spent; the next slow request waits instead of hedging.
+    router.endpoints[1].outstanding = 5  # steer the primary to the slow server
+    assert "".join(router.chat(MESSAGES, stream=True)) == "OK."
+    assert router.last_hedge == {"hedged": False, "hedge_won": False}
+    assert hedging.stats == {"requests": 2, "fired": 1, "won": 1, "denied": 1}
+
+
+def test_hedge_clock_starts_before_response_headers(servers):
+    from llm.router import HedgePolicy
+    # Like Ollama loading a model: no headers until the first token
+    servers[0].first_token_delay = 2.0
+    servers[0].headers_with_first_chunk = True
+    servers[1].first_token_delay = 0.0
+    router = OllamaRouter([s.url for s in servers[:2]], model="m", health_interval=0,
+                          hedging=HedgePolicy(initial_delay=0.1))
+    router.endpoints[1].outstanding = 1  # steer the primary to the slow server
+    started = time.perf_counter()
+    stream = router.chat(MESSAGES, stream=True)
+    assert time.perf_counter() - started < 0.5  # chat() itself doesn't wait for headers
+    assert "".join(stream) == "OK."
+    assert time.perf_counter() - started < 1.0
+    assert router.last_hedge == {"hedged": True, "hedge_won": True}
+    assert router.last_endpoint is router.endpoints[1]
+    assert len(servers[1].requests) == 1
+    assert [e.outstanding for e in router.endpoints] == [0, 1]
+
+
+def test_stream_fails_over_when_endpoint_is_down(servers):
+    router = OllamaRouter([s.url for s in servers[:2]], model="m", health_interval=0)
+    servers[0].stop()
+    router.endpoints[1].outstanding = 1  # the dead server is picked first
+    assert "".join(router.chat(MESSAGES, stream=True)) == "OK."
+    assert router.last_endpoint is router.endpoints[1]
+    assert router.endpoints[0].failures == 1
+    assert [e.outstanding for e in router.endpoints] == [0, 1]
+
+
+def test_preload_loads_model_once(servers):
+    router = OllamaRouter([s.url for s in servers], model="m", health_interval=0, keep_alive="10m")
+    assert router.list_running_models() == []
+    router.preload()
+    router.preload()
+    loads = [p for s in servers for p in s.requests if p[0] == "/api/generate"]
+    assert loads == [("/api/generate", {"model": "m", "keep_alive": "10m"})]
+    assert router.list_running_models() == ["m"]
@@ -0,0 +1,64 @@
+import threading
+import time
+import pytest
+from llm.ollama_backend import OllamaBackend
+from llm.replay_server import Cassette, ReplayServer, make_exchange
+from llm.stream import DeadlineStream, StreamTimeout
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def _server(first_token_delay, token_rate=20, headers_with_first_chunk=False):
+    cassette = Cassette(exchanges=[make_exchange("x" * 40, chunk_chars=1) for _ in range(2)])
+    return ReplayServer(cassette, token_rate=token_rate, first_token_delay=first_token_delay,
+                        headers_with_first_chunk=headers_with_first_chunk)
+
+
+def test_steady_stream_outlives_idle_deadline():
+    with _server(0.05, token_rate=50) as server:
+        backend = OllamaBackend(base_url=server.url, model="replay")
+        stream = DeadlineStream(lambda: backend.chat(MESSAGES, stream=True), first_token=1, idle=0.2)
+        assert "".join(stream) == "x" * 40  # ~0.8s in total, but never idle for 0.2s
+
+
+@pytest.mark.parametrize("headers_with_first_chunk", [False, True])
+def test_first_token_deadline_cancels_request(headers_with_first_chunk):
+    # Real Ollama sends no headers while loading the model, so the request is still in the POST
+    with _server(2.0, headers_with_first_chunk=headers_with_first_chunk) as server:
+        backend = OllamaBackend(base_url=server.url, model="replay")
+        stream = DeadlineStream(lambda: backend.chat(MESSAGES, stream=True), first_token=0.2, idle=5)
+        started = time.perf_counter()
+        with pytest.raises(StreamTimeout) as excinfo:
+            list(stream)
+        assert excinfo.value.kind == "first token"
+        assert time.perf_counter() - started < 0.5
+        stream.pump._thread.join(1)
+        assert not stream.pump._thread.is_alive()  # reader woke up once the connection was shut down
+
+
+def test_total_deadline_and_cancel():
+    with _server(0.0, token_rate=20) as server:
+        backend = OllamaBackend(base_url=server.url, model="replay")
+        with pytest.raises(StreamTimeout) as excinfo:
+            list(DeadlineStream(lambda: backend.chat(MESSAGES, stream=True), idle=1, total=0.3))
+        assert excinfo.value.kind == "total"
+
+        stream = DeadlineStream(lambda: backend.chat(MESSAGES, stream=True))
+        received = []
+        for chunk in stream:
+            received.append(chunk)
+            if len(received) == 3:
+                stream.cancel()
+        assert received == ["x"] * 3
+
+
+def test_cancel_before_headers_closes_the_connection():
+    with _server(2.0, headers_with_first_chunk=True) as server:
+        backend = OllamaBackend(base_url=server.url, model="replay")
+        stream = DeadlineStream(lambda: backend.chat(MESSAGES, stream=True))
+        started = time.perf_counter()
+        threading.Timer(0.2, stream.cancel).start()  # e.g. Ctrl-C while the model loads
+        assert list(stream) == []
+        stream.pump._thread.join(1)
+        assert not stream.pump._thread.is_alive()
+        assert time.perf_counter() - started < 1.0
@@ -0,0 +1,29 @@
+from llm.tokens import ContextBudget, MIN_HISTORY_TOKENS, ModelInfo, TokenCounter
+
+
+def test_model_info_from_show():
+    info = ModelInfo({
+        "model_info": {"general.architecture": "qwen3moe", "qwen3moe.context_length": 262144,
+                       "tokenizer.ggml.model": "gpt2"},
+        "parameters": "temperature 0.6\nnum_ctx 8192",
+    })
+    assert (info.architecture, info.context_length, info.tokenizer, info.num_ctx) == ("qwen3moe", 262144, "gpt2", 8192)
+    assert info.resolve_num_ctx(limit=32768) == 32768
+    assert info.resolve_num_ctx(configured=16384, limit=32768) == 16384
+    assert ModelInfo({}).resolve_num_ctx(limit=32768) is None
+
+
+def test_calibration_follows_server_counts_but_ignores_cache_hits():
+    counter = TokenCounter(chars_per_token=4.0)
+    for _ in range(10):
+        counter.calibrate(1000, 1300)
+    assert 1.25 < counter.factor <= 1.3
+    counter.calibrate(1000, 100)  # mostly served from the KV cache: not a real count
+    assert counter.factor > 1.25
+    assert counter.count("x" * 400) == counter.scale(100)
+
+
+def test_history_gets_what_is_left():
+    budget = ContextBudget(32768, system=500, tools=1500, retrieval=256, output=4096)
+    assert budget.history == 32768 - 500 - 1500 - 256 - 4096
+    assert ContextBudget(2048, system=500, tools=1500, retrieval=256, output=512).history == MIN_HISTORY_TOKENS
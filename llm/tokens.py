@@ -0,0 +1,103 @@
+"""Model context sizes, token counting and the per-request context budget.
+
+Token counts start from the cheap ``utils.estimate_tokens`` (about 4 characters per
+token), scaled for the model's tokenizer family and then calibrated against the
+``prompt_eval_count`` Ollama reports for real requests.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from utils import estimate_tokens
+
+# Characters per token for common GGUF tokenizer families (``tokenizer.ggml.model``).
+# "gpt2" covers the byte-level BPE tokenizers of Qwen, Llama 3, Mistral Nemo and others.
+CHARS_PER_TOKEN = {"gpt2": 3.6, "llama": 3.3, "bert": 4.0, "t5": 3.8}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+MESSAGE_OVERHEAD_TOKENS = 4  # role markers and separators added by the chat template
+
+DEFAULT_CONTEXT_LENGTH = 4096  # what Ollama uses when it's told nothing
+MIN_HISTORY_TOKENS = 512
+
+
+class ModelInfo:
+    """The parts of an ``/api/show`` response that size the context window."""
+
+    def __init__(self, show: Dict[str, Any] = None):
+        show = show or {}
+        info = show.get("model_info") or {}
+        self.architecture: Optional[str] = info.get("general.architecture")
+        self.tokenizer: Optional[str] = info.get("tokenizer.ggml.model")
+        self.context_length: Optional[int] = next(
+            (int(v) for k, v in info.items() if k.endswith(".context_length") and v), None)
+        # num_ctx set in the model's Modelfile, e.g. "num_ctx 8192" in the parameters text
+        match = re.search(r"^num_ctx\s+(\d+)", show.get("parameters") or "", re.M)
+        self.num_ctx: Optional[int] = int(match.group(1)) if match else None
+
+    def resolve_num_ctx(self, configured: int = 0, limit: int = 0) -> Optional[int]:
+        """The ``num_ctx`` to request: ``configured`` if set, else the model's length capped at ``limit``."""
+        if configured:
+            return configured
+        length = self.context_length or self.num_ctx
+        if not length:
+            return None
+        return min(length, limit) if limit else length
+
+
+class TokenCounter:
+    """Estimates token counts for one model and corrects itself from server-reported counts."""
+
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN):
+        # Multiplier applied to ``estimate_tokens`` (which assumes 4 characters per token)
+        self.factor = 4.0 / chars_per_token
+        self.samples = 0
+
+    @classmethod
+    def for_model(cls, info: ModelInfo) -> "TokenCounter":
+        return cls(CHARS_PER_TOKEN.get(info.tokenizer or "", DEFAULT_CHARS_PER_TOKEN))
+
+    def scale(self, estimate: int) -> int:
+        """Convert a cached ``estimate_tokens`` value into this model's tokens."""
+        return int(estimate * self.factor + 0.5)
+
+    def count(self, text: str) -> int:
+        return self.scale(estimate_tokens(text or ""))
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.count(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+    def calibrate(self, estimate: int, observed: int):
+        """Fold in one request: ``estimate`` raw ``estimate_tokens`` units, ``observed`` real tokens.
+
+        Ollama only reports the tokens it had to evaluate, so a prompt that mostly hit
+        the KV cache looks much shorter than it is. Samples under half the current
+        prediction are ignored, the factor rises quickly and falls slowly, and errs
+        towards overcounting, which only costs some unused context.
+        """
+        if estimate <= 0 or observed <= 0:
+            return
+        sample = observed / estimate
+        if sample < self.factor / 2:
+            return
+        weight = 0.5 if sample > self.factor else 0.1
+        self.factor = min(3.0, max(0.5, self.factor + weight * (sample - self.factor)))
+        self.samples += 1
+
+
+class ContextBudget:
+    """How one request's context window is divided (all values in tokens)."""
+
+    def __init__(self, num_ctx: int, system: int, tools: int, retrieval: int, output: int):
+        self.num_ctx = num_ctx
+        self.system = system
+        self.tools = tools
+        self.retrieval = retrieval
+        self.output = output
+
+    @property
+    def history(self) -> int:
+        """What is left for conversation history (never less than ``MIN_HISTORY_TOKENS``)."""
+        return max(MIN_HISTORY_TOKENS, self.num_ctx - self.system - self.tools - self.retrieval - self.output)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"num_ctx": self.num_ctx, "system": self.system, "tools": self.tools,
+                "retrieval": self.retrieval, "output": self.output, "history": self.history}
@@ -1,5 +1,5 @@
-from cli import TildeCLI
+import sys
+from cli import main
 
 if __name__ == "__main__":
-    cli = TildeCLI()
-    cli.run()
+    sys.exit(main())
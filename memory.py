@@ -7,6 +7,7 @@ from typing import List, Dict
 class MemoryManager:
     def __init__(self, memory_file: str = os.path.expanduser("~/.tilde-cli/memory.json")):
         self.memory_file = os.path.expanduser(memory_file)
+        self._mtime = None
         self.memory = self._load_memory()
 
     def _load_memory(self) -> List[Dict[str, str]]:
@@ -14,13 +15,27 @@ class MemoryManager:
             os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
             with open(self.memory_file, 'w') as f:
                 json.dump([], f)
+            self._mtime = os.path.getmtime(self.memory_file)
             return []
+        self._mtime = os.path.getmtime(self.memory_file)
         with open(self.memory_file, 'r') as f:
             return json.load(f)
 
+    def refresh(self) -> bool:
+        """Reload memory if another process changed the file; returns True if it was reloaded."""
+        try:
+            mtime = os.path.getmtime(self.memory_file)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self.memory = self._load_memory()
+        return True
+
     def _save_memory(self):
         with open(self.memory_file, 'w') as f:
             json.dump(self.memory, f, indent=4)
+        self._mtime = os.path.getmtime(self.memory_file)
         # Security: set file permissions to user-only (0600)
         try:
             os.chmod(self.memory_file, stat.S_IRUSR | stat.S_IWUSR)
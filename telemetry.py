@@ -0,0 +1,202 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+METRICS_DIR = os.path.expanduser("~/.tilde-cli/metrics")
+METRICS_FILE = os.path.join(METRICS_DIR, "turns.jsonl")
+MAX_FILE_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+
+# One id per CLI process, used to group turns into sessions for `tilde stats`.
+RUN_ID = uuid.uuid4().hex[:12]
+
+# Fields Ollama reports in the final ("done") chunk of /api/chat and /api/generate.
+# Durations are in nanoseconds.
+OLLAMA_STATS_FIELDS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration",
+                       "eval_count", "eval_duration")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class TurnMetrics:
+    """Collects timings for one user turn: context builds, LLM round-trips and tool calls."""
+
+    def __init__(self, session_id: str = None):
+        self.started = time.perf_counter()
+        self.record: Dict[str, Any] = {
+            "ts": time.time(),
+            "session": session_id or RUN_ID,
+            "context_build_ms": 0.0,
+            "llm_calls": [],
+            "tools": [],
+        }
+
+    def add_context_build(self, seconds: float):
+        self.record["context_build_ms"] = round(self.record["context_build_ms"] + seconds * 1000, 2)
+
+    def add_llm_call(self, duration: float, ttft: Optional[float], stats: Dict[str, Any] = None,
+                     prompt_tokens_estimate: int = None, **extra):
+        call: Dict[str, Any] = {"duration_ms": _ms(duration), "ttft_ms": _ms(ttft) if ttft is not None else None}
+        stats = stats or {}
+        if stats.get("eval_count") and stats.get("eval_duration"):
+            call["tokens_per_sec"] = round(stats["eval_count"] / (stats["eval_duration"] / 1e9), 2)
+        for field in ("eval_count", "prompt_eval_count"):
+            if field in stats:
+                call[field] = stats[field]
+        for field in ("prompt_eval_duration", "eval_duration", "load_duration"):
+            if field in stats:
+                call[field.replace("_duration", "_ms")] = round(stats[field] / 1e6, 2)
+        if prompt_tokens_estimate is not None:
+            call["prompt_tokens_estimate"] = prompt_tokens_estimate
+            if "prompt_eval_count" in stats:
+                # How far the estimate was off. Ollama doesn't say how much of the prompt its KV
+                # cache covered, and prompt_eval_count may or may not include those tokens.
+                call["prompt_estimate_delta"] = prompt_tokens_estimate - stats["prompt_eval_count"]
+        call.update(extra)
+        self.record["llm_calls"].append(call)
+        return call
+
+    def add_tool_call(self, name: str, duration: float, **extra):
+        self.record["tools"].append({"name": name, "duration_ms": _ms(duration), **extra})
+
+    def finish(self, **extra) -> Dict[str, Any]:
+        record = self.record
+        calls = record["llm_calls"]
+        record["turn_ms"] = _ms(time.perf_counter() - self.started)
+        record["llm_round_trips"] = len(calls)
+        first = next((c["ttft_ms"] for c in calls if c.get("ttft_ms") is not None), None)
+        record["ttft_ms"] = first
+        rates = [c["tokens_per_sec"] for c in calls if "tokens_per_sec" in c and c.get("tier") != "fast"]
+        record["tokens_per_sec"] = round(sum(rates) / len(rates), 2) if rates else None
+        record["prompt_tokens"] = sum(c.get("prompt_eval_count", 0) for c in calls)
+        record["tool_ms"] = round(sum(t["duration_ms"] for t in record["tools"]), 2)
+        record["retries"] = sum(1 for c in calls if c.get("retry"))
+        tiers: Dict[str, int] = {}
+        for c in calls:
+            tiers[c.get("tier", "primary")] = tiers.get(c.get("tier", "primary"), 0) + 1
+        record["llm_calls_by_tier"] = tiers
+        record.update(extra)
+        return record
+
+
+class MetricsRecorder:
+    """Appends turn records to a size-rotated JSONL file and optionally a Prometheus textfile."""
+
+    def __init__(self, path: str = None, prom_file: str = None, max_bytes: int = MAX_FILE_BYTES,
+                 backup_count: int = BACKUP_COUNT):
+        self.path = path or METRICS_FILE
+        self.prom_file = os.path.expanduser(prom_file) if prom_file else None
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.totals = {"turns": 0, "llm_round_trips": 0, "tool_calls": 0, "eval_tokens": 0, "prompt_tokens": 0}
+
+    def write(self, record: Dict[str, Any]):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._rotate_if_needed()
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+            if self.prom_file:
+                self._write_prometheus(record)
+        except OSError:
+            pass  # metrics must never break a turn
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write_prometheus(self, record: Dict[str, Any]):
+        self.totals["turns"] += 1
+        self.totals["llm_round_trips"] += record.get("llm_round_trips", 0)
+        self.totals["tool_calls"] += len(record.get("tools", []))
+        self.totals["eval_tokens"] += sum(c.get("eval_count", 0) for c in record.get("llm_calls", []))
+        self.totals["prompt_tokens"] += record.get("prompt_tokens", 0)
+        lines = []
+        for name, value in self.totals.items():
+            lines += [f"# TYPE tilde_{name}_total counter", f"tilde_{name}_total {value}"]
+        gauges = {
+            "last_turn_seconds": record.get("turn_ms"),
+            "last_ttft_seconds": record.get("ttft_ms"),
+            "last_context_build_seconds": record.get("context_build_ms"),
+            "last_tool_seconds": record.get("tool_ms"),
+        }
+        for name, value in gauges.items():
+            if value is not None:
+                lines += [f"# TYPE tilde_{name} gauge", f"tilde_{name} {value / 1000:.6f}"]
+        if record.get("tokens_per_sec") is not None:
+            lines += ["# TYPE tilde_last_tokens_per_second gauge", f"tilde_last_tokens_per_second {record['tokens_per_sec']}"]
+        os.makedirs(os.path.dirname(self.prom_file) or ".", exist_ok=True)
+        tmp = self.prom_file + ".tmp"
+        with open(tmp, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.prom_file)
+
+
+def load_records(path: str = None, sessions: int = 20) -> List[Dict[str, Any]]:
+    """Return turn records from the most recent ``sessions`` sessions, oldest first."""
+    path = path or METRICS_FILE
+    records = []
+    for candidate in [f"{path}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [path]:
+        try:
+            with open(candidate, 'r') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+    recent = []
+    for record in reversed(records):
+        if record.get("session") not in recent:
+            recent.append(record.get("session"))
+    keep = set(recent[:sessions])
+    return [r for r in records if r.get("session") in keep]
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0 < p <= 100)."""
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(records: Iterable[Dict[str, Any]], ps=(50, 90, 99)) -> Dict[str, Dict[str, Any]]:
+    """Percentiles of the main per-turn and per-call metrics."""
+    records = list(records)
+    calls = [c for r in records for c in r.get("llm_calls", [])]
+    tools = [t for r in records for t in r.get("tools", [])]
+    series = {
+        "turn_ms": [r.get("turn_ms") for r in records],
+        "context_build_ms": [r.get("context_build_ms") for r in records],
+        "ttft_ms": [c.get("ttft_ms") for c in calls],
+        "tokens_per_sec": [c.get("tokens_per_sec") for c in calls],
+        "llm_round_trips": [r.get("llm_round_trips") for r in records],
+        "prompt_tokens": [c.get("prompt_eval_count") for c in calls],
+        "prompt_estimate_delta": [c.get("prompt_estimate_delta") for c in calls],
+        "tool_ms": [t.get("duration_ms") for t in tools],
+    }
+    for tier in sorted({c["tier"] for c in calls if "tier" in c}):
+        series[f"llm:{tier}_ms"] = [c["duration_ms"] for c in calls if c.get("tier") == tier]
+    for name in sorted({t["name"] for t in tools}):
+        series[f"tool:{name}_ms"] = [t["duration_ms"] for t in tools if t["name"] == name]
+    summary = {}
+    for name, values in series.items():
+        values = [v for v in values if v is not None]
+        if values:
+            summary[name] = {"count": len(values), **{f"p{p}": percentile(values, p) for p in ps}}
+    return summary
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from config_utils import Config
+
+
+class SlowShowBackend:
+    """A chat backend whose /api/show takes as long as the test wants."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.shows = 0
+        self.preloaded = threading.Event()
+        self.preload_options = None
+
+    def show(self, model):
+        self.shows += 1
+        self.release.wait(5)
+        return {"model_info": {"llama.context_length": 8192}}
+
+    def list_running_models(self):
+        return []
+
+    def preload(self, model, keep_alive=None, options=None):
+        self.preload_options = options
+        self.preloaded.set()
+
+
+def test_warmup_resolves_num_ctx_off_the_main_thread(monkeypatch):
+    from cli import TildeCLI
+    cli = TildeCLI()
+    monkeypatch.setattr(Config, "NUM_CTX", 0)
+    monkeypatch.setattr(Config, "MAX_NUM_CTX", 4096)
+    backend = cli.llm_backend = SlowShowBackend()
+
+    started = time.perf_counter()
+    status = cli._start_warmup()
+    assert time.perf_counter() - started < 0.5  # /api/show hasn't answered yet
+    assert status["checked"].wait(2) and not status["was_loaded"]
+
+    threading.Timer(0.2, backend.release.set).start()
+    assert cli.num_ctx == 4096  # the main thread waits for the same /api/show call
+    assert backend.preloaded.wait(2)
+    assert backend.preload_options == {"num_ctx": 4096} and backend.shows == 1
+
+
+class RecordingBackend:
+    def __init__(self, reply="ok"):
+        self.reply = reply
+        self.options = []
+        self.last_stats = {"eval_count": 8, "eval_duration": 100_000_000}
+
+    def generate_text(self, prompt, options=None):
+        self.options.append(options)
+        return self.reply
+
+
+def test_fast_backend_falls_back_to_the_chat_backend(monkeypatch):
+    from cli import TildeCLI
+    for fast_model in ("", "chat-model"):
+        cli = TildeCLI()
+        monkeypatch.setattr(Config, "OLLAMA_MODEL", "chat-model")
+        monkeypatch.setattr(Config, "FAST_MODEL", fast_model)
+        cli.llm_backend = RecordingBackend()
+        assert cli.fast_backend is cli.llm_backend
+    cli = TildeCLI()
+    monkeypatch.setattr(Config, "OLLAMA_MODEL", "chat-model")
+    monkeypatch.setattr(Config, "FAST_MODEL", "small-model")
+    cli.llm_backend = RecordingBackend()
+    assert cli.fast_backend is not cli.llm_backend and cli.fast_backend.model == "small-model"
+
+
+def test_fast_generate_keeps_num_ctx_on_the_chat_model_and_records_the_tier(monkeypatch):
+    from cli import TildeCLI
+    from telemetry import TurnMetrics
+    cli = TildeCLI()
+    monkeypatch.setattr(Config, "OLLAMA_MODEL", "chat-model")
+    monkeypatch.setattr(Config, "FAST_MODEL", "")
+    cli.llm_backend = chat = RecordingBackend()
+    cli.num_ctx = 8192
+    cli._turn_metrics = TurnMetrics(session_id="s")
+    assert cli._fast_generate("summary", "Summarise this.", num_predict=64) == "ok"
+    # Without the chat model's num_ctx the server would reload it for this one prompt
+    assert chat.options == [{"num_ctx": 8192, "num_predict": 64}]
+
+    monkeypatch.setattr(Config, "FAST_MODEL", "small-model")
+    cli.fast_backend = fast = RecordingBackend("shell")
+    cli._fast_generate("route", "Which tools?", temperature=0)
+    assert fast.options == [{"temperature": 0}]  # the fast model keeps its own context size
+
+    calls = cli._turn_metrics.finish()["llm_calls"]
+    assert [(call["tier"], call["purpose"], call["model"]) for call in calls] == \
+        [("primary", "summary", "chat-model"), ("fast", "route", "small-model")]
+    assert calls[0]["eval_count"] == 8
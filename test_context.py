@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+import context
+from config_utils import Config
+from context import MessageStore, Session, Turn, retrieval_block
+from utils import estimate_tokens
+
+
+def test_retrieval_block_skips_facts_already_visible():
+    window = [{"role": "user", "content": "By the way, my editor is Vim."},
+              {"role": "assistant", "content": None}]
+    block = retrieval_block(["My editor is vim.", "Lives in Lisbon", "Lives in Lisbon", "  "], window, 256)
+    assert block == {"role": "system", "content": "Relevant information from your memory:\n- Lives in Lisbon"}
+    assert retrieval_block(["my editor is vim."], window, 256) is None
+
+
+def test_retrieval_block_keeps_facts_in_order_within_max_tokens():
+    facts = [f"fact number {i} " + "x" * 40 for i in range(10)]
+    header_tokens = estimate_tokens("Relevant information from your memory:")
+    fact_tokens = estimate_tokens(facts[0]) + 1
+    block = retrieval_block(facts, [], header_tokens + 3 * fact_tokens)
+    assert [line[2:] for line in block["content"].split("\n")[1:]] == facts[:3]
+    assert estimate_tokens(block["content"]) <= header_tokens + 3 * fact_tokens
+    assert retrieval_block(facts, [], header_tokens) is None
+
+
+def test_facts_go_before_the_last_user_message_and_are_not_stored(monkeypatch):
+    from cli import TildeCLI
+    from llm.ollama_backend import OllamaBackend
+    from llm.replay_server import ReplayServer
+    server = ReplayServer(first_token_delay=0, models=["m"]).start()
+    try:
+        cli = TildeCLI()
+        monkeypatch.setattr(Config, "METRICS", False)
+        monkeypatch.setattr(Config, "INTENT_FAST_PATH", False)
+        cli.llm_backend = OllamaBackend(server.url, "m")
+        monkeypatch.setattr(cli.memory_manager, "search_facts",
+                            lambda query: [{"fact": "The user's cat is called Miso."}])
+        cli.session.add_turn("user", "Hi!")
+        cli.session.add_turn("assistant", "Hello.")
+        cli._process_and_get_llm_response("What is my cat called?")
+
+        messages = [p for path, p in server.requests if path == "/api/chat"][-1]["messages"]
+        assert messages[0]["role"] == "system"
+        assert messages[-3] == {"role": "assistant", "content": "Hello."}  # earlier history is untouched
+        assert messages[-2] == {"role": "system", "content": "Relevant information from your memory:\n"
+                                                             "- The user's cat is called Miso."}
+        assert messages[-1] == {"role": "user", "content": "What is my cat called?"}
+        stored = [turn for turn in cli.session.history if turn["role"] == "user"]
+        assert stored[-1]["content"] == "What is my cat called?"
+        assert not any("Miso" in (turn["content"] or "") for turn in cli.session.history)
+    finally:
+        server.stop()
+
+
+def test_turns_read_like_the_message_dicts_they_replace():
+    turn = Turn("tool", "ok", tool="shell")
+    assert (turn["role"], turn["content"], turn.get("tool")) == ("tool", "ok", "shell")
+    assert Turn("user", "hi").get("tool") is None and Turn("user", "hi").get("tool", "none") == "none"
+    assert Turn("user", "hi").get("tokens") is None  # only the message keys are exposed
+    with pytest.raises(KeyError):
+        Turn("user", "hi")["tool"]
+    assert Turn.from_dict(turn.as_dict()).as_dict() == {"role": "tool", "content": "ok", "tool": "shell"}
+    assert Turn("assistant", "hi").as_dict() == {"role": "assistant", "content": "hi"}
+
+
+def test_store_spills_old_turns_and_still_iterates_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(context, "SESSION_DIR", str(tmp_path))
+    store = MessageStore("s", max_ram_bytes=1000)
+    contents = [f"message {i:02d} " + "x" * 20 for i in range(20)]
+    for i, content in enumerate(contents):
+        store.append("user" if i % 2 == 0 else "assistant", content, tool="shell" if i == 3 else None)
+
+    assert store.spilled > 0 and store.ram_bytes <= 1000
+    assert os.path.dirname(store.journal_path) == str(tmp_path)
+    assert len(store) == 20
+    assert [turn["content"] for turn in store] == contents
+    assert [turn["content"] for turn in reversed(store)] == contents[::-1]
+    assert list(store)[3].get("tool") == "shell"  # tool names survive the journal
+    assert [turn["content"] for turn in store.recent(2)] == contents[-2:]
+
+
+def test_session_save_and_load_keep_spilled_turns(tmp_path, monkeypatch):
+    monkeypatch.setattr(context, "SESSION_DIR", str(tmp_path))
+    session = Session("saved", max_ram_bytes=1000)
+    for i in range(20):
+        session.add_turn("user", f"turn {i} " + "y" * 30)
+    session.metadata["title"] = "spilled"
+    assert session.history.spilled
+    session.save()
+
+    loaded = Session("saved", max_ram_bytes=None)
+    loaded.load()
+    assert loaded.history.to_list() == session.history.to_list()
+    assert len(loaded.history) == 20 and loaded.metadata == {"title": "spilled"}
+
+
+def test_clear_deletes_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(context, "SESSION_DIR", str(tmp_path))
+    session = Session("cleared", max_ram_bytes=1000)
+    for i in range(20):
+        session.add_turn("assistant", "z" * 50)
+    journal = session.history.journal_path
+    assert os.path.exists(journal)
+
+    session.reset()
+    assert not os.path.exists(journal) and session.history.journal_path is None
+    assert len(session.history) == 0 and list(session.history) == []
+    session.add_turn("user", "fresh")
+    assert [turn["content"] for turn in reversed(session.history)] == ["fresh"]
@@ -0,0 +1,147 @@
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+import daemon
+from config_utils import Config
+
+
+class FakeStdin:
+    def __init__(self, tty):
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+@pytest.mark.parametrize("argv,tty,forwarded", [
+    (["chat"], True, False),
+    (["chat", "hello"], True, False),  # interactive: stays in-process
+    (["chat", "hello", "--once"], True, True),
+    (["chat", "hello"], False, False),  # piped: later stdin lines are messages too
+    (["--remote", "u@h", "chat"], True, False),
+    (["--remote", "u@h", "chat", "hi", "--once"], False, True),
+    (["tool", "run", "shell", "ls"], False, False),
+    (["tool", "run", "--params", '{"command":"ls"}', "shell"], False, False),
+    (["tool", "run", "--params={}", "shell"], False, False),
+    (["warm", "--keep-alive", "-1", "m"], False, True),
+    (["stats", "--sessions", "5"], False, True),
+    (["tool", "run", "grep", "x"], True, True),
+    (["daemon", "status"], False, False),
+    ([], False, False),
+])
+def test_should_forward(tmp_path, monkeypatch, argv, tty, forwarded):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.touch()
+    monkeypatch.setattr(daemon, "SOCKET_PATH", str(socket_path))
+    monkeypatch.setattr(sys, "stdin", FakeStdin(tty))
+    monkeypatch.delenv("TILDE_NO_DAEMON", raising=False)
+    assert daemon.should_forward(argv) is forwarded
+
+
+def test_should_forward_needs_a_socket_and_respects_the_env_var(tmp_path, monkeypatch):
+    socket_path = tmp_path / "daemon.sock"
+    monkeypatch.setattr(daemon, "SOCKET_PATH", str(socket_path))
+    monkeypatch.delenv("TILDE_NO_DAEMON", raising=False)
+    assert not daemon.should_forward(["index"])
+    socket_path.touch()
+    assert daemon.should_forward(["index"])
+    monkeypatch.setenv("TILDE_NO_DAEMON", "1")
+    assert not daemon.should_forward(["index"])
+
+
+class FakeCLI:
+    """Just enough of TildeCLI for the daemon: 'echo' prints and exits, 'wait' blocks until cancelled."""
+
+    def __init__(self):
+        self.parser = argparse.ArgumentParser()
+        commands = self.parser.add_subparsers(dest="command")
+        echo = commands.add_parser("echo")
+        echo.add_argument("text")
+        echo.add_argument("--code", type=int, default=0)
+        commands.add_parser("wait")
+        self.memory_manager = type("Memory", (), {"refresh": lambda self: None})()
+        self.tool_definitions = self.system_prompt = None
+        self.llm_backend = None  # warm() can't reach a server and carries on
+        self.started = threading.Event()
+        self.cancelled = threading.Event()
+
+    def dispatch(self, args):
+        if args.command == "echo":
+            print(args.text)
+            print("warning", file=sys.stderr)
+            return args.code
+        print("working")
+        self.started.set()
+        return 130 if self.cancelled.wait(5) else 0
+
+    def cancel_turn(self):
+        self.cancelled.set()
+
+
+@pytest.fixture
+def served(tmp_path):
+    cli = FakeCLI()
+    server = daemon.TildeDaemon(cli=cli, socket_path=str(tmp_path / "d.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while daemon.ping(server.socket_path) is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    yield server
+    server.shutdown()
+    thread.join(5)
+
+
+def test_round_trip_forwards_output_and_exit_code(served, capsys):
+    assert daemon.forward(["echo", "hello", "--code", "3"], served.socket_path) == 3
+    out, err = capsys.readouterr()
+    assert (out, err) == ("hello\n", "warning\n")
+    assert daemon.forward(["nonsense"], served.socket_path) == 2  # argparse errors come back too
+    assert daemon.ping(served.socket_path)["requests"] == 2
+
+
+def test_client_hanging_up_cancels_the_command(served):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(served.socket_path)
+    conn.sendall(json.dumps({"argv": ["wait"], "cwd": "."}).encode() + b"\n")
+    assert served.cli.started.wait(5)
+    conn.close()
+    assert served.cli.cancelled.wait(2)
+
+
+def test_ctrl_c_in_forward_cancels_the_daemon_turn(served, monkeypatch, capsys):
+    class InterruptedStdout:
+        def write(self, data):
+            raise KeyboardInterrupt
+
+        def flush(self):
+            pass
+
+    monkeypatch.setattr(sys, "stdout", InterruptedStdout())
+    assert daemon.forward(["wait"], served.socket_path) == 130
+    assert served.cli.cancelled.wait(2)
+    assert "Cancelled." in capsys.readouterr().err
+
+
+def test_cancel_turn_aborts_a_waiting_model_request(monkeypatch):
+    from cli import TildeCLI
+    from llm.ollama_backend import OllamaBackend
+    from llm.replay_server import ReplayServer
+    server = ReplayServer(first_token_delay=5, models=["m"], headers_with_first_chunk=True).start()
+    try:
+        cli = TildeCLI()
+        monkeypatch.setattr(Config, "METRICS", False)
+        cli.llm_backend = OllamaBackend(server.url, "m")
+        threading.Timer(0.3, cli.cancel_turn).start()
+        started = time.perf_counter()
+        cli._process_and_get_llm_response("hello")
+        assert time.perf_counter() - started < 2
+        assert [turn["role"] for turn in cli.session.history] == ["user"]  # no answer was recorded
+    finally:
+        server.stop()
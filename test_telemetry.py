@@ -0,0 +1,41 @@
+from telemetry import MetricsRecorder, TurnMetrics
+
+
+def test_finish_aggregates_calls_and_tools():
+    metrics = TurnMetrics(session_id="s1")
+    metrics.add_context_build(0.25)
+    metrics.add_llm_call(1.0, 0.2, {"eval_count": 50, "eval_duration": 2_000_000_000, "prompt_eval_count": 900},
+                         prompt_tokens_estimate=1000)
+    metrics.add_llm_call(0.5, None, {"eval_count": 10, "eval_duration": 500_000_000, "prompt_eval_count": 40},
+                         tier="fast", retry=True)
+    metrics.add_tool_call("grep", 0.125)
+    record = metrics.finish(error=None)
+
+    first, second = record["llm_calls"]
+    assert first["tokens_per_sec"] == 25.0 and first["prompt_estimate_delta"] == 100
+    assert "prompt_estimate_delta" not in second  # no estimate given
+    assert record["session"] == "s1" and record["context_build_ms"] == 250.0
+    assert record["llm_round_trips"] == 2 and record["ttft_ms"] == 200.0
+    assert record["tokens_per_sec"] == 25.0  # fast-tier calls don't count towards the chat model's rate
+    assert record["prompt_tokens"] == 940 and record["tool_ms"] == 125.0
+    assert record["retries"] == 1 and record["llm_calls_by_tier"] == {"primary": 1, "fast": 1}
+    assert record["error"] is None and record["turn_ms"] >= 0
+
+
+def test_prometheus_textfile_accumulates_totals(tmp_path):
+    prom = tmp_path / "textfile" / "tilde.prom"
+    recorder = MetricsRecorder(path=str(tmp_path / "turns.jsonl"), prom_file=str(prom))
+    record = {"llm_round_trips": 2, "tools": [{"name": "ls", "duration_ms": 5.0}],
+              "llm_calls": [{"eval_count": 30}, {"eval_count": 12}], "prompt_tokens": 500,
+              "turn_ms": 1500.0, "ttft_ms": None, "context_build_ms": 20.0, "tool_ms": 5.0, "tokens_per_sec": 40.5}
+    recorder.write(record)
+    recorder.write(record)
+
+    lines = prom.read_text().splitlines()
+    assert "tilde_turns_total 2" in lines and "tilde_llm_round_trips_total 4" in lines
+    assert "tilde_eval_tokens_total 84" in lines and "tilde_prompt_tokens_total 1000" in lines
+    assert "tilde_last_turn_seconds 1.500000" in lines and "tilde_last_tokens_per_second 40.5" in lines
+    assert not any("ttft" in line for line in lines)  # missing values are left out, not written as 0
+    assert "# TYPE tilde_tool_calls_total counter" in lines
+    assert not (tmp_path / "textfile" / "tilde.prom.tmp").exists()
+    assert len((tmp_path / "turns.jsonl").read_text().splitlines()) == 2
@@ -0,0 +1,38 @@
+import io
+import time
+
+from ui import StatusLine
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_nothing_is_drawn_when_output_is_not_a_terminal():
+    out = io.StringIO()
+    status = StatusLine(out, interval=0.01)
+    status.start("step 1")
+    status.update(phase="generating", tokens=5)
+    time.sleep(0.05)
+    status.stop()
+    assert "\r" not in out.getvalue() and "\033" not in out.getvalue()
+    assert out.getvalue() == ""
+    assert status._thread is None  # no render thread either
+
+
+def test_stop_clears_the_line_without_waiting_for_a_redraw():
+    out = FakeTerminal()
+    status = StatusLine(out, interval=60)  # the next scheduled redraw is a minute away
+    status.start("step 2")
+    deadline = time.monotonic() + 2
+    while "Tilde:" not in out.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "step 2 · thinking" in out.getvalue()
+    started = time.perf_counter()
+    status.stop()
+    assert time.perf_counter() - started < 0.5
+    assert out.getvalue().endswith("\r\033[K")
+    status.update(phase="generating")  # updates while stopped draw nothing
+    time.sleep(0.05)
+    assert out.getvalue().endswith("\r\033[K")
@@ -1,41 +1,90 @@
-from .file_search import FileSearchTool
-from .shell import ShellTool
-from .read_file import ReadFileTool
-from .create_file import CreateFileTool
-from .web_fetch import WebFetchTool
-from .list_directory import ListDirectoryTool
-from .grep import GrepTool
-from .edit_file import EditFileTool
+import importlib
+from typing import Any, Dict, Iterator, List
+from collections.abc import Mapping
 
-from .memory_tool import ListMemoryTool, AddMemoryTool
-
-from .time_tool import TimeTool
-from .think_toggle import ThinkToggleTool
+# Tools are registered by name and imported/instantiated on first use, so commands
+# that never touch a tool don't pay for its module or its dependencies.
+# name -> (module, class)
+_TOOL_REGISTRY = {
+    "file_search": ("file_search", "FileSearchTool"),
+    "shell": ("shell", "ShellTool"),
+    "read_file": ("read_file", "ReadFileTool"),
+    "read_many_files": ("read_many_files", "ReadManyFilesTool"),
+    "createFile": ("create_file", "CreateFileTool"),
+    "web_fetch": ("web_fetch", "WebFetchTool"),
+    "ls": ("list_directory", "ListDirectoryTool"),
+    "grep": ("grep", "GrepTool"),
+    "code_search": ("code_search", "CodeSearchTool"),
+    "edit_file": ("edit_file", "EditFileTool"),
+    "list_memory": ("memory_tool", "ListMemoryTool"),
+    "add_memory": ("memory_tool", "AddMemoryTool"),
+    "time": ("time_tool", "TimeTool"),
+    "think_toggle": ("think_toggle", "ThinkToggleTool"),
+    "read_artifact": ("artifact_tool", "ReadArtifactTool"),
+}
 
 # Add new tools here as needed
 
-def get_all_tools():
-    """Return a dictionary of all available tool instances, keyed by tool name."""
-    tools = [
-        FileSearchTool(),
-        ShellTool(),
-        ReadFileTool(),
-        CreateFileTool(),
-        WebFetchTool(),
-        ListDirectoryTool(),
-        GrepTool(),
-        EditFileTool(),
-        ListMemoryTool(),
-        AddMemoryTool(),
-        TimeTool(),
-        ThinkToggleTool(),
-    ]
-    return {tool.name: tool for tool in tools}
-
-def get_tool_schema():
+
+def _load_class(module_name: str, class_name: str):
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    return getattr(module, class_name)
+
+
+def __getattr__(attr: str):
+    # Keep `from tools import ShellTool` working without importing every tool module.
+    for module_name, class_name in _TOOL_REGISTRY.values():
+        if class_name == attr:
+            return _load_class(module_name, class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+
+
+class LazyToolRegistry(Mapping):
+    """Read-only mapping of tool name -> tool instance, instantiating each tool on first access."""
+
+    def __init__(self, registry: Dict[str, tuple] = None):
+        self._registry = dict(registry or _TOOL_REGISTRY)
+        self._instances: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._instances:
+            if name not in self._registry:
+                raise KeyError(name)
+            self._instances[name] = _load_class(*self._registry[name])()
+        return self._instances[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._registry)
+
+    def __len__(self) -> int:
+        return len(self._registry)
+
+
+_tools = LazyToolRegistry()
+_tool_schema = None
+
+
+def get_all_tools() -> LazyToolRegistry:
+    """Return the shared mapping of all available tools, keyed by tool name."""
+    return _tools
+
+
+def get_tool(name: str):
+    """Return the tool instance registered under ``name``, or None."""
+    return _tools[name] if name in _tools else None
+
+
+def get_tool_schema() -> List[Dict[str, Any]]:
     """Return a list of all tool schemas (name, description, parameters) for help/command palette."""
-    return [tool.to_dict() for tool in get_all_tools().values()]
+    global _tool_schema
+    if _tool_schema is None:
+        _tool_schema = [tool.to_dict() for tool in _tools.values()]
+    return _tool_schema
+
 
-def list_tool_names():
+def list_tool_names() -> List[str]:
     """Return a list of all available tool names."""
-    return list(get_all_tools().keys())
+    return list(_TOOL_REGISTRY)
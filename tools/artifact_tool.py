@@ -0,0 +1,72 @@
+from typing import Any, Dict
+from .base_tool import BaseTool
+from artifacts import get_artifact_store
+
+PAGE_CHARS = 16000  # a page (or grep result) never exceeds this, so it is shown inline, not stored again
+
+class ReadArtifactTool(BaseTool):
+    keywords = ("artifact", "artifact:", "more output", "rest of the output", "next page")
+    inline_limit = PAGE_CHARS + 500  # room for the header or footer
+
+    @property
+    def name(self) -> str:
+        return "read_artifact"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Page through or search a large tool output that was stored as an artifact. "
+            "Large results are replaced by a preview ending in a handle like 'artifact:1a2b3c4d5e6f7a8b'. "
+            "Pass 'offset' and 'limit' to read a range of lines, or 'pattern' (regex) to list matching lines."
+        )
+
+    @property
+    def compact_description(self) -> str:
+        return "Page (offset, limit) or search (pattern) a large stored output by its 'artifact:...' handle."
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {"type": "string", "description": "The artifact handle from the preview."},
+                "offset": {"type": "integer", "description": "1-based line to start reading from (default: 1)."},
+                "limit": {"type": "integer", "description": "Number of lines to return (default: 200)."},
+                "pattern": {"type": "string", "description": "Regex to search for instead of paging (optional)."}
+            },
+            "required": ["handle"]
+        }
+
+    def execute(self, handle: str, offset: int = 1, limit: int = 200, pattern: str = None, **kwargs) -> str:
+        store = get_artifact_store()
+        if not store.exists(handle):
+            return f"Error: Unknown artifact handle '{handle}'."
+        if pattern:
+            matches, count = store.grep(handle, pattern)
+            if not matches:
+                return f"No lines in {handle} match '{pattern}'."
+            matches = _fit(matches)
+            header = f"{count} matching lines in {handle}" + (f" (showing first {len(matches)})" if count > len(matches) else "")
+            return header + ":\n" + "\n".join(matches)
+        offset = max(1, int(offset))
+        limit = max(1, min(int(limit), 1000))
+        lines, total = store.read_lines(handle, offset, limit)
+        if not lines:
+            return f"{handle} has {total} lines; offset {offset} is past the end."
+        lines = _fit(lines)
+        end = offset + len(lines) - 1
+        footer = f"\n[Lines {offset}-{end} of {total}" + (f"; continue with offset {end + 1}]" if end < total else "]")
+        return "\n".join(lines) + footer
+
+
+def _fit(lines):
+    """The leading ``lines`` that fit in ``PAGE_CHARS`` (always at least one, clipped if it is too long)."""
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > PAGE_CHARS:
+            if not kept:
+                kept.append(line[:PAGE_CHARS - 3] + "...")
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 class BaseTool(ABC):
+    # Words or phrases that suggest a user message needs this tool (used by tools.router).
+    keywords: Tuple[str, ...] = ()
+    # Whole messages this tool answers without the model: phrase -> parameters (used by tools.intents).
+    # "{name}" in a phrase captures that parameter; phrases say "what is", never "what's".
+    intents: Dict[str, Dict[str, Any]] = {}
+    # Read-only tools may have results reused while their cache_inputs are unchanged (tools.cache);
+    # running a tool that writes files throws all reused results away.
+    read_only: bool = False
+    writes_files: bool = False
+    # Characters of output kept inline before it is stored as an artifact (None: artifacts.INLINE_LIMIT).
+    inline_limit: Optional[int] = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -12,6 +24,13 @@ class BaseTool(ABC):
     def description(self) -> str:
         pass
 
+    @property
+    def compact_description(self) -> str:
+        """Short description sent to the model when prompt size matters; defaults to the first sentence."""
+        first_line = self.description.strip().split("\n", 1)[0]
+        end = first_line.find(". ")
+        return first_line if end == -1 else first_line[:end + 1]
+
     @property
     @abstractmethod
     def parameters(self) -> Dict[str, Any]:
@@ -21,9 +40,13 @@ class BaseTool(ABC):
     def execute(self, **kwargs) -> Any:
         pass
 
-    def to_dict(self) -> Dict[str, Any]:
+    def cache_inputs(self, **params) -> List[Tuple[str, bool]]:
+        """Paths a read-only call depends on, as ``(path, recursive)``; empty means never reuse the result."""
+        return []
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
         return {
             "name": self.name,
-            "description": self.description,
+            "description": self.compact_description if compact else self.description,
             "parameters": self.parameters
         }
@@ -0,0 +1,121 @@
+import hashlib
+import inspect
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 128
+MAX_TREE_ENTRIES = 20000  # directory trees bigger than this are not fingerprinted (or cached)
+PATH_PARAMETERS = ("path", "file_path", "dir")
+
+
+def fingerprint(inputs: List[Tuple[str, bool]], max_tree_entries: int = MAX_TREE_ENTRIES) -> Optional[str]:
+    """Hash of the state of ``(path, recursive)`` inputs, or None if it can't be taken cheaply.
+
+    Files contribute their mtime and size. A directory contributes its own mtime,
+    which changes when entries are added or removed; with ``recursive`` every file
+    and directory below it contributes too. Missing paths are part of the state.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path, recursive in inputs:
+        digest.update(path.encode("utf-8", "surrogateescape") + b"\0")
+        try:
+            st = os.stat(path)
+        except OSError:
+            digest.update(b"missing\0")
+            continue
+        digest.update(f"{st.st_mtime_ns}:{st.st_size}\0".encode())
+        if not recursive or not os.path.isdir(path):
+            continue
+        seen = 0
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files) + dirs:
+                seen += 1
+                if seen > max_tree_entries:
+                    return None
+                try:
+                    st = os.stat(os.path.join(root, name), follow_symlinks=False)
+                except OSError:
+                    continue
+                digest.update(f"{root}/{name}:{st.st_mtime_ns}:{st.st_size}\0".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    def __init__(self, result: Any, state: str):
+        self.result = result
+        self.state = state
+        self.hits = 0
+        self.turn = None  # the history turn holding the result, set by the caller
+
+
+class ToolResultCache:
+    """Results of read-only tool calls, reused while the files they read are unchanged.
+
+    Entries are keyed by tool name and normalized arguments (defaults filled in,
+    paths made absolute) and stored with a :func:`fingerprint` of the paths the
+    tool's ``cache_inputs`` names; a lookup only hits if the fingerprint still
+    matches. Tools that write files clear the cache with :meth:`invalidate`.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def normalize(tool, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            bound = inspect.signature(tool.execute).bind(**params)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+        except TypeError:
+            params = dict(params)
+        for name in PATH_PARAMETERS:
+            if isinstance(params.get(name), str):
+                params[name] = os.path.abspath(os.path.expanduser(params[name]))
+        return params
+
+    def _key(self, tool, params: Dict[str, Any]) -> Tuple[str, str]:
+        return tool.name, json.dumps(params, sort_keys=True, default=str)
+
+    def _state(self, tool, params: Dict[str, Any]) -> Optional[str]:
+        try:
+            inputs = tool.cache_inputs(**params)
+        except Exception:
+            return None
+        return fingerprint(inputs) if inputs else None
+
+    def get(self, tool, params: Dict[str, Any]) -> Optional[CacheEntry]:
+        params = self.normalize(tool, params)
+        key = self._key(tool, params)
+        entry = self._entries.get(key)
+        if entry is not None and entry.state == self._state(tool, params):
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.stats["hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, tool, params: Dict[str, Any], result: Any) -> Optional[CacheEntry]:
+        """Store ``result``; the file state is taken now, so call this right after running the tool."""
+        params = self.normalize(tool, params)
+        state = self._state(tool, params)
+        if state is None:
+            return None
+        entry = self._entries[self._key(tool, params)] = CacheEntry(result, state)
+        self._entries.move_to_end(self._key(tool, params))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self):
+        if self._entries:
+            self.stats["invalidations"] += 1
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+from typing import Any, Dict
+
+from .base_tool import BaseTool
+
+DEFAULT_K = 5
+MAX_K = 20
+MAX_RESULT_LINES = 60  # per chunk; longer chunks show their first lines and the range to read
+
+
+class CodeSearchTool(BaseTool):
+    keywords = ("code", "where", "implemented", "implementation", "function", "class", "method", "how does",
+                "handles", "logic", "defined", "responsible for", "codebase")
+
+    def __init__(self):
+        self._backends: Dict[str, Any] = {}
+
+    @property
+    def name(self) -> str:
+        return "code_search"
+
+    @property
+    def description(self) -> str:
+        return ("Semantic search over the workspace code index (built with `tilde index`). "
+                "Describe what the code does, e.g. 'where are tool calls parsed from the model output', "
+                "and get the most relevant functions, classes and file sections with their paths and line ranges.")
+
+    @property
+    def compact_description(self) -> str:
+        return "Find the code most relevant to a description; returns chunks with paths and line ranges."
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "What the code you are looking for does."},
+                "k": {"type": "integer", "description": f"Number of chunks to return (default {DEFAULT_K})."}
+            },
+            "required": ["query"]
+        }
+
+    def _embed(self, model: str, text: str):
+        if model not in self._backends:
+            from config_utils import Config
+            from llm.router import create_backend
+            self._backends[model] = create_backend(Config.OLLAMA_BASE_URL, model, Config.OLLAMA_HEALTH_INTERVAL,
+                                                   keep_alive=Config.keep_alive_for(model))
+        return self._backends[model].get_embedding(text)
+
+    def execute(self, query: str, k: int = DEFAULT_K, **kwargs) -> str:
+        from code_index import CodeIndex, find_index
+        root = find_index(os.getcwd())
+        if root is None:
+            return "Error: This workspace has no code index. Run `tilde index` in its root directory first."
+        index = CodeIndex(root)
+        k = max(1, min(int(k or DEFAULT_K), MAX_K))
+        try:
+            hits = index.search(self._embed(index.meta["model"], query), k)
+        except Exception as e:
+            return f"Error searching the code index: {e}"
+        if not hits:
+            return "No matching code in the index."
+        sections = []
+        for hit in hits:
+            path = os.path.join(root, hit["path"])
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                sections.append(f"=== {hit['path']}:{hit['start']}-{hit['end']} (no longer exists) ===")
+                continue
+            stale = hashlib.blake2b(data, digest_size=16).hexdigest() != index.meta["files"].get(hit["path"], {}).get("hash")
+            lines = data.decode("utf-8", errors="replace").split("\n")[hit["start"] - 1:hit["end"]]
+            shown = lines[:MAX_RESULT_LINES]
+            if len(lines) > len(shown):
+                shown.append(f"... [{len(lines) - len(shown)} more lines; read_file {hit['path']} for the rest]")
+            label = ", ".join(filter(None, [hit["name"], f"score {hit['score']:.2f}",
+                                            "file changed since indexing" if stale else ""]))
+            sections.append(f"=== {hit['path']}:{hit['start']}-{hit['end']} ({label}) ===\n" + "\n".join(shown))
+        return "\n\n".join(sections)
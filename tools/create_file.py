@@ -1,24 +1,13 @@
 import os
 from typing import Dict, Any
 from .base_tool import BaseTool
-import base64
-from cryptography.fernet import Fernet
 
 SANDBOX_ROOT = os.path.expanduser("~/.tilde-cli/sandbox")
-ENCRYPTION_KEY_FILE = os.path.expanduser("~/.tilde-cli/.key")
-
-def get_encryption_key():
-    if not os.path.exists(ENCRYPTION_KEY_FILE):
-        os.makedirs(os.path.dirname(ENCRYPTION_KEY_FILE), exist_ok=True)
-        key = Fernet.generate_key()
-        with open(ENCRYPTION_KEY_FILE, 'wb') as f:
-            f.write(key)
-    else:
-        with open(ENCRYPTION_KEY_FILE, 'rb') as f:
-            key = f.read()
-    return key
 
 class CreateFileTool(BaseTool):
+    keywords = ("create", "write", "new file", "save", "generate", "make a file")
+    writes_files = True
+
     @property
     def name(self) -> str:
         return "createFile"
@@ -44,11 +33,8 @@ class CreateFileTool(BaseTool):
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             if encrypt:
-                key = get_encryption_key()
-                fernet = Fernet(key)
-                encrypted = fernet.encrypt(content.encode('utf-8'))
-                with open(file_path, 'wb') as f:
-                    f.write(encrypted)
+                from . import crypto
+                crypto.encrypt_to_file(file_path, content)
             else:
                 with open(file_path, 'w') as f:
                     f.write(content)
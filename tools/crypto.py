@@ -0,0 +1,215 @@
+import base64
+import codecs
+import functools
+import os
+import stat
+import struct
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+ENCRYPTION_KEY_FILE = os.path.expanduser("~/.tilde-cli/.key")
+
+# Chunked container layout (STREAM construction over AES-256-GCM):
+#   header: MAGIC | version (1 byte) | chunk_size (uint32 BE) | nonce prefix (7 bytes)
+#   body:   N records of chunk_size + 16 bytes; the last record may be shorter.
+# Each record's nonce is prefix | chunk index (uint32 BE) | final flag, and the
+# header is bound in as associated data, so chunks cannot be reordered, dropped
+# or truncated without failing authentication. Fixed-size records let a reader
+# seek straight to chunk i without touching the rest of the file.
+MAGIC = b"TLDC"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+_HEADER = struct.Struct(">4sBI7s")
+HEADER_SIZE = _HEADER.size
+
+
+class DecryptionError(Exception):
+    """Raised when an encrypted file is malformed or fails authentication."""
+
+
+def get_encryption_key() -> bytes:
+    """Return the Fernet key from ~/.tilde-cli/.key, creating it on first use."""
+    return _load_key(ENCRYPTION_KEY_FILE)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_key(path: str) -> bytes:
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        key = Fernet.generate_key()
+        with open(path, 'wb') as f:
+            f.write(key)
+        try:
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+        except Exception:
+            pass
+        return key
+    with open(path, 'rb') as f:
+        return f.read().strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _aead(key: bytes) -> AESGCM:
+    # Derive a dedicated AES key so the Fernet key itself is only used for legacy blobs.
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"tilde-cli chunked v1")
+    return AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
+
+
+def _nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if final else 0)
+
+
+def encrypt_stream(src: Union[IO[bytes], Iterable[bytes]], dst: IO[bytes], key: Optional[bytes] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt ``src`` (a binary file object or an iterable of byte blocks) into ``dst``.
+
+    Only one chunk of plaintext is held in memory at a time. Returns the number of
+    plaintext bytes written.
+    """
+    aead = _aead(key or get_encryption_key())
+    prefix = os.urandom(NONCE_PREFIX_SIZE)
+    header = _HEADER.pack(MAGIC, VERSION, chunk_size, prefix)
+    dst.write(header)
+    blocks = _rechunk(src, chunk_size)
+    total = 0
+    index = 0
+    current = next(blocks, b"")
+    while True:
+        following = next(blocks, None)
+        final = following is None
+        dst.write(aead.encrypt(_nonce(prefix, index, final), current, header))
+        total += len(current)
+        if final:
+            return total
+        current = following
+        index += 1
+
+
+def encrypt_to_file(file_path: str, data: Union[str, bytes], key: Optional[bytes] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt ``data`` into ``file_path`` using the chunked container format."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    view = memoryview(data)
+    blocks = (view[i:i + chunk_size].tobytes() for i in range(0, len(view), chunk_size))
+    with open(file_path, 'wb') as f:
+        return encrypt_stream(blocks, f, key=key, chunk_size=chunk_size)
+
+
+def _rechunk(src: Union[IO[bytes], Iterable[bytes]], chunk_size: int) -> Iterator[bytes]:
+    # Every chunk except the last must be exactly chunk_size for random access to work,
+    # so short reads from pipes or uneven input blocks are regrouped here.
+    blocks = iter(lambda: src.read(chunk_size), b"") if hasattr(src, "read") else src
+    pending = bytearray()
+    for block in blocks:
+        pending += block
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    if pending:
+        yield bytes(pending)
+
+
+class ChunkedReader:
+    """Authenticated reader for the chunked container, with random access by chunk."""
+
+    def __init__(self, fileobj: IO[bytes], key: Optional[bytes] = None):
+        self._file = fileobj
+        self._header = fileobj.read(HEADER_SIZE)
+        if len(self._header) < HEADER_SIZE:
+            raise DecryptionError("File is too short to be an encrypted container.")
+        magic, version, self.chunk_size, self._prefix = _HEADER.unpack(self._header)
+        if magic != MAGIC:
+            raise DecryptionError("Not a chunked encrypted file.")
+        if version != VERSION:
+            raise DecryptionError(f"Unsupported encrypted file version: {version}")
+        self._aead = _aead(key or get_encryption_key())
+        self._record_size = self.chunk_size + TAG_SIZE
+        self._num_chunks = None
+
+    @property
+    def num_chunks(self) -> int:
+        if self._num_chunks is None:
+            end = self._file.seek(0, os.SEEK_END)
+            body = end - HEADER_SIZE
+            if body < TAG_SIZE:
+                raise DecryptionError("Encrypted file is truncated.")
+            self._num_chunks = -(-body // self._record_size)
+        return self._num_chunks
+
+    def read_chunk(self, index: int) -> bytes:
+        """Decrypt and return plaintext chunk ``index`` (requires a seekable file)."""
+        if index < 0 or index >= self.num_chunks:
+            raise IndexError(f"chunk index {index} out of range")
+        self._file.seek(HEADER_SIZE + index * self._record_size)
+        record = self._file.read(self._record_size)
+        return self._decrypt(index, record, index == self.num_chunks - 1)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield plaintext chunks in order, reading one record ahead to detect the end."""
+        index = 0
+        record = self._file.read(self._record_size)
+        while True:
+            following = self._file.read(self._record_size) if len(record) == self._record_size else b""
+            final = not following
+            yield self._decrypt(index, record, final)
+            if final:
+                return
+            record = following
+            index += 1
+
+    def _decrypt(self, index: int, record: bytes, final: bool) -> bytes:
+        try:
+            return self._aead.decrypt(_nonce(self._prefix, index, final), record, self._header)
+        except InvalidTag:
+            raise DecryptionError(f"Authentication failed for chunk {index}; file is corrupt or truncated.")
+
+
+def iter_decrypted_chunks(file_path: str, key: Optional[bytes] = None) -> Iterator[bytes]:
+    """Yield plaintext blocks of an encrypted file.
+
+    Files written before the chunked format (a single Fernet token) are still
+    accepted and decrypted in one piece.
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            yield Fernet(key or get_encryption_key()).decrypt(f.read())
+            return
+        f.seek(0)
+        yield from ChunkedReader(f, key=key)
+
+
+def iter_decrypted_lines(file_path: str, key: Optional[bytes] = None) -> Iterator[str]:
+    """Yield decoded lines (without line endings) of an encrypted text file as a stream."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ""
+    for block in iter_decrypted_chunks(file_path, key=key):
+        lines = (pending + decoder.decode(block)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def decrypt_file(file_path: str, key: Optional[bytes] = None) -> str:
+    """Decrypt a whole encrypted text file and return its contents."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = [decoder.decode(block) for block in iter_decrypted_chunks(file_path, key=key)]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_chunk(file_path: str, index: int, key: Optional[bytes] = None) -> bytes:
+    """Decrypt a single chunk of a chunked encrypted file without reading the others."""
+    with open(file_path, 'rb') as f:
+        return ChunkedReader(f, key=key).read_chunk(index)
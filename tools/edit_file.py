@@ -1,23 +1,11 @@
 import os
 from typing import Dict, Any
 from .base_tool import BaseTool
-import base64
-from cryptography.fernet import Fernet
-
-ENCRYPTION_KEY_FILE = os.path.expanduser("~/.tilde-cli/.key")
-
-def get_encryption_key():
-    if not os.path.exists(ENCRYPTION_KEY_FILE):
-        os.makedirs(os.path.dirname(ENCRYPTION_KEY_FILE), exist_ok=True)
-        key = Fernet.generate_key()
-        with open(ENCRYPTION_KEY_FILE, 'wb') as f:
-            f.write(key)
-    else:
-        with open(ENCRYPTION_KEY_FILE, 'rb') as f:
-            key = f.read()
-    return key
 
 class EditFileTool(BaseTool):
+    keywords = ("edit", "modify", "change", "update", "replace", "fix", "rewrite", "append")
+    writes_files = True
+
     @property
     def name(self) -> str:
         return "edit_file"
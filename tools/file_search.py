@@ -1,9 +1,12 @@
 import os
 import fnmatch
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from .base_tool import BaseTool
 
 class FileSearchTool(BaseTool):
+    keywords = ("find", "file", "files", "named", "glob", "locate", "where is", "*.")
+    read_only = True
+
     @property
     def name(self) -> str:
         return "file_search"
@@ -23,6 +26,9 @@ class FileSearchTool(BaseTool):
             "required": ["pattern"]
         }
 
+    def cache_inputs(self, path: str = ".", **kwargs) -> List[Tuple[str, bool]]:
+        return [(path, True)]
+
     def execute(self, pattern: str, path: str = ".") -> List[str]:
         # Expand ~ to home directory
         path = os.path.expanduser(path)
@@ -1,12 +1,13 @@
 import os
 import re
 import fnmatch
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from .base_tool import BaseTool
-import base64
-from cryptography.fernet import Fernet
 
 class GrepTool(BaseTool):
+    keywords = ("grep", "search", "find", "regex", "occurrences", "pattern", "contains", "usages", "mentions", "where is", "defined")
+    read_only = True
+
     @property
     def name(self) -> str:
         return "grep"
@@ -27,16 +28,18 @@ class GrepTool(BaseTool):
             "required": ["pattern"]
         }
 
+    def cache_inputs(self, path: str = ".", **kwargs) -> List[Tuple[str, bool]]:
+        return [(path, True)]
+
     def execute(self, pattern: str, path: str = ".", include: str = None, decrypt: bool = False) -> List[str]:
         # Expand ~ to home directory
         path = os.path.expanduser(path)
         results = []
         regex = re.compile(pattern)
         key = None
-        fernet = None
         if decrypt:
-            key = self._get_encryption_key()
-            fernet = Fernet(key)
+            from . import crypto
+            key = crypto.get_encryption_key()
         for root, _, files in os.walk(path):
             for fname in files:
                 if include and not fnmatch.fnmatch(fname, include):
@@ -44,10 +47,7 @@ class GrepTool(BaseTool):
                 fpath = os.path.join(root, fname)
                 try:
                     if decrypt:
-                        with open(fpath, 'rb') as f:
-                            encrypted = f.read()
-                        content = fernet.decrypt(encrypted).decode('utf-8')
-                        for i, line in enumerate(content.splitlines(), 1):
+                        for i, line in enumerate(crypto.iter_decrypted_lines(fpath, key=key), 1):
                             if regex.search(line):
                                 results.append(f"{fpath}:{i}: {line.strip()}")
                     else:
@@ -59,13 +59,3 @@ class GrepTool(BaseTool):
                     continue
         return results
 
-    def _get_encryption_key(self):
-        if not os.path.exists(ENCRYPTION_KEY_FILE):
-            os.makedirs(os.path.dirname(ENCRYPTION_KEY_FILE), exist_ok=True)
-            key = Fernet.generate_key()
-            with open(ENCRYPTION_KEY_FILE, 'wb') as f:
-                f.write(key)
-        else:
-            with open(ENCRYPTION_KEY_FILE, 'rb') as f:
-                key = f.read()
-        return key
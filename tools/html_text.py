@@ -0,0 +1,71 @@
+import re
+from html.parser import HTMLParser
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {"script", "style", "noscript", "template", "svg", "iframe", "head"}
+    BLOCK = {"p", "div", "section", "article", "main", "header", "footer", "nav", "aside", "ul", "ol",
+             "table", "tr", "blockquote", "form", "figure", "dl", "dt", "dd", "hr", "br", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+        self._pre = 0
+        self.title = None
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "pre":
+            self._pre += 1
+            self.parts.append("\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif re.fullmatch(r"h[1-6]", tag):
+            self.parts.append("\n\n" + "#" * int(tag[1]) + " ")
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "pre":
+            self._pre = max(0, self._pre - 1)
+            self.parts.append("\n")
+        elif tag in self.BLOCK or re.fullmatch(r"h[1-6]", tag):
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title and self.title is None:
+            self.title = data.strip()
+        if self._skip:
+            return
+        if self._pre:
+            # Protect preformatted indentation from the whitespace cleanup in text().
+            self.parts.append(data.replace(" ", "\x00"))
+        else:
+            self.parts.append(re.sub(r"\s+", " ", data))
+
+    def text(self) -> str:
+        lines = [line.strip() for line in "".join(self.parts).split("\n")]
+        body = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip().replace("\x00", " ")
+        if self.title and not body.startswith(self.title):
+            body = f"# {self.title}\n\n{body}"
+        return body
+
+
+def html_to_text(html: str) -> str:
+    """Convert an HTML document to compact readable text (headings, paragraphs, list items)."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    return parser.text()
@@ -0,0 +1,128 @@
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .router import _cosine
+
+# Cosine similarity an embedded message needs to a declared phrase to count as a match.
+EMBEDDING_THRESHOLD = 0.92
+# How far ahead of the best phrase with a different tool call an embedding match has to be.
+EMBEDDING_MARGIN = 0.05
+# Words a paraphrase may add without changing what it asks for.
+_FUNCTION_WORDS = frozenset("a an the me my you your i is are be it this that to of for on please can could would "
+                            "will tell give show let know".split())
+_WORD = re.compile(r"[\w']+")
+
+_SLOT = re.compile(r"\{(\w+)\}")
+_FILLERS = re.compile(r"^(?:(?:please|hey|hi|ok|okay|tilde|so|and)\b[,\s]*)+|[,\s]+please$", re.I)
+
+
+def normalize(message: str) -> str:
+    """Canonical form phrases are written in: no edge punctuation or filler words, "what is" spelled out."""
+    text = re.sub(r"\s+", " ", message).strip().strip("?!. ")
+    text = _FILLERS.sub("", text).strip()
+    text = re.sub(r"\bwhat'?s\b", "what is", text, flags=re.I)
+    return re.sub(r"\b(today|it)'s\b", r"\1s", text, flags=re.I)
+
+
+def _compile(phrase: str) -> "re.Pattern":
+    parts = _SLOT.split(normalize(phrase))
+    # Split alternates literal text and slot names
+    pattern = "".join(re.escape(part) if i % 2 == 0 else rf"(?P<{part}>[\w+\-/]+)"
+                      for i, part in enumerate(parts))
+    return re.compile(pattern, re.I)
+
+
+class IntentMatch:
+    """A tool call chosen without the model; ``score`` is 1.0 for exact phrase matches."""
+
+    def __init__(self, tool: str, parameters: Dict[str, Any], score: float, phrase: str):
+        self.tool = tool
+        self.parameters = parameters
+        self.score = score
+        self.phrase = phrase
+
+    def __repr__(self):
+        return f"IntentMatch({self.tool!r}, {self.parameters!r}, score={self.score:.2f})"
+
+
+class IntentMatcher:
+    """Recognises messages a tool can answer on its own, so they skip the model.
+
+    Each tool declares ``intents``: whole-message phrases mapped to the parameters to
+    call it with. ``{name}`` in a phrase captures one word (e.g. ``Europe/Berlin``) as
+    that parameter. A message matches when, after :func:`normalize`, it is exactly one of the phrases;
+    with ``embed_fn``, a message very close to a slot-free phrase also matches, provided
+    it uses no words outside the declared phrases (besides a few function words) and no
+    phrase calling the tool differently is nearly as close.
+    """
+
+    def __init__(self, tools: Mapping[str, Any], embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 threshold: float = EMBEDDING_THRESHOLD):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self._patterns: List[Tuple["re.Pattern", str, str, Dict[str, Any]]] = []
+        for name in tools:
+            for phrase, parameters in getattr(tools[name], "intents", {}).items():
+                self._patterns.append((_compile(phrase), name, phrase, parameters))
+        self._vocabulary = {word for _, _, phrase, _ in self._patterns if not _SLOT.search(phrase)
+                            for word in _WORD.findall(normalize(phrase).lower())}
+        self._phrase_vectors: Optional[List[Tuple[List[float], str, str, Dict[str, Any]]]] = None
+        self.stats = {"checked": 0, "hits": 0}
+
+    @property
+    def hit_rate(self) -> float:
+        return self.stats["hits"] / self.stats["checked"] if self.stats["checked"] else 0.0
+
+    def match(self, message: str) -> Optional[IntentMatch]:
+        self.stats["checked"] += 1
+        result = self._match(message)
+        if result is not None:
+            self.stats["hits"] += 1
+        return result
+
+    def _match(self, message: str) -> Optional[IntentMatch]:
+        text = normalize(message)
+        if not text or len(text) > 120:
+            return None
+        for pattern, tool, phrase, parameters in self._patterns:
+            found = pattern.fullmatch(text)
+            if found:
+                return IntentMatch(tool, {**parameters, **found.groupdict()}, 1.0, phrase)
+        return self._embedding_match(text)
+
+    def _embedding_match(self, text: str) -> Optional[IntentMatch]:
+        if self.embed_fn is None:
+            return None
+        # A word no phrase uses ("in new york", "don't") changes the request: skip the embedding round-trip.
+        if any(word not in self._vocabulary and word not in _FUNCTION_WORDS for word in _WORD.findall(text.lower())):
+            return None
+        try:
+            if self._phrase_vectors is None:
+                self._phrase_vectors = [(self.embed_fn(phrase), tool, phrase, parameters)
+                                        for _, tool, phrase, parameters in self._patterns if not _SLOT.search(phrase)]
+            query = self.embed_fn(text)
+        except Exception:
+            # Embeddings are optional here too; exact phrases still match without them.
+            self.embed_fn = None
+            return None
+        ranked = sorted(((_cosine(query, vector), tool, phrase, parameters)
+                         for vector, tool, phrase, parameters in self._phrase_vectors), key=lambda b: b[0], reverse=True)
+        if not ranked or ranked[0][0] < self.threshold:
+            return None
+        score, tool, phrase, parameters = ranked[0]
+        runner_up = next((other[0] for other in ranked[1:] if (other[1], other[3]) != (tool, parameters)), None)
+        if runner_up is not None and score - runner_up < EMBEDDING_MARGIN:
+            return None  # too close to call, e.g. "hide thinking" vs "show thinking"
+        return IntentMatch(tool, dict(parameters), score, phrase)
+
+
+def render_result(result: Any) -> str:
+    """Plain-text rendering of a tool result for showing it without the model."""
+    if isinstance(result, (list, tuple)):
+        if not result:
+            return "(nothing)"
+        return "\n".join(f"- {next(iter(item.values())) if isinstance(item, dict) and len(item) == 1 else item}"
+                         for item in result)
+    if isinstance(result, dict):
+        return "\n".join(f"{key}: {value}" for key, value in result.items())
+    return str(result)
@@ -1,9 +1,20 @@
 import os
 import fnmatch
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from .base_tool import BaseTool
 
 class ListDirectoryTool(BaseTool):
+    keywords = ("list", "directory", "folder", "ls", "dir", "files in", "contents of")
+    intents = {
+        "ls": {"path": "."},
+        "list files": {"path": "."},
+        "list the files": {"path": "."},
+        "list the files here": {"path": "."},
+        "what is in this folder": {"path": "."},
+        "what is in this directory": {"path": "."},
+    }
+    read_only = True
+
     @property
     def name(self) -> str:
         return "ls"
@@ -24,6 +35,12 @@ class ListDirectoryTool(BaseTool):
             "required": []
         }
 
+    def cache_inputs(self, path: str = ".", respect_git_ignore: bool = False, **kwargs) -> List[Tuple[str, bool]]:
+        inputs = [(path, False)]
+        if respect_git_ignore:
+            inputs.append((os.path.join(path, ".gitignore"), False))
+        return inputs
+
     def execute(self, path: str = ".", ignore: List[str] = None, respect_git_ignore: bool = False) -> List[str]:
         # Expand ~ to home directory
         path = os.path.expanduser(path)
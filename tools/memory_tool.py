@@ -3,6 +3,20 @@ from memory import MemoryManager
 from typing import Any, Dict
 
 class ListMemoryTool(BaseTool):
+    keywords = ("memory", "my facts", "know about me", "remember about", "what do you know", "stored facts")
+    intents = {
+        "show my memory": {},
+        "show me my memory": {},
+        "list my memory": {},
+        "display my memory": {},
+        "show my facts": {},
+        "list my facts": {},
+        "what do you know about me": {},
+        "what do you remember about me": {},
+        "what is in your memory": {},
+        "what is in my memory": {},
+    }
+
     @property
     def name(self) -> str:
         return "list_memory"
@@ -16,6 +30,10 @@ class ListMemoryTool(BaseTool):
             "Example: If the user says 'show my memory', 'list my facts', or 'what do you know about me?', call this tool."
         )
 
+    @property
+    def compact_description(self) -> str:
+        return "List all facts in the user's long-term memory. Call this whenever the user asks what you know about them or to show their memory."
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
@@ -29,6 +47,8 @@ class ListMemoryTool(BaseTool):
         return mm.list_facts()
 
 class AddMemoryTool(BaseTool):
+    keywords = ("remember", "memorize", "note that", "store the fact", "add to my memory", "don't forget", "my favorite", "i live", "my name")
+
     @property
     def name(self) -> str:
         return "add_memory"
@@ -42,6 +62,10 @@ class AddMemoryTool(BaseTool):
             "Example: If the user says 'remember that my favorite color is blue', 'add to my memory: I live in Paris', or 'store the fact that my birthday is July 2', call this tool."
         )
 
+    @property
+    def compact_description(self) -> str:
+        return "Store a new fact in the user's long-term memory (e.g. 'remember that ...'). Does not list memory."
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
@@ -1,23 +1,11 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from .base_tool import BaseTool
-import base64
-from cryptography.fernet import Fernet
-
-ENCRYPTION_KEY_FILE = os.path.expanduser("~/.tilde-cli/.key")
-
-def get_encryption_key():
-    if not os.path.exists(ENCRYPTION_KEY_FILE):
-        os.makedirs(os.path.dirname(ENCRYPTION_KEY_FILE), exist_ok=True)
-        key = Fernet.generate_key()
-        with open(ENCRYPTION_KEY_FILE, 'wb') as f:
-            f.write(key)
-    else:
-        with open(ENCRYPTION_KEY_FILE, 'rb') as f:
-            key = f.read()
-    return key
 
 class ReadFileTool(BaseTool):
+    keywords = ("read", "open", "show", "contents", "content", "cat", "view", "look at", "file")
+    read_only = True
+
     @property
     def name(self) -> str:
         return "read_file"
@@ -37,6 +25,10 @@ class ReadFileTool(BaseTool):
             "required": [],
         }
 
+    def cache_inputs(self, file_path: str = None, path: str = None, **kwargs) -> List[Tuple[str, bool]]:
+        file_path = file_path or path
+        return [(file_path, False)] if file_path else []
+
     def execute(self, file_path: str = None, path: str = None, decrypt: bool = False) -> str:
         # Accept either 'file_path' or 'path'
         file_path = file_path or path
@@ -46,11 +38,8 @@ class ReadFileTool(BaseTool):
         file_path = os.path.expanduser(file_path)
         try:
             if decrypt:
-                key = get_encryption_key()
-                fernet = Fernet(key)
-                with open(file_path, 'rb') as f:
-                    encrypted = f.read()
-                content = fernet.decrypt(encrypted).decode('utf-8')
+                from . import crypto
+                content = crypto.decrypt_file(file_path)
             else:
                 with open(file_path, 'r') as f:
                     content = f.read()
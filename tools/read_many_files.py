@@ -0,0 +1,174 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base_tool import BaseTool
+
+DEFAULT_MAX_TOKENS = 6000
+MAX_TOKENS = 12000
+CHARS_PER_TOKEN = 4  # same rule of thumb as utils.estimate_tokens
+MAX_FILES = 50
+MAX_WORKERS = 8
+BINARY_SNIFF_BYTES = 8192
+HEAD_SHARE = 2 / 3  # of a truncated file's share, the rest goes to its tail
+
+_GLOB_CHARS = set("*?[")
+
+
+def _expand(patterns: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Paths named by ``patterns`` (globs expanded, duplicates dropped, in order) and patterns that matched nothing."""
+    paths, missing, seen = [], [], set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if _GLOB_CHARS & set(pattern):
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+            if not matches:
+                missing.append((pattern, "no match"))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths, missing
+
+
+def _read(path: str, max_chars: int) -> Dict[str, Any]:
+    """Read one file; files bigger than ``max_chars`` bytes only have their head and tail read."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(max(max_chars, BINARY_SNIFF_BYTES) if size > max_chars * 2 else size)
+            if b"\0" in head[:BINARY_SNIFF_BYTES]:
+                return {"path": path, "skipped": "binary"}
+            tail = b""
+            if size > len(head):
+                f.seek(max(len(head), size - max_chars))
+                tail = f.read()
+    except FileNotFoundError:
+        return {"path": path, "skipped": "not found"}
+    except IsADirectoryError:
+        return {"path": path, "skipped": "directory"}
+    except OSError as e:
+        return {"path": path, "skipped": e.strerror or str(e)}
+    text = head.decode("utf-8", errors="replace")
+    if tail:
+        omitted = size - len(head) - len(tail)
+        text += (f"\n... [{omitted} bytes not read] ...\n" if omitted > 0 else "") + tail.decode("utf-8", errors="replace")
+    return {"path": path, "text": text, "size": size, "partial": bool(tail)}
+
+
+def _shares(sizes: List[int], budget: int) -> List[int]:
+    """Split ``budget`` characters fairly: small files get all they need, the rest is divided evenly."""
+    shares = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for n, i in enumerate(order):
+        shares[i] = min(sizes[i], remaining // (len(order) - n))
+        remaining -= shares[i]
+    return shares
+
+
+def _clip(text: str, share: int, partial: bool = False) -> Tuple[str, Optional[str]]:
+    """``text`` cut to about ``share`` characters at line boundaries, keeping its head and tail.
+
+    If even the first line is too long for the head, characters are cut instead.
+    ``partial`` means the middle of the file was never read, so line counts are unknown.
+    """
+    if len(text) <= share:
+        return text, None
+    lines = text.split("\n")
+    if len(lines[0]) + 1 > share * HEAD_SHARE:
+        # Lines too long to keep whole (minified code, one-line JSON): cut by characters
+        head_chars = int(share * HEAD_SHARE)
+        tail_chars = share - head_chars
+        marker = "middle of the file" if partial else f"{len(text) - share} characters"
+        marker = f"\n... [{marker} omitted] ...\n"
+        return (text[:head_chars] + marker + text[len(text) - tail_chars:],
+                f"showing the first {head_chars} and last {tail_chars} characters")
+    head, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > share * HEAD_SHARE:
+            break
+        head.append(line)
+        used += len(line) + 1
+    tail = []
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > share:
+            break
+        tail.insert(0, line)
+        used += len(line) + 1
+    if partial:
+        marker, note = "... [middle of the file omitted] ...", f"showing the first {len(head)} and last {len(tail)} lines"
+    else:
+        marker = f"... [{len(lines) - len(head) - len(tail)} lines omitted] ..."
+        note = f"showing lines 1-{len(head)}" + (f" and {len(lines) - len(tail) + 1}-{len(lines)}" if tail else "") + f" of {len(lines)}"
+    return "\n".join(head + [marker] + tail), note
+
+
+class ReadManyFilesTool(BaseTool):
+    keywords = ("read", "files", "all files", "these files", "contents", "source", "review", "look at", "*.")
+    read_only = True
+    # The tool keeps to its own budget, so its output is shown inline rather than stored as an artifact
+    inline_limit = MAX_TOKENS * CHARS_PER_TOKEN + 4000
+
+    @property
+    def name(self) -> str:
+        return "read_many_files"
+
+    @property
+    def description(self) -> str:
+        return ("Reads several files in one call. Takes a list of paths or glob patterns (e.g. src/**/*.py) "
+                "and returns each file's content, skipping binary files. All files share one token budget; "
+                "files that don't fit are shown by their first and last lines.")
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "paths": {"type": "array", "items": {"type": "string"}, "description": "File paths or glob patterns to read."},
+                "max_tokens": {"type": "integer", "description": f"Token budget shared by all files (default {DEFAULT_MAX_TOKENS}, at most {MAX_TOKENS})."}
+            },
+            "required": ["paths"]
+        }
+
+    def cache_inputs(self, paths: List[str] = (), **kwargs) -> List[Tuple[str, bool]]:
+        inputs = []
+        for pattern in [paths] if isinstance(paths, str) else paths:
+            pattern = os.path.abspath(os.path.expanduser(pattern))
+            if _GLOB_CHARS & set(pattern):
+                # A glob depends on everything below its first wildcard component
+                parts = pattern.split(os.sep)
+                base = next(i for i, part in enumerate(parts) if _GLOB_CHARS & set(part))
+                inputs.append((os.sep.join(parts[:base]) or os.sep, True))
+            else:
+                inputs.append((pattern, False))
+        return inputs
+
+    def execute(self, paths: List[str], max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths:
+            return "Error: No paths provided."
+        budget = max(1, min(int(max_tokens or DEFAULT_MAX_TOKENS), MAX_TOKENS)) * CHARS_PER_TOKEN
+        files, skipped = _expand(paths)
+        if len(files) > MAX_FILES:
+            skipped.append((f"{len(files) - MAX_FILES} more files", f"over the {MAX_FILES}-file limit"))
+            files = files[:MAX_FILES]
+        # A file never needs more than the whole budget, so nothing beyond it is read
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(files) or 1)) as pool:
+            results = list(pool.map(lambda path: _read(path, budget), files))
+        skipped += [(r["path"], r["skipped"]) for r in results if "skipped" in r]
+        read = [r for r in results if "text" in r]
+        sections = []
+        for result, share in zip(read, _shares([len(r["text"]) for r in read], budget)):
+            text, note = _clip(result["text"], share, result["partial"])
+            header = f"=== {result['path']} ({result['size']} bytes{', ' + note if note else ''}) ==="
+            sections.append(header + "\n" + text)
+        summary = f"[Read {len(read)} of {len(read) + len(skipped)} files"
+        if skipped:
+            summary += "; skipped " + ", ".join(f"{path} ({reason})" for path, reason in skipped)
+        sections.append(summary + "]")
+        return "\n\n".join(sections)
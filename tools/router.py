@@ -0,0 +1,175 @@
+import json
+import math
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from utils import estimate_tokens
+
+DEFAULT_CORE_TOOLS = ("shell", "read_file")
+DEFAULT_MAX_TOOLS = 6
+EMBEDDING_THRESHOLD = 0.45
+
+# Fixed evaluation set: (user message, tool the model is expected to need).
+EVAL_SET: List[Tuple[str, str]] = [
+    ("what time is it?", "time"),
+    ("What's the date today in UTC?", "time"),
+    ("show my memory", "list_memory"),
+    ("what do you know about me?", "list_memory"),
+    ("remember that my favorite color is blue", "add_memory"),
+    ("find all python files under src", "file_search"),
+    ("where is the config loaded? search for load_config", "grep"),
+    ("grep for TODO in the project", "grep"),
+    ("where is the code that retries failed model requests?", "code_search"),
+    ("how does the session history get trimmed to fit the context?", "code_search"),
+    ("read the README and summarize it", "read_file"),
+    ("open cli.py and explain the chat loop", "read_file"),
+    ("read all the python files in tools/ and review them", "read_many_files"),
+    ("look at cli.py, config_utils.py and context.py together", "read_many_files"),
+    ("list the files in my home directory", "ls"),
+    ("what's in this folder?", "ls"),
+    ("create a new file hello.py that prints hi", "createFile"),
+    ("write a shopping list to list.txt", "createFile"),
+    ("fix the typo in notes.md", "edit_file"),
+    ("change the port in settings.json to 8080", "edit_file"),
+    ("run the tests", "shell"),
+    ("install numpy with pip", "shell"),
+    ("git status please", "shell"),
+    ("fetch https://docs.python.org/3/ and tell me what's new", "web_fetch"),
+    ("download the page at example.com", "web_fetch"),
+    ("hide the thinking sections", "think_toggle"),
+    ("show me the next page of artifact:0123456789abcdef", "read_artifact"),
+]
+
+
+def _words(text: str) -> set:
+    words = set()
+    for word in re.findall(r"[a-z0-9_]+", text.lower()):
+        words.add(word)
+        if len(word) > 3 and word.endswith("s"):
+            words.add(word[:-1])
+    return words
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ToolRouter:
+    """Picks the subset of tool schemas worth sending with a given user message.
+
+    Tools are scored by keyword hits (declared on each tool as ``keywords``) and,
+    when an embedding function is supplied, by similarity between the message and
+    the tool's description. Messages that neither matches can be passed to
+    ``classify_fn`` (typically a small, fast model) which returns tool names. Core
+    tools are always included, as are tools used in the last few turns so
+    follow-ups like "now do the same for X" keep working.
+    """
+
+    def __init__(self, tools: Mapping[str, Any], core: Iterable[str] = DEFAULT_CORE_TOOLS,
+                 max_tools: int = DEFAULT_MAX_TOOLS, embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 compact: bool = True, classify_fn: Optional[Callable[[str], List[str]]] = None):
+        self.tools = tools
+        self.core = [name for name in core if name in tools]
+        self.max_tools = max_tools
+        self.embed_fn = embed_fn
+        self.classify_fn = classify_fn
+        self.classified = False
+        self.compact = compact
+        self._tool_vectors: Dict[str, List[float]] = {}
+        self._full_tokens = None
+        self.last_stats: Dict[str, Any] = {}
+        self.totals = {"requests": 0, "full_tokens": 0, "selected_tokens": 0}
+
+    def _keyword_score(self, name: str, message: str, words: set) -> float:
+        tool = self.tools[name]
+        score = 2.0 if name.lower() in words else 0.0
+        for keyword in getattr(tool, "keywords", ()):
+            keyword = keyword.lower()
+            if " " in keyword or not keyword.isalnum():
+                score += keyword in message
+            else:
+                score += keyword in words
+        return score
+
+    def _embedding_scores(self, message: str) -> Dict[str, float]:
+        if self.embed_fn is None:
+            return {}
+        try:
+            query = self.embed_fn(message)
+            for name in self.tools:
+                if name not in self._tool_vectors:
+                    tool = self.tools[name]
+                    text = f"{name}: {tool.compact_description} {' '.join(getattr(tool, 'keywords', ()))}"
+                    self._tool_vectors[name] = self.embed_fn(text)
+        except Exception:
+            # Embeddings are an optional refinement; keyword routing still works without them.
+            self.embed_fn = None
+            return {}
+        return {name: _cosine(query, vector) for name, vector in self._tool_vectors.items()}
+
+    def select(self, message: str, recent_tools: Iterable[str] = ()) -> List[str]:
+        """Return the names of the tools to offer for ``message``, most relevant first."""
+        lowered = message.lower()
+        words = _words(message)
+        similarity = self._embedding_scores(message)
+        scored = []
+        for name in self.tools:
+            score = self._keyword_score(name, lowered, words)
+            if similarity.get(name, 0.0) >= EMBEDDING_THRESHOLD:
+                score += similarity[name]
+            if score > 0:
+                scored.append((score, name))
+        self.classified = False
+        if not scored and self.classify_fn is not None:
+            try:
+                scored = [(1.0, name) for name in self.classify_fn(message) if name in self.tools]
+                self.classified = True
+            except Exception:
+                pass  # the model is a fallback; core and recent tools are still offered
+        selected = []
+        for name in [n for _, n in sorted(scored, key=lambda item: -item[0])] + list(recent_tools) + self.core:
+            if name in self.tools and name not in selected:
+                selected.append(name)
+        # Core tools are never dropped by the cap.
+        extra = [n for n in selected if n not in self.core][:max(0, self.max_tools - len(self.core))]
+        return [n for n in selected if n in extra or n in self.core]
+
+    def definitions(self, adapter, message: str, recent_tools: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Build the tool definitions for one request and record how many prompt tokens routing saved."""
+        names = self.select(message, recent_tools)
+        defs = adapter.build_tool_definitions({name: self.tools[name] for name in names}, compact=self.compact)
+        if self._full_tokens is None:
+            self._full_tokens = estimate_tokens(json.dumps(adapter.build_tool_definitions(self.tools)))
+        selected_tokens = estimate_tokens(json.dumps(defs))
+        self.last_stats = {
+            "selected": names,
+            "full_tokens": self._full_tokens,
+            "selected_tokens": selected_tokens,
+            "saved_tokens": self._full_tokens - selected_tokens,
+            "classified": self.classified,
+        }
+        self.totals["requests"] += 1
+        self.totals["full_tokens"] += self._full_tokens
+        self.totals["selected_tokens"] += selected_tokens
+        return defs
+
+
+def evaluate(router: ToolRouter, adapter, cases: Sequence[Tuple[str, str]] = EVAL_SET) -> Dict[str, Any]:
+    """Run the router over a fixed evaluation set and report recall and token savings."""
+    misses = []
+    saved = []
+    for message, expected in cases:
+        router.definitions(adapter, message)
+        saved.append(router.last_stats["saved_tokens"])
+        if expected not in router.last_stats["selected"]:
+            misses.append((message, expected, router.last_stats["selected"]))
+    return {
+        "cases": len(cases),
+        "recall": (len(cases) - len(misses)) / len(cases) if cases else 1.0,
+        "full_tokens": router.last_stats.get("full_tokens", 0),
+        "avg_selected_tokens": sum(router.last_stats["full_tokens"] - s for s in saved) / len(saved) if saved else 0,
+        "avg_saved_tokens": sum(saved) / len(saved) if saved else 0,
+        "misses": misses,
+    }
@@ -1,10 +1,357 @@
-import subprocess
+import atexit
+import itertools
+import os
+import queue
+import select
 import shlex
-from typing import Dict, Any
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
 
 from .base_tool import BaseTool
+from config_utils import Config
+
+SHELL_LOG_DIR = os.path.expanduser("~/.tilde-cli/shell-logs")
+MAX_LOG_FILES = 50
+HEAD_BYTES = 8 * 1024
+TAIL_BYTES = 24 * 1024
+READ_SIZE = 64 * 1024
+READER_GRACE = 1.0  # seconds to drain output after exit; background children may hold the pipes open
+
+
+class OutputCapture:
+    """Bounded capture of a byte stream: the first ``head_bytes`` plus a ring buffer of the last ``tail_bytes``."""
+
+    def __init__(self, head_bytes: int = HEAD_BYTES, tail_bytes: int = TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def feed(self, data: bytes):
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.tail_bytes
+            if excess > 0:
+                del self.tail[:excess]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self, log_file: Optional[str] = None) -> str:
+        head = bytes(self.head).decode('utf-8', errors='replace')
+        if not self.tail:
+            return head
+        tail = bytes(self.tail).decode('utf-8', errors='replace')
+        if self.omitted <= 0:
+            return head + tail
+        where = f", full output in {log_file}" if log_file else ""
+        return f"{head}\n... [{self.omitted} bytes omitted{where}] ...\n{tail}"
+
+
+def _new_log_path() -> str:
+    os.makedirs(SHELL_LOG_DIR, exist_ok=True)
+    logs = sorted(os.listdir(SHELL_LOG_DIR))
+    for stale in logs[:max(0, len(logs) - MAX_LOG_FILES + 1)]:
+        try:
+            os.remove(os.path.join(SHELL_LOG_DIR, stale))
+        except OSError:
+            pass
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(SHELL_LOG_DIR, f"{stamp}-{os.getpid()}-{next(_log_counter)}.log")
+
+
+_log_counter = itertools.count(1)
+_echo_lock = threading.Lock()
+
+
+def _echo(stream, data: bytes):
+    with _echo_lock:
+        try:
+            stream.buffer.write(data)
+        except AttributeError:
+            stream.write(data.decode('utf-8', errors='replace'))
+        stream.flush()
+
+
+class ShellJob:
+    """A shell command running in its own process group with bounded output capture.
+
+    Both pipes are drained by reader threads as data arrives: each chunk is appended
+    to a log file holding the complete output, fed to an :class:`OutputCapture` for
+    the model, and optionally echoed live to the terminal. A process the command
+    left running in the background (``server &``) keeps the pipes open; once the
+    command has exited, the readers give up on them after ``READER_GRACE`` seconds.
+    """
+
+    def __init__(self, command: str, working_directory: str = None, echo: bool = False, background: bool = False):
+        self.command = command
+        self.log_file = _new_log_path()
+        self.stdout = OutputCapture()
+        self.stderr = OutputCapture()
+        self.started = time.monotonic()
+        self.finished = None
+        self._log = open(self.log_file, 'wb')
+        self._log_lock = threading.Lock()
+        self._abandon = threading.Event()
+        self.process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL if background else None,
+            cwd=working_directory or None,
+            start_new_session=True,
+        )
+        self._readers = [
+            threading.Thread(target=self._pump, args=(self.process.stdout, self.stdout, sys.stdout if echo else None), daemon=True),
+            threading.Thread(target=self._pump, args=(self.process.stderr, self.stderr, sys.stderr if echo else None), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _pump(self, pipe, capture: OutputCapture, echo_stream):
+        try:
+            while not self._abandon.is_set():
+                if not select.select([pipe], [], [], 0.1)[0]:
+                    continue
+                data = pipe.read1(READ_SIZE)
+                if not data:
+                    return
+                capture.feed(data)
+                with self._log_lock:
+                    self._log.write(data)
+                if echo_stream is not None:
+                    _echo(echo_stream, data)
+        finally:
+            pipe.close()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the command and its output to finish; return False on timeout."""
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        self._finish()
+        return True
+
+    def poll(self) -> bool:
+        if self.process.poll() is None:
+            return False
+        self._finish()
+        return True
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+        self._finish()
+
+    def _finish(self):
+        if self.finished is not None:
+            return
+        deadline = time.monotonic() + READER_GRACE
+        for reader in self._readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        self._abandon.set()  # stop reading pipes still held open by background children
+        for reader in self._readers:
+            reader.join()
+        self.finished = time.monotonic()
+        self._log.close()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def result(self) -> Dict[str, Any]:
+        result = {
+            "stdout": self.stdout.text(self.log_file),
+            "stderr": self.stderr.text(self.log_file),
+            "exit_code": self.process.returncode,
+            "duration": round(self.duration, 3),
+            "stdout_bytes": self.stdout.total,
+            "stderr_bytes": self.stderr.total,
+            "log_file": self.log_file,
+        }
+        if self.process.returncode:
+            result["error"] = f"Command '{self.command}' returned non-zero exit status {self.process.returncode}."
+        return result
+
+
+class PersistentShell:
+    """A long-lived bash process reused across commands, so cwd, exports and activated envs persist.
+
+    Each command is sent through ``eval`` followed by a unique sentinel line on both
+    stdout and stderr carrying the exit status; output is read line by line until
+    both sentinels arrive. If a command times out or the shell exits, the process is
+    discarded and a fresh one is started on the next call.
+    """
+
+    def __init__(self):
+        self.process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        self._lines = queue.Queue()
+        for stream_name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            threading.Thread(target=self._pump, args=(stream_name, pipe, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump(stream_name, pipe, lines: "queue.Queue"):
+        for line in iter(lambda: pipe.readline(READ_SIZE), b""):
+            lines.put((stream_name, line))
+        lines.put((stream_name, None))
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+        self.process = None
+
+    def run(self, command: str, timeout: Optional[float] = None, working_directory: str = None,
+            echo: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            return self._run(command, timeout, working_directory, echo)
+
+    def _run(self, command, timeout, working_directory, echo) -> Dict[str, Any]:
+        if not self.alive:
+            self._start()
+        marker = f"__TILDE_{uuid.uuid4().hex}__"
+        body = f"eval {shlex.quote(command)}"
+        if working_directory:
+            body = f"( cd {shlex.quote(working_directory)} && {body} )"
+        script = (
+            f"{body} < /dev/null\n"
+            f"__tilde_rc=$?\n"
+            f"printf '\\n{marker} %d\\n' \"$__tilde_rc\"\n"
+            f"printf '\\n{marker}\\n' >&2\n"
+        )
+        try:
+            self.process.stdin.write(script.encode('utf-8'))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.close()
+            self._start()
+            self.process.stdin.write(script.encode('utf-8'))
+            self.process.stdin.flush()
+
+        log_file = _new_log_path()
+        captures = {"stdout": OutputCapture(), "stderr": OutputCapture()}
+        echo_streams = {"stdout": sys.stdout, "stderr": sys.stderr} if echo else {}
+        # The newline printed before each sentinel is ours, so the last newline seen on a
+        # stream is held back until we know whether a sentinel follows it.
+        held = {"stdout": b"", "stderr": b""}
+        done = set()
+        exit_code = None
+        error = None
+        started = time.monotonic()
+        deadline = started + timeout if timeout else None
+        marker_bytes = marker.encode('ascii')
+        with open(log_file, 'wb') as log:
+            while len(done) < 2:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    stream_name, line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    self.close()
+                    error = (f"Command timed out after {timeout} seconds. The persistent shell was restarted, "
+                             "so its working directory and variables were reset.")
+                    break
+                except KeyboardInterrupt:
+                    self.close()
+                    error = "Command interrupted by user. The persistent shell was restarted."
+                    break
+                if line is None:
+                    exit_code = self.process.wait()
+                    self.process = None
+                    error = "The persistent shell exited; a new one will be started for the next command."
+                    break
+                if line.startswith(marker_bytes):
+                    if stream_name == "stdout":
+                        exit_code = int(line.split()[1])
+                    held[stream_name] = b""
+                    done.add(stream_name)
+                    continue
+                data = held[stream_name] + (line[:-1] if line.endswith(b"\n") else line)
+                held[stream_name] = b"\n" if line.endswith(b"\n") else b""
+                if not data:
+                    continue
+                captures[stream_name].feed(data)
+                log.write(data)
+                if stream_name in echo_streams:
+                    _echo(echo_streams[stream_name], data)
+            for stream_name, pending in held.items():
+                if pending and stream_name not in done:
+                    captures[stream_name].feed(pending)
+                    log.write(pending)
+
+        result = {
+            "stdout": captures["stdout"].text(log_file),
+            "stderr": captures["stderr"].text(log_file),
+            "exit_code": exit_code,
+            "duration": round(time.monotonic() - started, 3),
+            "stdout_bytes": captures["stdout"].total,
+            "stderr_bytes": captures["stderr"].total,
+            "log_file": log_file,
+        }
+        if error:
+            result["error"] = error
+        elif exit_code:
+            result["error"] = f"Command '{command}' returned non-zero exit status {exit_code}."
+        return result
+
+
+_persistent_shell: Optional[PersistentShell] = None
+
+
+def get_persistent_shell() -> PersistentShell:
+    """Return the session's shared persistent shell, creating it on first use."""
+    global _persistent_shell
+    if _persistent_shell is None:
+        _persistent_shell = PersistentShell()
+        atexit.register(_persistent_shell.close)
+    return _persistent_shell
+
+
+_jobs: Dict[str, ShellJob] = {}
+_job_ids = itertools.count(1)
+
 
 class ShellTool(BaseTool):
+    keywords = ("run", "command", "execute", "install", "build", "compile", "git", "pip", "make", "process", "script", "terminal", "bash", "test", "tests", "job")
+    writes_files = True  # any command may change files
+
     @property
     def name(self) -> str:
         return "shell"
@@ -15,29 +362,44 @@ class ShellTool(BaseTool):
             "Run any Linux shell command or application.\n"
             "- Use this tool if no other tool can fulfill the user's request.\n"
             "- Supports any command-line program, script, or utility available in the system shell.\n"
-            "- Returns both standard output (stdout) and error (stderr).\n"
+            "- Returns stdout, stderr, exit_code and duration. Very long output is trimmed to its beginning and end; the full output is saved to 'log_file'.\n"
             "- For long-running commands (loops, scripts with sleep), specify the estimated execution time in seconds with the 'timeout' parameter.\n"
             "  - If not specified, the command will be terminated after 60 seconds.\n"
             "  - To run until finished, set 'timeout' to 0.\n"
-            "- If the command produces multi-line or iterative output, consider redirecting output to a file (e.g., 'output.txt') for later analysis.\n\n"
+            "- For commands that take minutes (builds, test suites, servers), set 'background' to true. You get a 'job_id' back immediately; "
+            "call this tool again with only {\"job_id\": ...} to check progress and get the result.\n\n"
             "Example usage:\n"
             "- List files: {\"command\": \"ls -l\"}\n"
             "- Long loop for 120 seconds: {\"command\": \"for i in {1..10}; do echo $i; sleep 12; done\", \"timeout\": 120}\n"
             "- Run until finished: {\"command\": \"bash myscript.sh\", \"timeout\": 0}\n"
-            "- Save output to file: {\"command\": \"ls -l > output.txt 2>&1\"}"
+            "- Start a build in the background: {\"command\": \"make -j8\", \"background\": true}\n"
+            "- Check on it later: {\"job_id\": \"1\"}"
         )
 
+    @property
+    def compact_description(self) -> str:
+        return "Run a Linux shell command; returns stdout, stderr, exit_code. Use when no other tool fits. Optional: timeout (seconds, 0 = none), background=true for long jobs, then poll with job_id."
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
             "type": "object",
             "properties": {
-                "command": {"type": "string", "description": "The shell command to execute."}
+                "command": {"type": "string", "description": "The shell command to execute."},
+                "timeout": {"type": "integer", "description": "Seconds before the command is killed (default 60, 0 = no limit)."},
+                "background": {"type": "boolean", "description": "Run the command as a background job and return its job_id immediately."},
+                "job_id": {"type": "string", "description": "Poll a background job started earlier instead of running a new command."}
             },
-            "required": ["command"]
+            "required": []
         }
 
-    def execute(self, command: str, require_confirmation: bool = True, working_directory: str = None, timeout: int = None) -> Dict[str, str]:
+    def execute(self, command: str = None, require_confirmation: bool = True, working_directory: str = None,
+                timeout: int = None, background: bool = False, job_id: str = None, stream: bool = True,
+                persistent: bool = None) -> Dict[str, Any]:
+        if job_id is not None:
+            return self.poll_job(str(job_id))
+        if not command:
+            return {"error": "No command provided."}
         # Security: require explicit confirmation unless overridden
         if require_confirmation:
             import logging
@@ -45,6 +407,11 @@ class ShellTool(BaseTool):
             confirm = input("Are you sure you want to run this command? (yes/no): ")
             if confirm.lower() != "yes":
                 return {"error": "Shell command execution cancelled by user."}
+        if background:
+            job = ShellJob(command, working_directory, background=True)
+            new_id = str(next(_job_ids))
+            _jobs[new_id] = job
+            return {"job_id": new_id, "status": "running", "log_file": job.log_file}
         # Timeout logic
         if timeout is None:
             timeout = 60  # default
@@ -52,18 +419,43 @@ class ShellTool(BaseTool):
             timeout_arg = None  # Wait until finished
         else:
             timeout_arg = timeout
+        if persistent is None:
+            persistent = getattr(Config, 'SHELL_PERSISTENT', False)
+        if persistent:
+            return get_persistent_shell().run(command, timeout=timeout_arg, working_directory=working_directory, echo=stream)
+        job = ShellJob(command, working_directory, echo=stream)
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=True,
-                cwd=working_directory or None,
-                timeout=timeout_arg
-            )
-            return {"stdout": result.stdout, "stderr": result.stderr}
-        except subprocess.TimeoutExpired as e:
-            return {"stdout": e.stdout or '', "stderr": e.stderr or '', "error": f"Command timed out after {timeout} seconds."}
-        except subprocess.CalledProcessError as e:
-            return {"stdout": e.stdout, "stderr": e.stderr, "error": str(e)}
+            finished = job.wait(timeout_arg)
+        except KeyboardInterrupt:
+            job.kill()
+            result = job.result()
+            result["error"] = "Command interrupted by user."
+            return result
+        if not finished:
+            job.kill()
+            result = job.result()
+            result["error"] = f"Command timed out after {timeout} seconds."
+            return result
+        return job.result()
+
+    def poll_job(self, job_id: str) -> Dict[str, Any]:
+        """Return the status of a background job, with its full result once it has exited."""
+        job = _jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job_id '{job_id}'. Known jobs: {sorted(_jobs)}"}
+        if not job.poll():
+            return {
+                "job_id": job_id,
+                "status": "running",
+                "duration": round(job.duration, 3),
+                "stdout_bytes": job.stdout.total,
+                "stderr_bytes": job.stderr.total,
+                "stdout_tail": bytes(job.stdout.tail or job.stdout.head)[-2048:].decode('utf-8', errors='replace'),
+                "log_file": job.log_file,
+            }
+        # The result has been handed over, so the job is forgotten (its log file stays)
+        del _jobs[job_id]
+        result = job.result()
+        result["job_id"] = job_id
+        result["status"] = "exited"
+        return result
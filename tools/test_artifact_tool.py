@@ -0,0 +1,28 @@
+import re
+
+import artifacts
+from artifacts import ArtifactStore, compact_output
+from cli import TildeCLI
+
+
+def test_paging_a_large_artifact_is_shown_inline(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "_store", ArtifactStore(str(tmp_path)))
+    text = "\n".join(f"line {i}: " + "x" * 40 for i in range(1, 1001))
+    preview = compact_output(text)
+    handle = re.search(r"artifact:[0-9a-f]+", preview).group(0)
+    cli = TildeCLI()
+    offset, seen = 1, []
+    while offset:
+        page = cli._tool_output_text("read_artifact", cli.tools["read_artifact"].execute(handle=handle, offset=offset))
+        assert "artifact:" not in page.replace(handle, "")  # never stored again as a new artifact
+        seen += [line for line in page.split("\n") if line.startswith("line ")]
+        found = re.search(r"continue with offset (\d+)", page)
+        offset = int(found.group(1)) if found else None
+    assert len(seen) == 1000 and seen[-1].startswith("line 1000:")
+
+
+def test_long_lines_are_cut_to_fit_a_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "_store", ArtifactStore(str(tmp_path)))
+    handle = artifacts.get_artifact_store().put("\n".join("y" * 9000 for _ in range(10)))
+    page = TildeCLI().tools["read_artifact"].execute(handle=handle, limit=10)
+    assert "Lines 1-1 of 10; continue with offset 2" in page
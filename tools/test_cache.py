@@ -0,0 +1,32 @@
+from tools.cache import ToolResultCache
+from tools.grep import GrepTool
+from tools.read_file import ReadFileTool
+
+
+def test_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text("one\n")
+    tool, cache = ReadFileTool(), ToolResultCache()
+    assert cache.get(tool, {"file_path": str(path)}) is None
+    cache.put(tool, {"file_path": str(path)}, tool.execute(file_path=str(path)))
+    # A relative spelling of the same file normalizes to the same key
+    monkeypatch.chdir(tmp_path)
+    assert cache.get(tool, {"path": "notes.txt"}) is None  # different argument name, different call
+    assert cache.get(tool, {"file_path": "notes.txt"}).result == "one\n"
+    path.write_text("one\ntwo\n")
+    assert cache.get(tool, {"file_path": str(path)}) is None
+    assert cache.stats == {"hits": 1, "misses": 3, "invalidations": 0}
+
+
+def test_recursive_inputs_see_changes_below_the_directory(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("x = 1\n")
+    tool, cache = GrepTool(), ToolResultCache()
+    params = {"pattern": "x", "path": str(tmp_path)}
+    cache.put(tool, params, tool.execute(**params))
+    assert cache.get(tool, dict(params, include=None)) is not None  # defaults are part of the key
+    (tmp_path / "pkg" / "a.py").write_text("x = 22\n")
+    assert cache.get(tool, params) is None
+    cache.put(tool, params, tool.execute(**params))
+    cache.invalidate()
+    assert len(cache) == 0 and cache.get(tool, params) is None
@@ -0,0 +1,64 @@
+import os
+
+import code_index
+from code_index import CodeIndex, chunk_python
+from tools.code_search import CodeSearchTool
+
+WORDS = ["parse", "tool", "call", "retry", "request", "session", "save", "history"]
+
+
+def _embed(texts):
+    return [[float(text.lower().count(word)) + 0.01 for word in WORDS] for text in texts]
+
+
+def test_python_files_are_chunked_by_definition():
+    source = "import os\n\n\n@decorator\ndef parse_tool_call(text):\n    return text\n\n\nclass Session:\n    pass\n"
+    assert chunk_python(source) == [(1, 3, "<module>"), (4, 6, "parse_tool_call"), (9, 10, "Session")]
+
+
+def test_index_reembeds_only_changed_files_and_search_finds_code(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_index, "INDEX_ROOT", str(tmp_path / "index"))
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "parser.py").write_text("def parse_tool_call(text):\n    # parse the tool call\n    return text\n")
+    (workspace / "session.py").write_text("def save_session(history):\n    # save the session history\n    pass\n")
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(len(texts))
+        return _embed(texts)
+
+    stats = CodeIndex(str(workspace)).build("test-embed", embed_batch)
+    assert (stats["files"], stats["embedded_chunks"]) == (2, 2)
+    (workspace / "session.py").write_text("def save_session(history):\n    # save the whole session history\n    pass\n")
+    stats = CodeIndex(str(workspace)).build("test-embed", embed_batch)
+    assert (stats["files"], stats["embedded_files"], stats["embedded_chunks"]) == (2, 1, 1)
+
+    index = CodeIndex(str(workspace))
+    best = index.search(_embed(["how is a tool call parsed"])[0], k=1)[0]
+    assert (best["path"], best["start"], best["end"], best["name"]) == ("parser.py", 1, 3, "parse_tool_call")
+
+    monkeypatch.chdir(workspace)
+    tool = CodeSearchTool()
+    monkeypatch.setattr(tool, "_embed", lambda model, text: _embed([text])[0])
+    out = tool.execute(query="save session history", k=1)
+    assert out.startswith("=== session.py:1-3 (save_session, score") and "# save the whole session history" in out
+
+
+def test_missing_vectors_file_rebuilds_and_search_streams_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_index, "INDEX_ROOT", str(tmp_path / "index"))
+    monkeypatch.setattr(code_index, "np", None)
+    monkeypatch.setattr(code_index, "SCAN_BLOCK_ROWS", 2)
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    for i, word in enumerate(WORDS[:5]):
+        (workspace / f"m{i}.py").write_text(f"def {word}_it():\n    # {word} {word}\n    pass\n")
+    index = CodeIndex(str(workspace))
+    index.build("test-embed", _embed)
+    os.remove(os.path.join(index.index_dir, code_index.VECTORS_FILE))
+
+    stats = CodeIndex(str(workspace)).build("test-embed", _embed)
+    assert (stats["files"], stats["embedded_files"]) == (5, 5)
+    hits = CodeIndex(str(workspace)).search(_embed(["retry the request"])[0], k=2)
+    assert sorted(hit["name"] for hit in hits) == ["request_it", "retry_it"]
+    assert hits[0]["score"] >= hits[1]["score"]
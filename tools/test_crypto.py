@@ -0,0 +1,54 @@
+import io
+import pytest
+from cryptography.fernet import Fernet
+from tools import crypto
+from tools.grep import GrepTool
+
+KEY = Fernet.generate_key()
+
+def test_roundtrip_multiple_chunks(tmp_path):
+    path = tmp_path / "secret.bin"
+    text = "".join(f"line {i}\n" for i in range(5000))
+    crypto.encrypt_to_file(str(path), text, key=KEY, chunk_size=1024)
+    assert crypto.decrypt_file(str(path), key=KEY) == text
+    assert list(crypto.iter_decrypted_lines(str(path), key=KEY)) == text.splitlines()
+
+def test_empty_plaintext(tmp_path):
+    path = tmp_path / "empty.bin"
+    crypto.encrypt_to_file(str(path), "", key=KEY)
+    assert crypto.decrypt_file(str(path), key=KEY) == ""
+
+def test_random_access_by_chunk(tmp_path):
+    path = tmp_path / "secret.bin"
+    data = bytes(range(256)) * 40
+    crypto.encrypt_to_file(str(path), data, key=KEY, chunk_size=1000)
+    assert crypto.read_chunk(str(path), 3, key=KEY) == data[3000:4000]
+    assert crypto.read_chunk(str(path), 10, key=KEY) == data[10000:]
+
+def test_encrypt_stream_regroups_short_reads():
+    src = io.BufferedReader(io.BytesIO(b"x" * 2500), buffer_size=7)
+    dst = io.BytesIO()
+    crypto.encrypt_stream(src, dst, key=KEY, chunk_size=1000)
+    dst.seek(0)
+    reader = crypto.ChunkedReader(dst, key=KEY)
+    assert reader.num_chunks == 3
+    assert reader.read_chunk(1) == b"x" * 1000
+
+def test_truncation_is_detected(tmp_path):
+    path = tmp_path / "secret.bin"
+    crypto.encrypt_to_file(str(path), "a" * 5000, key=KEY, chunk_size=1000)
+    data = path.read_bytes()
+    path.write_bytes(data[:crypto.HEADER_SIZE + 2 * (1000 + crypto.TAG_SIZE)])
+    with pytest.raises(crypto.DecryptionError):
+        crypto.decrypt_file(str(path), key=KEY)
+
+def test_legacy_fernet_files_still_decrypt(tmp_path):
+    path = tmp_path / "legacy.bin"
+    path.write_bytes(Fernet(KEY).encrypt("old\nformat".encode('utf-8')))
+    assert list(crypto.iter_decrypted_lines(str(path), key=KEY)) == ["old", "format"]
+
+def test_grep_decrypt_streams_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(crypto, "get_encryption_key", lambda: KEY)
+    crypto.encrypt_to_file(str(tmp_path / "notes.enc"), "alpha\nbeta\ngamma\n", key=KEY, chunk_size=4)
+    results = GrepTool().execute("be.a", path=str(tmp_path), decrypt=True)
+    assert results == [f"{tmp_path / 'notes.enc'}:2: beta"]
@@ -0,0 +1,75 @@
+from tools import get_all_tools
+from tools.intents import IntentMatcher, render_result
+
+
+def test_exact_phrases_match_with_parameters():
+    matcher = IntentMatcher(get_all_tools())
+    match = matcher.match("Hey tilde, what's the time?")
+    assert (match.tool, match.parameters) == ("time", {"format": "time"})
+    match = matcher.match("what time is it in Europe/Berlin")
+    assert match.parameters == {"format": "time", "timezone": "Europe/Berlin"}
+    assert matcher.match("please show my memory").tool == "list_memory"
+    assert matcher.stats == {"checked": 3, "hits": 3}
+
+
+def test_anything_more_goes_to_the_model():
+    matcher = IntentMatcher(get_all_tools())
+    assert matcher.match("what time is it in the office kitchen") is None
+    assert matcher.match("show my memory and then delete the oldest fact") is None
+    assert matcher.match("list files in src that changed today") is None
+    assert matcher.hit_rate == 0.0
+
+
+class _Clock:
+    intents = {"what time is it": {"format": "time"}, "what time is it in {timezone}": {"format": "time"}}
+
+
+def test_embedding_similarity_matches_close_paraphrases():
+    vectors = {"what time is it": [1.0, 0.0], "tell me the time": [0.99, 0.05]}
+    matcher = IntentMatcher({"time": _Clock()}, embed_fn=lambda text: vectors.get(text, [0.0, 1.0]))
+    assert matcher.match("tell me the time").tool == "time"
+    assert matcher.match("tell me a joke") is None
+
+
+class _Thinking:
+    intents = {"hide thinking": {"enabled": False}, "show thinking": {"enabled": True}}
+
+
+def test_embedding_rejects_paraphrases_that_change_the_request():
+    embedded = []
+    vectors = {"what time is it": [1.0, 0.0], "what time is it in new york": [0.99, 0.05],
+               "hide thinking": [1.0, 0.0], "show thinking": [0.0, 1.0], "don't hide thinking": [0.98, 0.1],
+               "thinking": [0.7, 0.7]}
+
+    def embed(text):
+        embedded.append(text)
+        return vectors.get(text, [0.5, 0.5])
+
+    matcher = IntentMatcher({"time": _Clock()}, embed_fn=embed)
+    assert matcher.match("what time is it in New York") is None  # "new york" isn't a one-word {timezone}
+    matcher = IntentMatcher({"think": _Thinking()}, embed_fn=embed)
+    assert matcher.match("don't hide thinking") is None
+    assert not embedded  # words outside every phrase are rejected before embedding
+    assert matcher.match("thinking") is None  # equally close to both toggles
+    assert "thinking" in embedded
+
+
+def test_render_result():
+    assert render_result([{"fact": "likes tea"}, {"fact": "lives in Oslo"}]) == "- likes tea\n- lives in Oslo"
+    assert render_result("12:00:00 (Local)") == "12:00:00 (Local)"
+
+
+def test_no_fast_path_applies_to_one_chat_only(monkeypatch):
+    from cli import TildeCLI
+    from config_utils import Config
+    cli = TildeCLI()
+    monkeypatch.setattr(Config, "INTENT_FAST_PATH", True)
+    monkeypatch.setattr(Config, "METRICS", False)
+    answered, asked = [], []
+    monkeypatch.setattr(cli, "_answer_locally", lambda text: answered.append(text) or True)
+    monkeypatch.setattr(cli, "_select_tool_definitions", lambda text: [])
+    monkeypatch.setattr(cli, "_get_llm_response", lambda call_depth=0: asked.append(list(cli.session.history)[-1]["content"]))
+    cli.dispatch(cli.parser.parse_args(["chat", "--once", "--no-fast-path", "what time is it"]))
+    cli.dispatch(cli.parser.parse_args(["chat", "--once", "what time is it now"]))
+    assert asked == ["what time is it"] and answered == ["what time is it now"]
+    assert Config.INTENT_FAST_PATH is True
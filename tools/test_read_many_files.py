@@ -0,0 +1,30 @@
+from tools.read_many_files import ReadManyFilesTool
+
+
+def test_globs_binaries_and_missing_files(tmp_path):
+    (tmp_path / "a.py").write_text("print('a')\n")
+    (tmp_path / "b.py").write_text("print('b')\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0")
+    out = ReadManyFilesTool().execute(paths=[str(tmp_path / "*.py"), str(tmp_path / "logo.png"), str(tmp_path / "gone.txt")])
+    assert out.index("a.py") < out.index("print('a')") < out.index("b.py") < out.index("print('b')")
+    assert "logo.png (binary)" in out and "gone.txt (not found)" in out
+    assert out.endswith("]") and "[Read 2 of 4 files" in out
+
+
+def test_files_share_one_budget(tmp_path):
+    (tmp_path / "small.txt").write_text("tiny\n")
+    (tmp_path / "big.txt").write_text("".join(f"line {i}\n" for i in range(5000)))
+    out = ReadManyFilesTool().execute(paths=[str(tmp_path / "small.txt"), str(tmp_path / "big.txt")], max_tokens=200)
+    assert "tiny" in out  # small files are shown whole
+    assert "line 0\n" in out and "line 4999" in out and "line 2500\n" not in out
+    assert "omitted] ..." in out and len(out) < 200 * 4 + 400
+
+
+def test_long_lines_are_cut_by_characters(tmp_path):
+    (tmp_path / "data.json").write_text("[" + ",".join(f'{{"id": {i}}}' for i in range(3000)) + "]")
+    out = ReadManyFilesTool().execute(paths=[str(tmp_path / "data.json")], max_tokens=2000)
+    assert out.count("omitted] ...") == 1 and "first 5333 and last 2667 characters" in out
+    body = out.split("\n", 1)[1]
+    assert body.startswith('[{"id": 0},{"id": 1}')
+    assert '{"id": 2999}]' in body
+    assert 2000 * 4 <= len(body) < 2000 * 4 + 200
@@ -0,0 +1,76 @@
+from tools.router import ToolRouter, evaluate
+
+
+class StubTool:
+    def __init__(self, description, keywords=()):
+        self.compact_description = description
+        self.keywords = keywords
+
+
+TOOLS = {
+    "shell": StubTool("Run a shell command.", ("run", "command")),
+    "read_file": StubTool("Read a file.", ("read", "open")),
+    "time": StubTool("Current date and time.", ("time", "date", "clock")),
+    "web_fetch": StubTool("Fetch a web page.", ("http", "url", "fetch")),
+    "grep": StubTool("Search file contents.", ("grep", "search for")),
+    "weather": StubTool("Weather forecast for a place.", ()),
+}
+
+
+def test_keyword_hits_come_first_and_core_tools_are_always_offered():
+    router = ToolRouter(TOOLS, max_tools=4)
+    assert router.select("what time is it?") == ["time", "shell", "read_file"]
+    # Multi-word keywords match as phrases; the tool's own name counts double
+    assert router.select("grep or search for TODO")[:1] == ["grep"]
+    assert router.select("hello there") == ["shell", "read_file"]
+
+
+def test_cap_never_drops_core_tools():
+    router = ToolRouter(TOOLS, max_tools=3)
+    # web_fetch matches twice and time once; only one slot is left beside the core tools
+    assert router.select("fetch the url, then check the clock") == ["web_fetch", "shell", "read_file"]
+
+
+def test_recent_tools_carry_over_to_follow_ups():
+    router = ToolRouter(TOOLS, max_tools=4)
+    assert "web_fetch" not in router.select("now do the same for the other one")
+    assert router.select("now do the same for the other one", recent_tools=["web_fetch", "gone"]) == \
+        ["web_fetch", "shell", "read_file"]
+
+
+def test_embeddings_catch_what_keywords_miss_and_failures_fall_back():
+    vectors = {"weather": [1.0, 0.0], "forecast": [0.9, 0.1]}
+
+    def embed(text):
+        return next((v for word, v in vectors.items() if word in text.lower()), [0.0, 1.0])
+
+    router = ToolRouter(TOOLS, embed_fn=embed)
+    assert router.select("will I need an umbrella? give me the forecast")[0] == "weather"
+
+    def broken(text):
+        raise ConnectionError("embedding model not loaded")
+
+    router = ToolRouter(TOOLS, embed_fn=broken)
+    assert router.select("what time is it?")[0] == "time"  # keyword routing still works
+    assert router.embed_fn is None  # and the embedding model isn't asked again
+
+
+def test_classifier_is_only_asked_when_nothing_matches():
+    asked = []
+
+    def classify(message):
+        asked.append(message)
+        return ["weather", "unknown"]
+
+    router = ToolRouter(TOOLS, classify_fn=classify)
+    assert router.select("what time is it?")[0] == "time" and not router.classified
+    assert router.select("umbrella tomorrow?") == ["weather", "shell", "read_file"] and router.classified
+    assert asked == ["umbrella tomorrow?"]
+
+
+def test_registry_keywords_cover_the_evaluation_set():
+    from cli import TildeCLI
+    cli = TildeCLI()
+    result = evaluate(ToolRouter(cli.tools), cli.model_adapter)
+    assert result["recall"] == 1.0, result["misses"]
+    assert result["avg_saved_tokens"] > 0
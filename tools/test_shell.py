@@ -0,0 +1,93 @@
+import time
+import pytest
+from tools import shell
+from tools.shell import ShellTool, OutputCapture
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(shell, "SHELL_LOG_DIR", str(tmp_path / "logs"))
+    return tmp_path / "logs"
+
+def run(**kwargs):
+    return ShellTool().execute(require_confirmation=False, stream=False, **kwargs)
+
+def test_output_capture_keeps_head_and_tail():
+    capture = OutputCapture(head_bytes=4, tail_bytes=4)
+    for piece in (b"abc", b"defgh", b"ijklmn"):
+        capture.feed(piece)
+    assert capture.total == 14
+    assert bytes(capture.head) == b"abcd"
+    assert bytes(capture.tail) == b"klmn"
+    assert "6 bytes omitted" in capture.text()
+
+def test_exit_code_and_byte_counts():
+    result = run(command="printf hello; printf oops >&2; exit 3")
+    assert result["stdout"] == "hello"
+    assert result["stderr"] == "oops"
+    assert result["exit_code"] == 3
+    assert result["stdout_bytes"] == 5
+    assert "error" in result
+
+def test_large_output_is_bounded_and_logged():
+    result = run(command="head -c 1000000 /dev/zero | tr '\\0' x")
+    assert result["stdout_bytes"] == 1000000
+    assert len(result["stdout"]) < shell.HEAD_BYTES + shell.TAIL_BYTES + 200
+    with open(result["log_file"], "rb") as f:
+        assert len(f.read()) == 1000000
+
+def test_timeout_kills_command():
+    result = run(command="sleep 10", timeout=1)
+    assert "timed out" in result["error"]
+    assert result["duration"] < 5
+
+def test_background_job_can_be_polled():
+    started = run(command="sleep 0.3; echo done", background=True)
+    assert started["status"] == "running"
+    deadline = time.time() + 5
+    while True:
+        polled = run(job_id=started["job_id"])
+        if polled["status"] == "exited" or time.time() > deadline:
+            break
+        time.sleep(0.05)
+    assert polled["status"] == "exited"
+    assert polled["stdout"] == "done\n"
+
+def test_persistent_shell_keeps_state(tmp_path):
+    session = shell.PersistentShell()
+    try:
+        assert session.run(f"cd {tmp_path} && export TILDE_X=42")["exit_code"] == 0
+        result = session.run("pwd; echo $TILDE_X; printf no-newline")
+        assert result["stdout"] == f"{tmp_path}\n42\nno-newline"
+        assert session.run("false")["exit_code"] == 1
+        assert session.run('echo "unterminated')["exit_code"] != 0
+        assert session.run("echo still-alive")["stdout"] == "still-alive\n"
+    finally:
+        session.close()
+
+def test_persistent_shell_recovers_after_exit_and_timeout():
+    session = shell.PersistentShell()
+    try:
+        assert "exited" in session.run("exit 4")["error"]
+        assert session.run("echo back")["stdout"] == "back\n"
+        assert "timed out" in session.run("sleep 10", timeout=0.5)["error"]
+        assert session.run("echo again")["stdout"] == "again\n"
+    finally:
+        session.close()
+
+def test_background_child_holding_the_pipes_does_not_hang():
+    job = shell.ShellJob("sleep 30 & echo started")
+    try:
+        started = time.monotonic()
+        assert job.wait(5)
+        assert time.monotonic() - started < shell.READER_GRACE + 1
+        assert job.result()["stdout"] == "started\n"
+        assert all(not reader.is_alive() for reader in job._readers)
+    finally:
+        job.kill()
+
+def test_finished_jobs_are_forgotten_once_read():
+    job_id = run(command="echo done", background=True)["job_id"]
+    shell._jobs[job_id].wait()
+    assert run(job_id=job_id)["status"] == "exited"
+    assert job_id not in shell._jobs
+    assert "Unknown job_id" in run(job_id=job_id)["error"]
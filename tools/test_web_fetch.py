@@ -0,0 +1,106 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from tools.web_fetch import WebFetchTool, HttpCache
+from tools.html_text import html_to_text
+
+PAGE = b"<html><head><title>Docs</title><script>var x = 1;</script></head><body><h1>Intro</h1><p>Hello   <b>world</b></p><ul><li>one</li><li>two</li></ul></body></html>"
+
+class Handler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send(PAGE, {"ETag": '"v1"', "Cache-Control": "no-cache"})
+        elif self.path == "/max-age":
+            self._send(PAGE, {"Cache-Control": "max-age=600"})
+        elif self.path == "/no-store":
+            self._send(b"secret", {"Cache-Control": "no-store"}, "text/plain")
+        elif self.path == "/big-fresh":
+            self._send(b"y" * 5000, {"Cache-Control": "max-age=600"}, "text/plain")
+        elif self.path == "/vary":
+            self._send(self.headers.get("User-Agent", "").encode(), {"Cache-Control": "max-age=600", "Vary": "User-Agent"}, "text/plain")
+        elif self.path == "/big":
+            self._send(b"x" * 500000, {}, "text/plain")
+        else:
+            self.send_error(404)
+
+    def _send(self, body, headers, content_type="text/html; charset=utf-8"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+@pytest.fixture
+def tool(tmp_path):
+    Handler.hits.clear()
+    return WebFetchTool(cache=HttpCache(str(tmp_path)))
+
+def test_html_is_converted_to_text():
+    text = html_to_text(PAGE.decode())
+    assert text == "# Docs\n\n# Intro\n\nHello world\n\n- one\n- two"
+
+def test_max_age_is_served_from_cache(server, tool):
+    first = tool.execute(f"{server}/max-age")
+    assert tool.execute(f"{server}/max-age") == first
+    assert Handler.hits["/max-age"] == 1
+    assert tool.cache.stats == {"hits": 1, "misses": 1, "revalidated": 0}
+
+def test_etag_is_revalidated(server, tool):
+    first = tool.execute(f"{server}/etag")
+    assert tool.execute(f"{server}/etag") == first
+    assert Handler.hits["/etag"] == 2
+    assert tool.cache.stats == {"hits": 0, "misses": 1, "revalidated": 1}
+
+def test_no_store_is_not_cached(server, tool):
+    assert tool.execute(f"{server}/no-store") == "secret"
+    tool.execute(f"{server}/no-store")
+    assert tool.cache.stats["misses"] == 2
+
+def test_download_is_capped(server, tool):
+    text = tool.execute(f"{server}/big", max_bytes=1000)
+    assert text.startswith("x" * 1000 + "\n\n[Content truncated")
+
+def test_http_error(server, tool):
+    assert tool.execute(f"{server}/missing").startswith("Error fetching URL")
+
+def test_truncated_entry_does_not_answer_a_bigger_limit(server, tool):
+    assert "[Content truncated" in tool.execute(f"{server}/big-fresh", max_bytes=1000)
+    assert "[Content truncated" in tool.execute(f"{server}/big-fresh", max_bytes=1000)
+    assert Handler.hits["/big-fresh"] == 1
+    assert tool.execute(f"{server}/big-fresh", max_bytes=10000) == "y" * 5000
+    assert Handler.hits["/big-fresh"] == 2
+    # The full body also serves smaller limits, cut to size
+    assert tool.execute(f"{server}/big-fresh", max_bytes=100).startswith("y" * 100 + "\n\n[Content truncated")
+    assert Handler.hits["/big-fresh"] == 2
+
+def test_vary_keeps_entries_per_request_header(server, tool):
+    import requests
+    other = requests.Session()
+    other.headers["User-Agent"] = "other-agent"
+    other_tool = WebFetchTool(cache=tool.cache, session=other)
+    assert tool.execute(f"{server}/vary") == "tilde-cli"
+    assert other_tool.execute(f"{server}/vary") == "other-agent"
+    assert tool.execute(f"{server}/vary") == "tilde-cli"
+    assert Handler.hits["/vary"] == 3
+    assert tool.execute(f"{server}/vary") == "tilde-cli"  # one entry per URL: the last agent's is kept
+    assert Handler.hits["/vary"] == 3
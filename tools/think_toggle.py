@@ -3,6 +3,16 @@ from config_utils import Config
 from typing import Dict, Any
 
 class ThinkToggleTool(BaseTool):
+    keywords = ("think", "thinking", "reasoning", "<think>")
+    intents = {
+        "hide thinking": {"enabled": False},
+        "hide the thinking": {"enabled": False},
+        "hide think sections": {"enabled": False},
+        "show thinking": {"enabled": True},
+        "show the thinking": {"enabled": True},
+        "show think sections": {"enabled": True},
+    }
+
     @property
     def name(self) -> str:
         return "think_toggle"
@@ -19,6 +29,10 @@ class ThinkToggleTool(BaseTool):
             "- {\"enabled\": false}  # Hide <think> sections in LLM output\n"
         )
 
+    @property
+    def compact_description(self) -> str:
+        return "Show (enabled=true) or hide (enabled=false) <think> sections; status=true queries the current state."
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
@@ -8,6 +8,25 @@ except ImportError:
     ZoneInfo = None  # Python <3.9 fallback
 
 class TimeTool(BaseTool):
+    keywords = ("time", "date", "today", "clock", "timezone", "now", "day", "utc", "year", "month")
+    intents = {
+        "what time is it": {"format": "time"},
+        "what time is it now": {"format": "time"},
+        "what is the time": {"format": "time"},
+        "current time": {"format": "time"},
+        "time": {"format": "time"},
+        "what time is it in {timezone}": {"format": "time"},
+        "what is the time in {timezone}": {"format": "time"},
+        "what is the date": {"format": "date"},
+        "what is the date today": {"format": "date"},
+        "what is todays date": {"format": "date"},
+        "todays date": {"format": "date"},
+        "what day is it": {"format": "date"},
+        "what day is it today": {"format": "date"},
+        "date": {"format": "date"},
+        "what is the date and time": {"format": "datetime"},
+    }
+
     @property
     def name(self) -> str:
         return "time"
@@ -33,6 +52,10 @@ class TimeTool(BaseTool):
             "- {\"format\": \"datetime\", \"timezone\": \"America/New_York\"} → 09:45:00 (EDT)\n"
         )
 
+    @property
+    def compact_description(self) -> str:
+        return "Get the current date/time (optionally in an IANA timezone). Always call this for date or time questions. format: date|time|datetime."
+
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
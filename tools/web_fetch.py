@@ -1,30 +1,258 @@
-import requests
-from typing import Dict, Any
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional
+
 from .base_tool import BaseTool
 
+WEB_CACHE_DIR = os.path.expanduser("~/.tilde-cli/web-cache")
+MAX_CACHE_ENTRIES = 500
+MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024
+MAX_TEXT_CHARS = 40000
+HEURISTIC_MAX_AGE = 24 * 3600
+_CACHED_HEADERS = ("etag", "last-modified", "cache-control", "expires", "date", "content-type", "vary")
+
+_session = None
+
+
+def get_session() -> "requests.Session":
+    """Return the shared, connection-pooled HTTP session used by web_fetch."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        _session.headers["User-Agent"] = "tilde-cli"
+    return _session
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    import email.utils
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpCache:
+    """On-disk HTTP cache honouring Cache-Control, Expires, ETag and Last-Modified.
+
+    Each URL is stored as a JSON metadata file plus the raw body, keyed by the
+    SHA-256 of the URL. Fresh entries are served without touching the network;
+    stale ones are revalidated with If-None-Match / If-Modified-Since. The request
+    headers a response ``Vary``-s on are stored with it, and an entry only answers
+    requests that send the same values.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = MAX_CACHE_ENTRIES):
+        self.cache_dir = cache_dir or WEB_CACHE_DIR
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + ".json", base + ".body"
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def usable(self, entry: Dict[str, Any], max_bytes: int, request_headers) -> bool:
+        """Whether ``entry`` can answer a request for up to ``max_bytes`` sent with ``request_headers``."""
+        if entry.get("truncated") and len(entry["body"]) < max_bytes:
+            return False  # cut short by a smaller limit than this request's
+        return all(request_headers.get(name) == value for name, value in entry.get("vary", {}).items())
+
+    def is_fresh(self, entry: Dict[str, Any], now: float = None) -> bool:
+        headers = entry["headers"]
+        directives = _parse_cache_control(headers.get("cache-control"))
+        if "no-cache" in directives:
+            return False
+        age = (now or time.time()) - entry["stored_at"]
+        if directives.get("max-age") is not None:
+            try:
+                return age < int(directives["max-age"])
+            except ValueError:
+                return False
+        expires = _parse_http_date(headers.get("expires"))
+        if expires is not None:
+            date = _parse_http_date(headers.get("date")) or entry["stored_at"]
+            return age < expires - date
+        last_modified = _parse_http_date(headers.get("last-modified"))
+        if last_modified is not None:
+            # RFC 9111 heuristic freshness: 10% of the time since last modification.
+            date = _parse_http_date(headers.get("date")) or entry["stored_at"]
+            return age < min(HEURISTIC_MAX_AGE, 0.1 * max(0.0, date - last_modified))
+        return False
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes, truncated: bool = False,
+              request_headers=None, vary: Dict[str, Optional[str]] = None):
+        if "no-store" in _parse_cache_control(headers.get("cache-control")):
+            return
+        if vary is None:
+            names = [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+            if "*" in names:
+                return
+            vary = {name: (request_headers or {}).get(name) for name in names}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        entry = {
+            "url": url,
+            "stored_at": time.time(),
+            "truncated": truncated,
+            "vary": vary,
+            "headers": {k: v for k, v in headers.items() if k in _CACHED_HEADERS},
+        }
+        for path, data, mode in ((body_path, body, 'wb'), (meta_path, json.dumps(entry), 'w')):
+            tmp = path + ".tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self._prune()
+
+    def refresh(self, url: str, entry: Dict[str, Any], headers: Dict[str, str]):
+        """Record a 304 revalidation: merge updated headers and restart the freshness clock."""
+        merged = dict(entry["headers"])
+        merged.update({k: v for k, v in headers.items() if k in _CACHED_HEADERS})
+        self.store(url, merged, entry["body"], entry.get("truncated", False), vary=entry.get("vary", {}))
+
+    def _prune(self):
+        metas = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        if len(metas) <= self.max_entries:
+            return
+        metas.sort(key=lambda p: os.path.getmtime(p))
+        for meta_path in metas[:len(metas) - self.max_entries]:
+            for path in (meta_path, meta_path[:-len(".json")] + ".body"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+_cache = None
+
+
+def get_cache() -> HttpCache:
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
+
+
 class WebFetchTool(BaseTool):
+    keywords = ("http", "https", "url", "website", "web", "fetch", "download", "page", "docs", "online")
+
+    def __init__(self, cache: HttpCache = None, session: "requests.Session" = None):
+        self._cache = cache
+        self._session = session
+
+    @property
+    def cache(self) -> HttpCache:
+        return self._cache or get_cache()
+
     @property
     def name(self) -> str:
         return "web_fetch"
 
     @property
     def description(self) -> str:
-        return "Fetches the content of a given URL."
+        return "Fetches a URL and returns its readable text content (HTML is converted to plain text)."
 
     @property
     def parameters(self) -> Dict[str, Any]:
         return {
             "type": "object",
             "properties": {
-                "url": {"type": "string", "description": "The URL to fetch."}
+                "url": {"type": "string", "description": "The URL to fetch."},
+                "raw": {"type": "boolean", "description": "Return the raw response body instead of extracted text (optional)."}
             },
             "required": ["url"]
         }
 
-    def execute(self, url: str) -> str:
+    def execute(self, url: str, raw: bool = False, max_bytes: int = MAX_DOWNLOAD_BYTES) -> str:
+        import requests
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            return response.text
+            body, headers, truncated = self._fetch(url, max_bytes)
         except requests.exceptions.RequestException as e:
-            return f"Error fetching URL {url}: {e}"
\ No newline at end of file
+            return f"Error fetching URL {url}: {e}"
+        encoding = requests.utils.get_encoding_from_headers(headers) or "utf-8"
+        text = body.decode(encoding, errors='replace')
+        content_type = headers.get("content-type", "")
+        if not raw and ("html" in content_type or (not content_type and text.lstrip()[:1] == "<")):
+            from .html_text import html_to_text
+            text = html_to_text(text)
+        if len(text) > MAX_TEXT_CHARS:
+            text = text[:MAX_TEXT_CHARS]
+            truncated = True
+        if truncated:
+            text += f"\n\n[Content truncated: page exceeds {max_bytes} bytes or {MAX_TEXT_CHARS} characters]"
+        return text
+
+    def _fetch(self, url: str, max_bytes: int):
+        cache = self.cache
+        session = self._session or get_session()
+        entry = cache.lookup(url)
+        if entry is not None and not cache.usable(entry, max_bytes, session.headers):
+            entry = None
+        if entry is not None and cache.is_fresh(entry):
+            cache.stats["hits"] += 1
+            return self._cached(entry, max_bytes)
+        request_headers = {}
+        if entry is not None:
+            if entry["headers"].get("etag"):
+                request_headers["If-None-Match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                request_headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        with session.get(url, headers=request_headers, timeout=10, stream=True) as response:
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            if response.status_code == 304 and entry is not None:
+                cache.stats["revalidated"] += 1
+                cache.refresh(url, entry, headers)
+                return self._cached(entry, max_bytes)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            cache.stats["misses"] += 1
+            chunks = []
+            size = 0
+            truncated = False
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    truncated = True
+                    break
+            body = b"".join(chunks)[:max_bytes]
+            cache.store(url, headers, body, truncated, request_headers=response.request.headers)
+        return body, headers, truncated
+
+    @staticmethod
+    def _cached(entry: Dict[str, Any], max_bytes: int):
+        body = entry["body"]
+        return body[:max_bytes], entry["headers"], entry.get("truncated", False) or len(body) > max_bytes
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return hit/miss/revalidation counters for the shared web cache."""
+    return dict(get_cache().stats)
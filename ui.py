@@ -0,0 +1,93 @@
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+REDRAW_INTERVAL = 0.1  # seconds between redraws while a status is shown
+
+
+class StatusLine:
+    """Live one-line status ("step 2 · thinking · 3.4s · 57 tokens") drawn by a single render thread.
+
+    The render thread is started once and sleeps on a condition variable, so
+    :meth:`start`, :meth:`update` and :meth:`stop` take effect immediately; in
+    particular :meth:`stop` clears the line before returning instead of waiting for
+    the next frame. Nothing is drawn when the output is not a terminal, so piped
+    output never contains control characters.
+    """
+
+    def __init__(self, stream: TextIO = None, interval: float = REDRAW_INTERVAL):
+        self._stream = stream
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._active = False
+        self._drawn = False
+        self._out: Optional[TextIO] = None
+        self.step = ""
+        self.phase = ""
+        self.tokens = 0
+        self.started = 0.0
+
+    def _enabled(self, out: TextIO) -> bool:
+        try:
+            return out.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def start(self, step: str, phase: str = "thinking"):
+        out = self._stream or sys.stdout
+        with self._cond:
+            self.step, self.phase, self.tokens = step, phase, 0
+            self.started = time.perf_counter()
+            self._out = out
+            self._active = self._enabled(out)
+            if self._active and self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="tilde-status", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def update(self, phase: str = None, tokens: int = 0):
+        """Switch phase and/or add ``tokens`` streamed tokens; redraws on the next wake-up."""
+        with self._cond:
+            if phase is not None and phase != self.phase:
+                self.phase = phase
+                self._cond.notify()  # show phase changes right away
+            self.tokens += tokens
+
+    def stop(self):
+        """Hide the status line now."""
+        with self._cond:
+            self._active = False
+            self._clear()
+
+    def render(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        frame = FRAMES[int(elapsed / self.interval) % len(FRAMES)]
+        parts = [self.step, self.phase, f"{elapsed:.1f}s"]
+        if self.tokens:
+            parts.append(f"{self.tokens} tokens")
+        return f"{frame} Tilde: " + " · ".join(p for p in parts if p)
+
+    def _clear(self):
+        if self._drawn:
+            self._write("\r\033[K")
+            self._drawn = False
+
+    def _write(self, text: str):
+        try:
+            self._out.write(text)
+            self._out.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _loop(self):
+        with self._cond:
+            while True:
+                if not self._active:
+                    self._cond.wait()
+                    continue
+                self._write(f"\r\033[K\033[33m{self.render()}\033[0m")
+                self._drawn = True
+                self._cond.wait(self.interval)
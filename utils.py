@@ -13,3 +13,39 @@ def setup_logging(log_level: str = "INFO"):
     logging.debug(f"Logging initialized at level: {log_level}")
 
 # Utility functions can be added here as needed.
+
+def profile_startup(script: str, argv, top: int = 15) -> int:
+    """Re-run ``script argv`` under ``python -X importtime`` and report per-module import cost.
+
+    The command's own output is passed through; the import report goes to stderr.
+    """
+    import subprocess
+    import sys
+    import time
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", script, *argv], stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = []
+    other_stderr = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            other_stderr.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(fields[1]), int(fields[0]), depth, name.strip()))
+    if other_stderr:
+        print("\n".join(other_stderr), file=sys.stderr)
+    total_us = sum(cumulative for cumulative, _, depth, _ in modules if depth == 0)
+    print(f"\nStartup profile: {wall_ms:.1f} ms wall, {total_us / 1000:.1f} ms in imports ({len(modules)} modules)", file=sys.stderr)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=sys.stderr)
+    for cumulative, self_us, depth, name in sorted(modules, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}", file=sys.stderr)
+    return proc.returncode
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting and reporting."""
+    return (len(text) + 3) // 4